@@ -0,0 +1,50 @@
+// SPDX-License-Identifier: MIT
+
+pragma solidity ^0.8.4;
+
+import "@openzeppelin/contracts/utils/cryptography/ECDSA.sol";
+import "@openzeppelin/contracts/utils/cryptography/MerkleProof.sol";
+
+/// @author Iurii Zozulynskyi
+/// @title World Of Ledger signature and Merkle proof checks
+/// @notice Deployed separately and linked to the game, so the checks of relayed actions and Merkle settled rewards don't count towards the game contract size
+library GameProofs {
+    /**
+        @dev signer of the EIP-712 digest of the relayed actions
+        @param digest EIP-712 digest, see WorldOfLedger.actionsDigest
+        @param signature 65 bytes signature of the player
+        @return address signer, reverts if the signature is malformed
+    */
+    function recoverSigner(bytes32 digest, bytes memory signature)
+        public
+        pure
+        returns (address)
+    {
+        return ECDSA.recover(digest, signature);
+    }
+
+    /**
+        @dev checks the share of the user in a round settled with a Merkle root
+        @dev leaves are keccak256(keccak256(abi.encode(user, round, damage, reward))), pairs are hashed sorted
+        @param proof Merkle proof of the share
+        @param root published Merkle root of the round
+        @param user who claims the share
+        @param round id of the round
+        @param damage made by the user in the round
+        @param reward user share of the round reward
+        @return bool true if the proof is valid
+    */
+    function verifyShare(
+        bytes32[] memory proof,
+        bytes32 root,
+        address user,
+        uint256 round,
+        uint256 damage,
+        uint256 reward
+    ) public pure returns (bool) {
+        bytes32 leaf = keccak256(
+            bytes.concat(keccak256(abi.encode(user, round, damage, reward)))
+        );
+        return MerkleProof.verify(proof, root, leaf);
+    }
+}
@@ -0,0 +1,55 @@
+// SPDX-License-Identifier: MIT
+
+pragma solidity ^0.8.4;
+
+import "@openzeppelin/contracts/utils/Base64.sol";
+import "@openzeppelin/contracts/utils/Strings.sol";
+
+/// @author Iurii Zozulynskyi
+/// @title World Of Ledger Reward NFT metadata
+/// @notice Deployed separately and linked to the game, so the JSON rendering doesn't count towards the game contract size
+library RewardMetadata {
+    using Strings for uint256;
+
+    /**
+        @dev renders ERC721 metadata JSON of the reward NFT as a base64 data URI
+        @param tokenId id of the reward NFT
+        @param name name of the reward
+        @param damageMade by the user to the boss
+        @param rewardReceived by the user
+        @param bossID that was killed
+        @param bossURI token URI of the boss NFT
+        @return string data URI
+    */
+    function render(
+        uint256 tokenId,
+        string memory name,
+        uint256 damageMade,
+        uint256 rewardReceived,
+        uint256 bossID,
+        string memory bossURI
+    ) public pure returns (string memory) {
+        bytes memory json = abi.encodePacked(
+            '{"name":"',
+            name,
+            " #",
+            tokenId.toString(),
+            '","external_url":"',
+            bossURI,
+            '","attributes":[{"trait_type":"Boss","value":',
+            bossID.toString(),
+            '},{"trait_type":"Damage made","value":',
+            damageMade.toString(),
+            '},{"trait_type":"Reward received","value":',
+            rewardReceived.toString(),
+            "}]}"
+        );
+        return
+            string(
+                abi.encodePacked(
+                    "data:application/json;base64,",
+                    Base64.encode(json)
+                )
+            );
+    }
+}
@@ -1,56 +1,70 @@
 // SPDX-License-Identifier: MIT
 
-pragma solidity ^0.8.0;
+pragma solidity ^0.8.4;
 
-import "@openzeppelin/contracts/token/ERC721/ERC721.sol";
+import "erc721a/contracts/ERC721A.sol";
+import "@openzeppelin/contracts/utils/math/SafeCast.sol";
 import "@openzeppelin/contracts/utils/Counters.sol";
+import "./RewardMetadata.sol";
 
 /// @author Iurii Zozulynskyi
 /// @title World Of Ledger Reward NFT contract
-contract RewardNFT is ERC721 {
+/// @notice Reward NFTs are minted in consecutive batches, so minting many rewards costs close to one mint
+/// @notice Metadata is rendered on the fly, the boss URI is provided by the game
+abstract contract RewardNFT is ERC721A {
     using Counters for Counters.Counter;
-    Counters.Counter private _tokenIds;
+    Counters.Counter private _rewardIds;
 
+    string constant REWARD_NAME = "World Of Ledger. Reward for boss defeated.";
+
+    /// @dev packed into a single storage slot
     struct Reward {
-        string name;
-        uint256 damageMade;
-        uint256 rewardReceived;
-        uint256 bossID;
+        uint96 damageMade;
+        uint96 rewardReceived;
+        uint32 bossID;
+    }
+
+    struct MintedBatch {
+        address minter;
+        uint96 firstReward;
     }
 
-    mapping(address => uint256[]) public userToNFTAllowed;
-    mapping(uint256 => Reward) public NFTidToReward;
+    mapping(uint256 => Reward) private _rewards;
+    mapping(address => uint256[]) private _userRewardIds;
+    mapping(address => uint256) private _userRewardsMinted;
+    mapping(uint256 => MintedBatch) private _mintedBatches;
     event createRewardNFT(uint256 indexed requestId, address requester);
 
-    constructor() ERC721("WorldOfLedgerRewardNFT", "WOLR") {}
+    constructor() ERC721A("WorldOfLedgerRewardNFT", "WOLR") {}
 
     /**
         @dev creates NFT reward Structure according to the parameters
         @param damage made by the user to the boss
         @param reward got by user killing the boss
         @param bossid that was killed
-        @return newNFTid number
-        @notice internal function
+        @return newRewardId number
+        @notice internal function. damage and boss id fit the round ledger, reward above 96 bits is saturated
     */
     function createReward(
         uint256 damage,
         uint256 reward,
         uint256 bossid
-    ) internal returns (uint256 newNFTid) {
+    ) internal returns (uint256 newRewardId) {
         Reward memory newReward = Reward({
-            name: "World Of Ledger. Reward for boss defeated.",
-            damageMade: damage,
-            rewardReceived: reward,
-            bossID: bossid
+            damageMade: SafeCast.toUint96(damage),
+            rewardReceived: reward > type(uint96).max
+                ? type(uint96).max
+                : uint96(reward),
+            bossID: SafeCast.toUint32(bossid)
         });
-        _tokenIds.increment();
-        newNFTid = _tokenIds.current();
-        NFTidToReward[newNFTid] = newReward;
-        return newNFTid;
+        _rewardIds.increment();
+        newRewardId = _rewardIds.current();
+        _rewards[newRewardId] = newReward;
+        return newRewardId;
     }
 
     /**
-        @dev adds user allowance to mapping userToNFTAllowed and it ID
+        @dev adds reward to the list of user rewards allowed to mint
         @param damage made by the user to the boss
         @param reward got by user killing the boss
         @param bossid that was killed
@@ -63,18 +77,129 @@ contract RewardNFT is ERC721 {
         uint256 bossid
     ) internal {
         uint256 rewardId = createReward(damage, reward, bossid);
-        userToNFTAllowed[user].push(rewardId);
+        _userRewardIds[user].push(rewardId);
+    }
+
+    /**
+        @dev id of the reward user is allowed to mint
+        @param user address of user
+        @param index of the reward among not minted rewards of the user
+        @return reward id
+    */
+    function userToNFTAllowed(address user, uint256 index)
+        public
+        view
+        returns (uint256)
+    {
+        return _userRewardIds[user][_userRewardsMinted[user] + index];
+    }
+
+    /**
+        @dev number of rewards user is allowed to mint
+        @param user address of user
+        @return uint number of not minted rewards
+    */
+    function pendingRewardNFTs(address user) public view returns (uint256) {
+        return _userRewardIds[user].length - _userRewardsMinted[user];
+    }
+
+    /**
+        @dev reward stored for the minted NFT
+        @param tokenId id of the minted NFT
+        @return rewardName name of the reward
+        @return damageMade by the user to the boss
+        @return rewardReceived by the user
+        @return bossID that was killed
+    */
+    function NFTidToReward(uint256 tokenId)
+        public
+        view
+        returns (
+            string memory rewardName,
+            uint256 damageMade,
+            uint256 rewardReceived,
+            uint256 bossID
+        )
+    {
+        Reward memory reward = _rewards[_rewardIdOf(tokenId)];
+        return (
+            REWARD_NAME,
+            reward.damageMade,
+            reward.rewardReceived,
+            reward.bossID
+        );
+    }
+
+    /**
+        @dev metadata of the minted NFT, rendered from the reward and the boss URI
+        @param tokenId id of the minted NFT
+        @return string base64 encoded JSON data URI
+    */
+    function tokenURI(uint256 tokenId)
+        public
+        view
+        override
+        returns (string memory)
+    {
+        Reward memory reward = _rewards[_rewardIdOf(tokenId)];
+        return
+            RewardMetadata.render(
+                tokenId,
+                REWARD_NAME,
+                reward.damageMade,
+                reward.rewardReceived,
+                reward.bossID,
+                _bossURI(reward.bossID)
+            );
     }
 
     /**
-        @dev called when user calls mintRewardNFT function. Loop through user available rewards and mint them 
+        @dev token URI of the boss NFT
+        @param bossID id of the boss
+        @return string URI stored when the boss was created
+    */
+    function _bossURI(uint256 bossID)
+        internal
+        view
+        virtual
+        returns (string memory);
+
+    /**
+        @dev finds reward id of the minted NFT. Only the first token of the batch stores the batch,
+             so we look back to the start of the batch, the same way ERC721A looks for token owner
+        @param tokenId id of the minted NFT
+        @return reward id
         @notice internal function
     */
-    function _mintReward(address minter) internal {
-        for (uint256 i = 0; i < userToNFTAllowed[minter].length; i++) {
-            uint256 NFTid = userToNFTAllowed[minter][i];
-            _safeMint(minter, NFTid);
+    function _rewardIdOf(uint256 tokenId) internal view returns (uint256) {
+        require(_exists(tokenId), "Reward NFT doesn't exist");
+        uint256 batchStart = tokenId;
+        while (_mintedBatches[batchStart].minter == address(0)) {
+            batchStart--;
         }
-        delete userToNFTAllowed[minter];
+        MintedBatch memory batch = _mintedBatches[batchStart];
+        return
+            _userRewardIds[batch.minter][
+                batch.firstReward + tokenId - batchStart
+            ];
+    }
+
+    /**
+        @dev called when user calls mintRewardNFT function. Mints all user available rewards in one batch
+        @notice internal function
+    */
+    function _mintReward(address minter) internal {
+        uint256 minted = _userRewardsMinted[minter];
+        uint256 quantity = _userRewardIds[minter].length - minted;
+        _mintedBatches[_nextTokenId()] = MintedBatch(minter, uint96(minted));
+        _userRewardsMinted[minter] = minted + quantity;
+        _safeMint(minter, quantity);
+    }
+
+    /**
+        @dev reward NFT ids start from 1
+    */
+    function _startTokenId() internal pure override returns (uint256) {
+        return 1;
     }
 }
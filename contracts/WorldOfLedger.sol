@@ -4,18 +4,75 @@ pragma solidity ^0.8.0;
 
 import "./WorldOfLedgerFactory.sol";
 import "./RewardNFT.sol";
+import "./GameProofs.sol";
+import "@openzeppelin/contracts/utils/cryptography/draft-EIP712.sol";
+import "@openzeppelin/contracts/utils/math/Math.sol";
 import "../interfaces/INFTInterface.sol";
 
 /// @author Iurii Zozulynskyi
 /// @title World Of Ledger game contract.
-contract WorldOfLedger is WorldOfLedgerFactory, RewardNFT {
-    uint256 _totalUsers;
-    uint256 _totalDamage;
+contract WorldOfLedger is WorldOfLedgerFactory, RewardNFT, EIP712 {
+    /// @dev packed into a single storage slot
+    struct Round {
+        uint32 bossId;
+        uint96 reward;
+        uint96 totalDamage;
+        bool merkleSettlement;
+    }
+
+    /// @dev arg is the healed user address for ACTION_HEAL and the arena id for the arena actions
+    struct Action {
+        uint8 kind;
+        uint256 arg;
+    }
+
+    /// @dev actions of a player signed for a relayer, see relayActions
+    struct SignedActions {
+        address player;
+        Action[] actions;
+        uint256 deadline;
+        bytes signature;
+    }
+
+    struct PlayerState {
+        Character character;
+        uint256 damageMade;
+        uint256 round;
+        uint256 rewards;
+        uint256 pendingRewardNFTs;
+    }
+
+    uint8 constant ACTION_ATTACK = 0;
+    uint8 constant ACTION_ATTACK_ARENA = 1;
+    uint8 constant ACTION_FIRE_BOLT = 2;
+    uint8 constant ACTION_HEAL = 3;
+    uint8 constant ACTION_CLAIM_REWARDS = 4;
+    uint8 constant ACTION_MINT_REWARD_NFT = 5;
+    uint8 constant ACTION_SETTLE_ARENA = 6;
+    bytes32 constant ACTION_TYPEHASH =
+        keccak256("Action(uint8 kind,uint256 arg)");
+    bytes32 constant PLAYER_ACTIONS_TYPEHASH =
+        keccak256(
+            "PlayerActions(address player,Action[] actions,uint256 nonce,uint256 deadline)Action(uint8 kind,uint256 arg)"
+        );
+
+    uint256 public currentRound;
+    mapping(uint256 => Round) public rounds;
     mapping(address => uint256) public damageMade;
+    mapping(address => uint256) public usersRound;
     mapping(address => uint256) public usersRewards;
-    mapping(uint256 => address) public users;
+    bool public merkleSettlement;
+    bool public nextMerkleSettlement;
+    mapping(uint256 => bytes32) public rewardRoots;
+    mapping(uint256 => mapping(address => bool)) public rewardRootClaims;
+    mapping(uint256 => uint256) public arenaTotalDamage;
+    mapping(uint256 => mapping(address => uint256)) public arenaDamage;
+    mapping(address => uint256) public actionNonces;
 
     event DamageMade(address user, uint256 amount);
+    event RewardRootPublished(uint256 round, bytes32 root);
+    event ArenaDamageMade(uint256 arenaId, address user, uint256 amount);
+    event ArenaBossKilled(uint256 arenaId);
 
     /**
         @dev Change the character level to spell heal 
@@ -39,8 +96,9 @@ contract WorldOfLedger is WorldOfLedgerFactory, RewardNFT {
             _linkToken
         )
         RewardNFT()
+        EIP712("WorldOfLedger", "1")
     {
-        _totalUsers = 0;
+        currentRound = 1;
     }
 
     /**
@@ -48,28 +106,79 @@ contract WorldOfLedger is WorldOfLedgerFactory, RewardNFT {
         @notice User should have alive character to call this function
     */
     function attackBoss() public {
+        _attackBoss(msg.sender);
+    }
+
+    /**
+        @dev attack of the current boss by the user, see attackBoss
+        @param user whos character attacks
+        @notice internal function
+    */
+    function _attackBoss(address user) internal {
+        require(_userHasCharacter(user) == true, "You should have a Character");
         require(
-            _userHasCharacter(msg.sender) == true,
-            "You should have a Character"
+            _hasAliveCharacter(user) == true,
+            "Your Character should be alive"
         );
+        require(bossAlive == true, "There is no active Boss right now");
+
+        _userAttackProcess(user, usersCharacters[user].damage);
+        _bossAttackProcess(user, currentBoss.damage);
+        _checkHealthAfterFight(user);
+    }
+
+    /**
+        @dev Character attacks boss of the arena, see openArenas. Both character and boss get damage according to their attribute
+        @dev damage is stored to the ledger of the arena, the reward is settled with settleArenaRewards after the boss is killed
+        @param arenaId id of the arena
+        @notice User should have alive character to call this function
+    */
+    function attackBoss(uint256 arenaId) public {
+        _attackArenaBoss(msg.sender, arenaId);
+    }
+
+    /**
+        @dev attack of the arena boss by the user, see attackBoss(arenaId)
+        @param user whos character attacks
+        @param arenaId id of the arena
+        @notice internal function
+    */
+    function _attackArenaBoss(address user, uint256 arenaId) internal {
+        require(_userHasCharacter(user) == true, "You should have a Character");
         require(
-            _hasAliveCharacter(msg.sender) == true,
+            _hasAliveCharacter(user) == true,
             "Your Character should be alive"
         );
-        require(bossAlive == true, "There is no active Boss right now");
+        Boss storage boss = arenaBosses[arenaId];
+        uint96 bossHp = boss.hp;
+        require(bossHp > 0, "There is no active Boss in this arena");
 
-        _userAttackProcess(usersCharacters[msg.sender].damage);
-        _bossAttackProcess();
-        _checkHealthAfterFight();
+        uint96 damage = usersCharacters[user].damage;
+        if (damage > bossHp) {
+            damage = bossHp;
+        }
+        boss.hp = bossHp - damage;
+        arenaTotalDamage[arenaId] += damage;
+        arenaDamage[arenaId][user] += damage;
+        emit ArenaDamageMade(arenaId, user, damage);
+
+        _bossAttackProcess(user, boss.damage);
+        if (usersCharacters[user].hp == 0) {
+            _character_died(user);
+        }
+        if (bossHp == damage) {
+            emit ArenaBossKilled(arenaId);
+        }
     }
 
     /**
         @dev Checks if character or boss health less than 0
+        @param user whos character fought
         @notice internal function
     */
-    function _checkHealthAfterFight() internal {
-        if (usersCharacters[msg.sender].hp == 0) {
-            _character_died();
+    function _checkHealthAfterFight(address user) internal {
+        if (usersCharacters[user].hp == 0) {
+            _character_died(user);
         }
         if (currentBoss.hp == 0) {
             _finalizeRound();
@@ -78,48 +187,60 @@ contract WorldOfLedger is WorldOfLedgerFactory, RewardNFT {
 
     /**
         @dev Called if character hp below 0. Drops character xp and level to 0 and isAlive to false
+        @param user whos character died
         @notice internal function
     */
-    function _character_died() internal {
-        usersCharacters[msg.sender].isAlive == false;
-        usersCharacters[msg.sender].xp = 0;
-        _updateUserLevel(msg.sender);
+    function _character_died(address user) internal {
+        usersCharacters[user].isAlive = false;
+        usersCharacters[user].xp = 0;
+        _updateUserLevel(user);
     }
 
     /**
         @dev user attack process. Stores damage made by character to the damageMade mapping
+        @dev in Merkle settlement mode damage is only emitted in DamageMade event
+        @dev settles the reward of the previous round first if user took part in it
+        @param user whos character attacks
         @param userDamage amount of damage that character made to boss        
         @notice internal function
     */
-    function _userAttackProcess(uint256 userDamage) internal {
-        if (damageMade[msg.sender] == 0) {
-            _totalUsers++;
-            users[_totalUsers] = msg.sender;
+    function _userAttackProcess(address user, uint256 userDamage) internal {
+        if (usersRound[user] != currentRound) {
+            _settleRewards(user);
+            usersRound[user] = currentRound;
         }
 
         if (userDamage > currentBoss.hp) {
-            uint256 _actualDamage = currentBoss.hp;
-            _totalDamage += _actualDamage;
-            damageMade[msg.sender] += _actualDamage;
-            emit DamageMade(msg.sender, _actualDamage);
+            uint96 _actualDamage = currentBoss.hp;
+            rounds[currentRound].totalDamage += _actualDamage;
+            if (!merkleSettlement) {
+                damageMade[user] += _actualDamage;
+            }
+            emit DamageMade(user, _actualDamage);
             currentBoss.hp = 0;
         } else {
-            _totalDamage += userDamage;
-            currentBoss.hp -= userDamage;
-            damageMade[msg.sender] += userDamage;
-            emit DamageMade(msg.sender, userDamage);
+            // userDamage is not bigger than boss hp, so it fits 96 bits
+            rounds[currentRound].totalDamage += uint96(userDamage);
+            currentBoss.hp -= uint96(userDamage);
+            if (!merkleSettlement) {
+                damageMade[user] += userDamage;
+            }
+            emit DamageMade(user, userDamage);
         }
     }
 
     /**
         @dev boss attack process
+        @param user whos character is attacked
+        @param bossDamage damage of the attacked boss
         @notice internal function
     */
-    function _bossAttackProcess() internal {
-        if (currentBoss.damage > usersCharacters[msg.sender].hp) {
-            usersCharacters[msg.sender].hp = 0;
+    function _bossAttackProcess(address user, uint256 bossDamage) internal {
+        Character storage character = usersCharacters[user];
+        if (bossDamage > character.hp) {
+            character.hp = 0;
         } else {
-            usersCharacters[msg.sender].hp -= currentBoss.damage;
+            character.hp -= uint32(bossDamage);
         }
     }
 
@@ -128,18 +249,26 @@ contract WorldOfLedger is WorldOfLedgerFactory, RewardNFT {
         @dev character level should be >= healSpellLevel set be setHealSpellLevel function (default = 2)
         @param healed_user user address that we want to heal
         @notice Character heals in the same amount as make damage
+        @notice hp can't exceed the maximum of 32 bits, extra healing is lost
     */
     function healCharacter(address healed_user) public {
+        _healCharacter(msg.sender, healed_user);
+    }
+
+    /**
+        @dev heal spell of the user, see healCharacter
+        @param user whos character casts the spell
+        @param healed_user user address that we want to heal
+        @notice internal function
+    */
+    function _healCharacter(address user, address healed_user) internal {
+        require(_userHasCharacter(user) == true, "You should have a Character");
         require(
-            _userHasCharacter(msg.sender) == true,
-            "You should have a Character"
-        );
-        require(
-            _hasAliveCharacter(msg.sender) == true,
+            _hasAliveCharacter(user) == true,
             "Your Character should be alive"
         );
         require(
-            usersCharacters[msg.sender].xp > 0,
+            usersCharacters[user].xp > 0,
             "Only players who already earn experiences can cast the heal spell"
         );
         require(
@@ -147,12 +276,16 @@ contract WorldOfLedger is WorldOfLedgerFactory, RewardNFT {
             "User should have Character to heal it"
         );
         require(
-            usersCharacters[msg.sender].level >= healSpellLevel,
+            usersCharacters[user].xp >= healSpellXp,
             "Only players level 2 or above may cast the heal spell"
         );
-        require(healed_user != msg.sender, "You can not heal YOUR character");
+        require(healed_user != user, "You can not heal YOUR character");
 
-        usersCharacters[healed_user].hp += usersCharacters[msg.sender].damage;
+        uint256 healedHp = uint256(usersCharacters[healed_user].hp) +
+            usersCharacters[user].damage;
+        usersCharacters[healed_user].hp = healedHp > type(uint32).max
+            ? type(uint32).max
+            : uint32(healedHp);
     }
 
     /**
@@ -161,42 +294,256 @@ contract WorldOfLedger is WorldOfLedgerFactory, RewardNFT {
         @notice Firebolt makes x2 of the character damage
     */
     function castFireBolt() public {
+        _castFireBolt(msg.sender);
+    }
+
+    /**
+        @dev firebolt spell of the user, see castFireBolt
+        @param user whos character casts the spell
+        @notice internal function
+    */
+    function _castFireBolt(address user) internal {
+        require(bossAlive == true, "There is no active Boss right now");
         require(
-            usersCharacters[msg.sender].level >= fireBoltSpellLevel,
+            usersCharacters[user].xp >= fireBoltSpellXp,
             "Only players level 3 or above may cast the heal spell"
         );
         require(
-            block.timestamp >= usersCharacters[msg.sender].fireBoltTime,
+            block.timestamp >= usersCharacters[user].fireBoltTime,
             "You may cast spell only once a day"
         );
-        usersCharacters[msg.sender].fireBoltTime =
-            block.timestamp +
-            fireBoltCooldownPeriod;
-        _userAttackProcess(usersCharacters[msg.sender].damage * 2);
+        usersCharacters[user].fireBoltTime = SafeCast.toUint40(
+            block.timestamp + fireBoltCooldownPeriod
+        );
+        _userAttackProcess(user, uint256(usersCharacters[user].damage) * 2);
+        if (currentBoss.hp == 0) {
+            _finalizeRound();
+        }
     }
 
     /**
         @dev called when boss xp drops to 0
-        @dev calculate user rewards according to their damage made to boss and create allowance for NFT mint for them
-        @notice internal function
+        @dev closes the round with the boss reward. Total damage of the round is already accumulated,
+             so reward per damage is known and every user settles their share lazily
+        @dev the next staged boss spawns right away, see stageBosses
+        @notice internal function, constant gas regardless of the number of participants
     */
     function _finalizeRound() internal {
-        bossAlive == false;
-        for (uint256 i = 1; i <= _totalUsers; i++) {
-            usersRewards[users[i]] +=
-                currentBoss.reward *
-                (damageMade[users[i]] / _totalDamage);
-            addAllowanceToUser(
-                users[i],
-                damageMade[users[i]],
-                usersRewards[users[i]],
-                currentBoss.id
+        bossAlive = false;
+        Round storage round = rounds[currentRound];
+        Boss memory boss = currentBoss;
+        round.bossId = boss.id;
+        round.reward = boss.reward;
+        round.merkleSettlement = merkleSettlement;
+        // mode set while the boss was alive, applied before a staged boss spawns
+        if (nextMerkleSettlement != merkleSettlement) {
+            merkleSettlement = nextMerkleSettlement;
+        }
+        currentRound++;
+        _spawnStagedBoss();
+    }
+
+    /**
+        @dev settles user share of the finished round: adds reward and creates allowance for NFT mint
+        @dev share is calculated as round reward * user damage / round total damage
+        @param user whos reward should be settled
+        @notice internal function. Does nothing if user has no damage in finished round
+    */
+    function _settleRewards(address user) internal {
+        (bool settled, uint256 reward) = _unsettledReward(user);
+        if (settled) {
+            return;
+        }
+        usersRewards[user] += reward;
+        addAllowanceToUser(
+            user,
+            damageMade[user],
+            usersRewards[user],
+            rounds[usersRound[user]].bossId
+        );
+        delete damageMade[user];
+    }
+
+    /**
+        @dev switches settlement of the next rounds between lazy settlement of every user and Merkle roots
+        @dev in Merkle mode the owner publishes a Merkle root of the user shares after the round,
+             see scripts/merkle_rewards.py, and users claim their share with a proof
+        @param enabled true for Merkle settlement
+        @notice applies right away if there is no alive boss, otherwise when the boss is killed,
+             before the next staged boss spawns, so every round is settled in one mode
+    */
+    function setMerkleSettlement(bool enabled) public onlyOwner {
+        nextMerkleSettlement = enabled;
+        if (bossAlive == false) {
+            merkleSettlement = enabled;
+        }
+    }
+
+    /**
+        @dev publishes Merkle root of the shares of the finished round
+        @dev leaves are keccak256(keccak256(abi.encode(user, round, damage, reward))), pairs are hashed sorted
+        @param round id of the finished round
+        @param root Merkle root of the shares
+        @notice one storage write regardless of the number of participants
+    */
+    function publishRewardRoot(uint256 round, bytes32 root) public onlyOwner {
+        require(
+            rounds[round].merkleSettlement == true,
+            "Round is not settled with a Merkle root"
+        );
+        require(
+            rewardRoots[round] == bytes32(0),
+            "Reward root is already published"
+        );
+        rewardRoots[round] = root;
+        emit RewardRootPublished(round, root);
+    }
+
+    /**
+        @dev settles user share of the round settled with a Merkle root, the same way as _settleRewards
+        @param round id of the round
+        @param damage made by the user in the round
+        @param reward user share of the round reward
+        @param proof Merkle proof of the share
+        @notice internal function
+    */
+    function _settleRewardWithProof(
+        uint256 round,
+        uint256 damage,
+        uint256 reward,
+        bytes32[] calldata proof
+    ) internal {
+        bytes32 root = rewardRoots[round];
+        require(root != bytes32(0), "Reward root is not published");
+        require(
+            rewardRootClaims[round][msg.sender] == false,
+            "Reward is already claimed"
+        );
+        require(
+            GameProofs.verifyShare(
+                proof,
+                root,
+                msg.sender,
+                round,
+                damage,
+                reward
+            ),
+            "Invalid reward proof"
+        );
+        rewardRootClaims[round][msg.sender] = true;
+        usersRewards[msg.sender] += reward;
+        addAllowanceToUser(
+            msg.sender,
+            damage,
+            usersRewards[msg.sender],
+            rounds[round].bossId
+        );
+    }
+
+    /**
+        @dev settles user shares of the arenas whose boss is killed, the same way as _settleRewards
+        @dev share is calculated as boss reward * user damage / arena total damage
+        @param arenaIds ids of the arenas
+        @notice rewards are then claimed with claimRewards and mintRewardNFT
+    */
+    function settleArenaRewards(uint256[] calldata arenaIds) public {
+        for (uint256 i = 0; i < arenaIds.length; i++) {
+            _settleArenaReward(msg.sender, arenaIds[i]);
+        }
+    }
+
+    /**
+        @dev settles user share of the arena, see settleArenaRewards
+        @param user whos share should be settled
+        @param arenaId id of the arena
+        @notice internal function
+    */
+    function _settleArenaReward(address user, uint256 arenaId) internal {
+        Boss memory boss = arenaBosses[arenaId];
+        require(
+            arenaId > 0 && arenaId <= arenasOpened && boss.hp == 0,
+            "Arena boss is not killed"
+        );
+        uint256 damage = arenaDamage[arenaId][user];
+        require(damage > 0, "You have no reward in this arena");
+        delete arenaDamage[arenaId][user];
+        usersRewards[user] +=
+            (uint256(boss.reward) * damage) /
+            arenaTotalDamage[arenaId];
+        addAllowanceToUser(user, damage, usersRewards[user], boss.id);
+    }
+
+    /**
+        @dev calculates user share of the finished round that is not settled yet
+        @param user address of user
+        @return settled false if user has damage in the finished round
+        @return reward user share of the round reward
+    */
+    function _unsettledReward(address user)
+        internal
+        view
+        returns (bool settled, uint256 reward)
+    {
+        uint256 damage = damageMade[user];
+        uint256 round = usersRound[user];
+        if (damage == 0 || round == currentRound) {
+            return (true, 0);
+        }
+        Round storage finishedRound = rounds[round];
+        return (
+            false,
+            (finishedRound.reward * damage) / finishedRound.totalDamage
+        );
+    }
+
+    /**
+        @dev Returns state of many players in one call, for dashboards and bots
+        @dev rewards and pendingRewardNFTs include the share of the finished round that is not settled yet
+        @param players addresses of players
+        @return states in the same order as players
+    */
+    function getPlayers(address[] calldata players)
+        external
+        view
+        returns (PlayerState[] memory states)
+    {
+        states = new PlayerState[](players.length);
+        for (uint256 i = 0; i < players.length; i++) {
+            address player = players[i];
+            (bool settled, uint256 reward) = _unsettledReward(player);
+            states[i] = PlayerState(
+                usersCharacters[player],
+                damageMade[player],
+                usersRound[player],
+                usersRewards[player] + reward,
+                pendingRewardNFTs(player) + (settled ? 0 : 1)
             );
-            delete damageMade[users[i]];
-            delete users[i];
         }
-        _totalUsers = 0;
-        _totalDamage = 0;
+    }
+
+    /**
+        @dev Returns the current boss and the round in one call
+        @return boss current boss
+        @return isBossAlive true if boss may be attacked
+        @return round id of the current round
+        @return totalDamage made to the boss in the current round
+    */
+    function getRoundState()
+        external
+        view
+        returns (
+            Boss memory boss,
+            bool isBossAlive,
+            uint256 round,
+            uint256 totalDamage
+        )
+    {
+        return (
+            currentBoss,
+            bossAlive,
+            currentRound,
+            rounds[currentRound].totalDamage
+        );
     }
 
     /**
@@ -204,11 +551,21 @@ contract WorldOfLedger is WorldOfLedgerFactory, RewardNFT {
         @notice user should have attacked dead boss to get reward NFT 
     */
     function mintRewardNFT() public {
+        _mintRewardNFT(msg.sender);
+    }
+
+    /**
+        @dev mints reward NFTs of the user, see mintRewardNFT
+        @param user who receives the NFTs
+        @notice internal function
+    */
+    function _mintRewardNFT(address user) internal {
+        _settleRewards(user);
         require(
-            userToNFTAllowed[msg.sender].length > 0,
+            pendingRewardNFTs(user) > 0,
             "User doesn't have any NFT to mint"
         );
-        _mintReward(msg.sender);
+        _mintReward(user);
     }
 
     /**
@@ -216,18 +573,171 @@ contract WorldOfLedger is WorldOfLedgerFactory, RewardNFT {
         @dev characters get experience according to the damage made to boss and get level update accordinaly
     */
     function claimRewards() public {
-        _addExperience(msg.sender, usersRewards[msg.sender]);
-        _updateUserLevel(msg.sender);
-        _clearRewards(msg.sender);
+        _claimRewards(msg.sender);
+    }
+
+    /**
+        @dev claims rewards of the user, see claimRewards
+        @param user whos rewards should be claimed
+        @notice internal function
+    */
+    function _claimRewards(address user) internal {
+        _settleRewards(user);
+        _addExperience(user, usersRewards[user]);
+        _updateUserLevel(user);
+        _clearRewards(user);
+    }
+
+    /**
+        @dev claims rewards like claimRewards, with the share of a round settled with a Merkle root
+        @param round id of the round
+        @param damage made by the user in the round
+        @param reward user share of the round reward
+        @param proof Merkle proof of the share
+    */
+    function claimRewardsWithProof(
+        uint256 round,
+        uint256 damage,
+        uint256 reward,
+        bytes32[] calldata proof
+    ) public {
+        _settleRewardWithProof(round, damage, reward, proof);
+        _claimRewards(msg.sender);
+    }
+
+    /**
+        @dev mints reward NFTs like mintRewardNFT, with the share of a round settled with a Merkle root
+        @param round id of the round
+        @param damage made by the user in the round
+        @param reward user share of the round reward
+        @param proof Merkle proof of the share
+    */
+    function mintRewardNFTWithProof(
+        uint256 round,
+        uint256 damage,
+        uint256 reward,
+        bytes32[] calldata proof
+    ) public {
+        _settleRewardWithProof(round, damage, reward, proof);
+        _mintRewardNFT(msg.sender);
+    }
+
+    /**
+        @dev performs a sequence of actions in one transaction, in the given order
+        @dev saves the base transaction cost of every action, and storage of the player
+             is read cold only by the first action
+        @param actions kind and argument of every action, see ACTION_* constants
+        @notice reverts altogether if any action reverts
+    */
+    function performActions(Action[] calldata actions) public {
+        _performActions(msg.sender, actions);
+    }
+
+    /**
+        @dev performs actions of many players signed with EIP-712, so a relayer may send them in one transaction
+        @dev every player signs PlayerActions(player, actions, nonce, deadline) with the next nonce of actionNonces
+        @param bundle signed actions of the players
+        @notice reverts altogether if any signature is not valid or any action reverts
+    */
+    function relayActions(SignedActions[] calldata bundle) public {
+        for (uint256 i = 0; i < bundle.length; i++) {
+            SignedActions calldata signed = bundle[i];
+            require(
+                block.timestamp <= signed.deadline,
+                "Signed actions expired"
+            );
+            bytes32 digest = actionsDigest(
+                signed.player,
+                signed.actions,
+                actionNonces[signed.player]++,
+                signed.deadline
+            );
+            require(
+                GameProofs.recoverSigner(digest, signed.signature) ==
+                    signed.player,
+                "Invalid actions signature"
+            );
+            _performActions(signed.player, signed.actions);
+        }
+    }
+
+    /**
+        @dev EIP-712 digest of the actions the player signs for relayActions
+        @param player who performs the actions
+        @param actions kind and argument of every action
+        @param nonce the next nonce of the player in actionNonces
+        @param deadline timestamp after which the actions can't be relayed
+        @return bytes32 digest
+    */
+    function actionsDigest(
+        address player,
+        Action[] calldata actions,
+        uint256 nonce,
+        uint256 deadline
+    ) public view returns (bytes32) {
+        bytes32[] memory actionHashes = new bytes32[](actions.length);
+        for (uint256 i = 0; i < actions.length; i++) {
+            actionHashes[i] = keccak256(
+                abi.encode(ACTION_TYPEHASH, actions[i].kind, actions[i].arg)
+            );
+        }
+        return
+            _hashTypedDataV4(
+                keccak256(
+                    abi.encode(
+                        PLAYER_ACTIONS_TYPEHASH,
+                        player,
+                        keccak256(abi.encodePacked(actionHashes)),
+                        nonce,
+                        deadline
+                    )
+                )
+            );
+    }
+
+    /**
+        @dev performs actions of the user, see performActions
+        @param user who performs the actions
+        @param actions kind and argument of every action
+        @notice internal function
+    */
+    function _performActions(address user, Action[] calldata actions)
+        internal
+    {
+        for (uint256 i = 0; i < actions.length; i++) {
+            uint8 kind = actions[i].kind;
+            uint256 arg = actions[i].arg;
+            if (kind == ACTION_ATTACK) {
+                _attackBoss(user);
+            } else if (kind == ACTION_ATTACK_ARENA) {
+                _attackArenaBoss(user, arg);
+            } else if (kind == ACTION_FIRE_BOLT) {
+                _castFireBolt(user);
+            } else if (kind == ACTION_HEAL) {
+                _healCharacter(user, address(uint160(arg)));
+            } else if (kind == ACTION_CLAIM_REWARDS) {
+                _claimRewards(user);
+            } else if (kind == ACTION_MINT_REWARD_NFT) {
+                _mintRewardNFT(user);
+            } else if (kind == ACTION_SETTLE_ARENA) {
+                _settleArenaReward(user, arg);
+            } else {
+                revert("Unknown action");
+            }
+        }
     }
 
     /**
         @dev internal function that adds experience to the character 
         @param user character whos experince should be changed
         @param amount of experience to add
+        @notice xp can't exceed the maximum of 96 bits, extra experience is lost
     */
     function _addExperience(address user, uint256 amount) internal {
-        usersCharacters[user].xp += amount;
+        uint256 xp = uint256(usersCharacters[user].xp) + amount;
+        usersCharacters[user].xp = xp > type(uint96).max
+            ? type(uint96).max
+            : uint96(xp);
     }
 
     /**
@@ -241,31 +751,30 @@ contract WorldOfLedger is WorldOfLedgerFactory, RewardNFT {
     /**
         @dev updated character level
         @dev level calculated as a square root of character xp multiplied to 20 and divided to 100
+        @dev sqrt(xp) * 20 / 100 rounded down equals sqrt(xp / 25) rounded down, computed
+            with the constant gas Math.sqrt. The level is written only when it changes
         @param user character whos level should be calculated
     */
     function _updateUserLevel(address user) internal {
-        uint256 newUserLevel = uint256(
-            ((_sqrt(usersCharacters[user].xp)) * 20) / 100
-        );
-        usersCharacters[user].level = newUserLevel;
-        _checkHealthAfterFight();
+        Character storage character = usersCharacters[user];
+        // xp fits 96 bits, so its square root and the level fit 48 bits
+        uint48 newUserLevel = uint48(Math.sqrt(character.xp / 25));
+        if (newUserLevel != character.level) {
+            character.level = newUserLevel;
+        }
     }
 
     /**
-        @dev calculates the square root of the number
-        @param y number from which we need a square root
-        @return z result of the math function
+        @dev token URI of the boss NFT for the reward NFT metadata
+        @param bossID id of the boss
+        @return string URI stored by populate_boss
     */
-    function _sqrt(uint256 y) internal pure returns (uint256 z) {
-        if (y > 3) {
-            z = y;
-            uint256 x = y / 2 + 1;
-            while (x < z) {
-                z = x;
-                x = (y / x + x) / 2;
-            }
-        } else if (y != 0) {
-            z = 1;
-        }
+    function _bossURI(uint256 bossID)
+        internal
+        view
+        override
+        returns (string memory)
+    {
+        return bossURIs[bossID];
     }
 }
@@ -3,6 +3,7 @@
 pragma solidity ^0.8.0;
 
 import "@openzeppelin/contracts/access/Ownable.sol";
+import "@openzeppelin/contracts/utils/math/SafeCast.sol";
 import "@chainlink/contracts/src/v0.8/interfaces/VRFCoordinatorV2Interface.sol";
 import "@chainlink/contracts/src/v0.8/VRFConsumerBaseV2.sol";
 import "@chainlink/contracts/src/v0.8/interfaces/LinkTokenInterface.sol";
@@ -24,32 +25,67 @@ contract WorldOfLedgerFactory is Ownable, VRFConsumerBaseV2 {
     uint16 requestConfirmations = 3;
     uint32 numWords = 2;
     uint32 callbackGasLimit = 500000;
+    // limits of the VRFCoordinatorV2 requests
+    uint32 constant MAX_NUM_WORDS = 500;
+    uint32 constant MAX_CALLBACK_GAS_LIMIT = 2500000;
+    // callback gas of the enrolled characters request: fixed part and part per character.
+    // A character costs about 36000 gas before refunds when every slot is cold: queue
+    // read and delete, enrolled delete, new usersCharacters slot and CharacterCreated
+    uint32 constant ENROLLMENT_CALLBACK_BASE_GAS = 60000;
+    uint32 constant ENROLLMENT_CALLBACK_CHARACTER_GAS = 50000;
+    uint32 public enrollmentBatchSize;
     uint64 public fireBoltCooldownPeriod;
     uint64 subscriptionId;
+    // minimal xp of the spell levels, packed with fireBoltCooldownPeriod
+    uint32 public healSpellXp;
+    uint32 public fireBoltSpellXp;
 
     mapping(uint256 => address) public requestIdToAddress;
-    mapping(uint256 => uint256[]) public requestIdToRandomWords;
     mapping(address => Character) public usersCharacters;
+    mapping(uint256 => string) public bossURIs;
+    Boss[] public bossQueue;
+    uint256 public bossQueueHead;
+    mapping(uint256 => Boss) public arenaBosses;
+    uint256 public arenasOpened;
+    address[] public enrollmentQueue;
+    uint256 public enrollmentQueueHead;
+    mapping(address => bool) public enrolled;
+    mapping(uint256 => EnrollmentBatch) public requestIdToEnrollmentBatch;
 
     event SubscriptionCreated(uint256 indexed subId);
     event ConsumerAdded(uint64 indexed subId, address consumer);
     event RequestedRandomness(uint256 requestId);
+    event RandomnessFulfilled(uint256 requestId);
+    event CharacterCreated(address user, uint256 hp, uint256 damage);
     event BossCreated(uint256 bossID, string tokenURI);
+    event BossesStaged(uint256 amount);
+    event ArenaOpened(uint256 arenaId, uint256 bossID, string tokenURI);
+    event CharacterEnrolled(address user);
+    event RequestedEnrolledCharacters(uint256 requestId, uint256 characters);
+    event EnrollmentBatchRetried(uint256 requestId, uint256 newRequestId);
 
+    /// @dev packed into a single storage slot
     struct Character {
-        uint256 hp;
-        uint256 damage;
-        uint256 xp;
-        uint256 level;
+        uint32 hp;
+        uint16 damage;
+        uint96 xp;
+        uint48 level;
         bool isAlive;
-        uint256 fireBoltTime;
+        uint40 fireBoltTime;
     }
 
+    /// @dev packed into a single storage slot
     struct Boss {
-        uint256 hp;
-        uint256 damage;
-        uint256 reward;
-        uint256 id;
+        uint96 hp;
+        uint32 damage;
+        uint96 reward;
+        uint32 id;
+    }
+
+    /// @dev enrolled users enrollmentQueue[start] ... enrollmentQueue[start + size - 1]
+    struct EnrollmentBatch {
+        uint128 start;
+        uint128 size;
     }
 
     /**
@@ -81,9 +117,10 @@ contract WorldOfLedgerFactory is Ownable, VRFConsumerBaseV2 {
         bossContractAddress = _bossContract;
         bossAlive = false;
 
-        healSpellLevel = 2;
-        fireBoltSpellLevel = 3;
+        _setHealSpellLevel(2);
+        _setFireBoltSpellLevel(3);
         fireBoltCooldownPeriod = 1 days;
+        enrollmentBatchSize = maxEnrollmentBatchSize();
     }
 
     /**
@@ -92,7 +129,7 @@ contract WorldOfLedgerFactory is Ownable, VRFConsumerBaseV2 {
         @notice Default character level to spell heal is 2
     */
     function setHealSpellLevel(uint8 newLevel) external onlyOwner {
-        healSpellLevel = newLevel;
+        _setHealSpellLevel(newLevel);
     }
 
     /**
@@ -101,7 +138,34 @@ contract WorldOfLedgerFactory is Ownable, VRFConsumerBaseV2 {
         @notice Default character level to spell firebolt is 3
     */
     function setFireBoltSpellLevel(uint8 newLevel) external onlyOwner {
+        _setFireBoltSpellLevel(newLevel);
+    }
+
+    /**
+        @dev sets the heal spell level and caches its minimal xp for the spell checks
+        @param newLevel The new level of heal spell
+    */
+    function _setHealSpellLevel(uint8 newLevel) internal {
+        healSpellLevel = newLevel;
+        healSpellXp = _levelXp(newLevel);
+    }
+
+    /**
+        @dev sets the firebolt spell level and caches its minimal xp for the spell checks
+        @param newLevel The new level of firebolt spell
+    */
+    function _setFireBoltSpellLevel(uint8 newLevel) internal {
         fireBoltSpellLevel = newLevel;
+        fireBoltSpellXp = _levelXp(newLevel);
+    }
+
+    /**
+        @dev minimal xp of the level: level = sqrt(xp) * 20 / 100 = sqrt(xp / 25)
+        @param level character level
+        @return uint32 25 * level ** 2, below 2 ** 21 for uint8 levels
+    */
+    function _levelXp(uint8 level) internal pure returns (uint32) {
+        return 25 * uint32(level) * level;
     }
 
     /**
@@ -113,6 +177,109 @@ contract WorldOfLedgerFactory is Ownable, VRFConsumerBaseV2 {
         fireBoltCooldownPeriod = timeInDays * 1 days;
     }
 
+    /**
+        @dev Change the number of characters created by one VRF request of the enrolled characters
+        @param newSize The new number of characters
+        @notice Default and maximum size is given by maxEnrollmentBatchSize
+    */
+    function setEnrollmentBatchSize(uint32 newSize) external onlyOwner {
+        require(
+            newSize > 0 && newSize <= maxEnrollmentBatchSize(),
+            "Batch size should be between 1 and maxEnrollmentBatchSize"
+        );
+        enrollmentBatchSize = newSize;
+    }
+
+    /**
+        @dev Maximum number of characters created by one VRF request
+        @return uint32 number of characters that fit both the words and the callback gas limits of the coordinator
+    */
+    function maxEnrollmentBatchSize() public pure returns (uint32) {
+        uint32 byGas = (MAX_CALLBACK_GAS_LIMIT - ENROLLMENT_CALLBACK_BASE_GAS) /
+            ENROLLMENT_CALLBACK_CHARACTER_GAS;
+        uint32 byWords = MAX_NUM_WORDS / 2;
+        return byGas < byWords ? byGas : byWords;
+    }
+
+    /**
+        @dev Enrolls user to the queue of characters created together by requestEnrolledCharacters
+        @notice Cheaper than createRandomCharacter, because one VRF request and callback is shared by the whole batch
+    */
+    function enrollCharacter() public {
+        require(
+            _userHasCharacter(msg.sender) == false,
+            "You can not create more then one character"
+        );
+        require(enrolled[msg.sender] == false, "You are already enrolled");
+        enrolled[msg.sender] = true;
+        enrollmentQueue.push(msg.sender);
+        emit CharacterEnrolled(msg.sender);
+    }
+
+    /**
+        @dev makes VRF requests for all enrolled users, one request per enrollmentBatchSize users
+        @dev every request asks for 2 words per character, callback gas limit is sized to the batch
+        @notice Anyone may call this function. Will revert if subscription is not set and funded.
+    */
+    function requestEnrolledCharacters() public {
+        uint256 head = enrollmentQueueHead;
+        uint256 queueLength = enrollmentQueue.length;
+        require(head < queueLength, "There are no enrolled users");
+        while (head < queueLength) {
+            uint256 size = queueLength - head;
+            if (size > enrollmentBatchSize) {
+                size = enrollmentBatchSize;
+            }
+            _requestEnrollmentBatch(head, size);
+            head += size;
+        }
+        enrollmentQueueHead = head;
+    }
+
+    /**
+        @dev requests random words again for an enrollment batch whose callback failed
+        @dev VRFCoordinatorV2 doesn't retry failed callbacks, so without a retry the users of
+             the batch would stay enrolled without a character and could not enroll again
+        @param requestId request of the batch, see RequestedEnrolledCharacters
+        @notice may be called only by the creator of the contract. A late fulfillment of the old request is ignored
+    */
+    function retryEnrollmentBatch(uint256 requestId) external onlyOwner {
+        EnrollmentBatch memory batch = requestIdToEnrollmentBatch[requestId];
+        require(batch.size != 0, "There is no pending enrollment batch");
+        delete requestIdToEnrollmentBatch[requestId];
+        uint256 newRequestId = _requestEnrollmentBatch(batch.start, batch.size);
+        emit EnrollmentBatchRetried(requestId, newRequestId);
+    }
+
+    /**
+        @dev makes the VRF request of the enrolled users enrollmentQueue[start] ... enrollmentQueue[start + size - 1]
+        @param start index of the first user of the batch in the queue
+        @param size number of users
+        @return requestId id of the VRF request
+        @notice internal function
+    */
+    function _requestEnrollmentBatch(uint256 start, uint256 size)
+        internal
+        returns (uint256 requestId)
+    {
+        requestId = COORDINATOR.requestRandomWords(
+            keyHash,
+            subscriptionId,
+            requestConfirmations,
+            uint32(
+                ENROLLMENT_CALLBACK_BASE_GAS +
+                    ENROLLMENT_CALLBACK_CHARACTER_GAS *
+                    size
+            ),
+            uint32(size * 2)
+        );
+        requestIdToEnrollmentBatch[requestId] = EnrollmentBatch(
+            uint128(start),
+            uint128(size)
+        );
+        emit RequestedEnrolledCharacters(requestId, size);
+    }
+
     /**
         @dev Creates random Character
         @notice User can not create second character if the first one alive
@@ -155,27 +322,102 @@ contract WorldOfLedgerFactory is Ownable, VRFConsumerBaseV2 {
     /**
         @dev Callback function called by VRFV2 Coordinator 
         @dev Creates user character and store it to the mapping
+        @dev random words are used straight from memory, and the request is deleted to get the gas refund
         @param requestId requestID got from requestRandomWords function
         @param randomWords 2 random numbers provided by VRFV2Coordinator for hp and damage
+        @notice emits RandomnessFulfilled, so monitors pair it with the request
+    */
+    function fulfillRandomWords(uint256 requestId, uint256[] memory randomWords)
+        internal
+        override
+    {
+        emit RandomnessFulfilled(requestId);
+        EnrollmentBatch memory batch = requestIdToEnrollmentBatch[requestId];
+        if (batch.size != 0) {
+            delete requestIdToEnrollmentBatch[requestId];
+            _createEnrolledCharacters(batch, randomWords);
+            return;
+        }
+
+        address user = requestIdToAddress[requestId];
+        if (user == address(0)) {
+            // old request of a retried enrollment batch
+            return;
+        }
+        delete requestIdToAddress[requestId];
+        _storeNewCharacter(user, randomWords[0], randomWords[1]);
+    }
+
+    /**
+        @dev stores the new character of the user and emits CharacterCreated
+        @dev the event carries the random stats, so the state can be replayed from events, see scripts/state_replay.py
+        @param user who receives the character
+        @param hpWord random number for hp
+        @param damageWord random number for damage
+        @notice internal function
+    */
+    function _storeNewCharacter(
+        address user,
+        uint256 hpWord,
+        uint256 damageWord
+    ) internal {
+        Character memory character = _newCharacter(hpWord, damageWord);
+        usersCharacters[user] = character;
+        emit CharacterCreated(user, character.hp, character.damage);
+    }
+
+    /**
+        @dev new character from two random words
+        @param hpWord random number for hp
+        @param damageWord random number for damage
+        @return Character
         @notice %100 sets the upper limit of the hp and damage
         @notice four other parameters of a new Character are:
              xp, level, firebolt cooldown time - set to 0
              isAlive - set to True
+        @notice internal function, the character is written to storage with a single slot write
     */
-    function fulfillRandomWords(uint256 requestId, uint256[] memory randomWords)
+    function _newCharacter(uint256 hpWord, uint256 damageWord)
         internal
-        override
+        pure
+        returns (Character memory)
     {
-        requestIdToRandomWords[requestId] = randomWords;
-
-        usersCharacters[requestIdToAddress[requestId]] = Character(
-            (requestIdToRandomWords[requestId][0] % 100) + 1,
-            (requestIdToRandomWords[requestId][1] % 100) + 1,
-            0,
-            0,
-            true,
-            0
-        );
+        return
+            Character(
+                uint32((hpWord % 100) + 1),
+                uint16((damageWord % 100) + 1),
+                0,
+                0,
+                true,
+                0
+            );
+    }
+
+    /**
+        @dev Creates characters of the enrolled users from words 2 * i and 2 * i + 1
+        @param batch enrolled users of the request
+        @param randomWords 2 random numbers per user provided by VRFV2Coordinator
+        @notice users who created a character with createRandomCharacter meanwhile are skipped
+        @notice internal function
+    */
+    function _createEnrolledCharacters(
+        EnrollmentBatch memory batch,
+        uint256[] memory randomWords
+    ) internal {
+        for (uint256 i = 0; i < batch.size; i++) {
+            uint256 index = batch.start + i;
+            address user = enrollmentQueue[index];
+            delete enrollmentQueue[index];
+            delete enrolled[user];
+            if (_userHasCharacter(user)) {
+                continue;
+            }
+            _storeNewCharacter(
+                user,
+                randomWords[2 * i],
+                randomWords[2 * i + 1]
+            );
+        }
     }
 
     /**
@@ -198,11 +440,28 @@ contract WorldOfLedgerFactory is Ownable, VRFConsumerBaseV2 {
         return usersCharacters[user].isAlive;
     }
 
+    /**
+        @dev Returns characters of many users in one call
+        @param users addresses of users
+        @return characters in the same order as users
+    */
+    function getCharacters(address[] calldata users)
+        external
+        view
+        returns (Character[] memory characters)
+    {
+        characters = new Character[](users.length);
+        for (uint256 i = 0; i < users.length; i++) {
+            characters[i] = usersCharacters[users[i]];
+        }
+    }
+
     /**
         @dev creates new Boss 
         @param hp uint number of health points of the new boss 
         @param damage uint number of damage made by the new boss 
         @param reward uint number of reward for boss killing 
+        @notice hp and reward should fit 96 bits, damage should fit 32 bits
         @notice may be called only by the creator of the contract 
         @notice boss id is a pseudo random number
         @notice emits BossCreated event with bossId and it's uri 
@@ -230,11 +489,96 @@ contract WorldOfLedgerFactory is Ownable, VRFConsumerBaseV2 {
             )
         ) % totalSupply) + 1;
         string memory bossURI = bossContract.tokenURI(id);
-        currentBoss = Boss(hp, damage, reward, id);
+        // boss ids repeat, the URI is stored only the first time
+        if (bytes(bossURIs[id]).length == 0) {
+            bossURIs[id] = bossURI;
+        }
+        currentBoss = Boss(
+            SafeCast.toUint96(hp),
+            SafeCast.toUint32(damage),
+            SafeCast.toUint96(reward),
+            SafeCast.toUint32(id)
+        );
         bossAlive = true;
         emit BossCreated(id, bossURI);
     }
 
+    /**
+        @dev stages bosses that spawn one after another when the previous boss is killed
+        @dev URIs of new boss ids are fetched from the boss contract here, so spawning makes no external calls
+        @param bosses hp, damage, reward and id of every boss, in spawn order
+        @notice may be called only by the creator of the contract
+        @notice the first boss spawns right away if there is no alive boss
+    */
+    function stageBosses(Boss[] calldata bosses) external onlyOwner {
+        INFTInterface bossContract = INFTInterface(bossContractAddress);
+        uint256 totalSupply = bossContract.totalSupply();
+        for (uint256 i = 0; i < bosses.length; i++) {
+            uint256 id = bosses[i].id;
+            require(id > 0 && id <= totalSupply, "Boss NFT doesn't exist");
+            require(bosses[i].hp > 0, "Boss should have hp");
+            if (bytes(bossURIs[id]).length == 0) {
+                bossURIs[id] = bossContract.tokenURI(id);
+            }
+            bossQueue.push(bosses[i]);
+        }
+        emit BossesStaged(bosses.length);
+        if (bossAlive == false) {
+            _spawnStagedBoss();
+        }
+    }
+
+    /**
+        @dev number of staged bosses that didn't spawn yet
+        @return uint number of bosses
+    */
+    function stagedBosses() public view returns (uint256) {
+        return bossQueue.length - bossQueueHead;
+    }
+
+    /**
+        @dev spawns the next staged boss, if there is any
+        @notice internal function, one storage read and write, no external calls
+    */
+    function _spawnStagedBoss() internal {
+        uint256 head = bossQueueHead;
+        if (head == bossQueue.length) {
+            return;
+        }
+        Boss memory boss = bossQueue[head];
+        delete bossQueue[head];
+        bossQueueHead = head + 1;
+        currentBoss = boss;
+        bossAlive = true;
+        emit BossCreated(boss.id, bossURIs[boss.id]);
+    }
+
+    /**
+        @dev opens arenas, each with its own boss alive at the same time as the current boss
+        @dev arenas are attacked with attackBoss(arenaId) and have their own damage ledgers,
+             so attacks of different arenas don't write the same storage slots
+        @param bosses hp, damage, reward and id of the boss of every arena
+        @notice may be called only by the creator of the contract
+        @notice arena ids are consecutive, starting from 1
+    */
+    function openArenas(Boss[] calldata bosses) external onlyOwner {
+        INFTInterface bossContract = INFTInterface(bossContractAddress);
+        uint256 totalSupply = bossContract.totalSupply();
+        uint256 arenaId = arenasOpened;
+        for (uint256 i = 0; i < bosses.length; i++) {
+            uint256 id = bosses[i].id;
+            require(id > 0 && id <= totalSupply, "Boss NFT doesn't exist");
+            require(bosses[i].hp > 0, "Boss should have hp");
+            if (bytes(bossURIs[id]).length == 0) {
+                bossURIs[id] = bossContract.tokenURI(id);
+            }
+            arenaId++;
+            arenaBosses[arenaId] = bosses[i];
+            emit ArenaOpened(arenaId, id, bossURIs[id]);
+        }
+        arenasOpened = arenaId;
+    }
+
     /**
         @dev Funds VRFV2Coordinator subscription to pay for random numbers
         @param amount of link token funding
@@ -0,0 +1,84 @@
+"""Batched player actions and signed action bundles for relayers.
+
+`performActions` runs several actions of one player in one transaction and
+`relayActions` runs actions of many players, each signed with EIP-712, in one
+transaction of a relayer. This module encodes and signs the actions, see
+`benchmark_action_bundles` in scripts/gas_benchmark.py for their gas.
+"""
+from eth_account import Account as EthAccount
+from eth_account.messages import encode_typed_data
+
+from brownie import chain
+
+
+ACTIONS = {
+    "attackBoss": 0,
+    "attackArenaBoss": 1,
+    "castFireBolt": 2,
+    "healCharacter": 3,
+    "claimRewards": 4,
+    "mintRewardNFT": 5,
+    "settleArenaRewards": 6,
+}
+DEADLINE = 3600
+
+
+def action(name, arg=0):
+    """Action tuple of performActions. arg is the healed user for healCharacter
+    and the arena id for the arena actions.
+    """
+    if isinstance(arg, str) or hasattr(arg, "address"):
+        arg = int(str(arg), 16)
+    return (ACTIONS[name], arg)
+
+
+def typed_actions(game, player, actions, nonce, deadline):
+    """EIP-712 typed data of the actions, as wallets sign them"""
+    return {
+        "types": {
+            "EIP712Domain": [
+                {"name": "name", "type": "string"},
+                {"name": "version", "type": "string"},
+                {"name": "chainId", "type": "uint256"},
+                {"name": "verifyingContract", "type": "address"},
+            ],
+            "PlayerActions": [
+                {"name": "player", "type": "address"},
+                {"name": "actions", "type": "Action[]"},
+                {"name": "nonce", "type": "uint256"},
+                {"name": "deadline", "type": "uint256"},
+            ],
+            "Action": [
+                {"name": "kind", "type": "uint8"},
+                {"name": "arg", "type": "uint256"},
+            ],
+        },
+        "primaryType": "PlayerActions",
+        "domain": {
+            "name": "WorldOfLedger",
+            "version": "1",
+            "chainId": chain.id,
+            "verifyingContract": game.address,
+        },
+        "message": {
+            "player": str(player),
+            "actions": [{"kind": kind, "arg": arg} for kind, arg in actions],
+            "nonce": nonce,
+            "deadline": deadline,
+        },
+    }
+
+
+def sign_actions(game, player, actions, deadline=None):
+    """Signs the actions of a local account for relayActions with its next nonce.
+
+    Returns:
+        SignedActions tuple of relayActions
+    """
+    if deadline is None:
+        deadline = chain.time() + DEADLINE
+    message = typed_actions(game, player, actions, game.actionNonces(player), deadline)
+    signed = EthAccount.sign_message(
+        encode_typed_data(full_message=message), player.private_key
+    )
+    return (player.address, actions, deadline, bytes(signed.signature))
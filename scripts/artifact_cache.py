@@ -0,0 +1,165 @@
+"""Compact cache of the contract ABIs for read-only tools.
+
+Brownie build artifacts hold bytecode, source maps and the AST next to the ABI,
+and loading the Brownie project compiles or reads all of them. Indexers and
+dashboards only need the ABI and the event topics, so this module copies them to
+a small per-contract file the first time an artifact is read, and reads the small
+file while the build hash (bytecodeSha1) of the artifact is unchanged. The hash is
+found with a byte search of the artifact, which takes a fraction of the time of
+parsing it. Nothing here imports Brownie.
+
+    python -m scripts.artifact_cache [contract] [runs]
+        measures cold start of a fresh interpreter with each way of loading the ABI
+"""
+import json
+import mmap
+import os
+import statistics
+import subprocess
+import sys
+import time
+from functools import lru_cache
+from pathlib import Path
+
+
+PROJECT_PATH = Path(__file__).parent.parent
+BUILD_PATH = PROJECT_PATH / "build" / "contracts"
+CACHE_PATH = PROJECT_PATH / ".abi_cache"
+BUILD_HASH_KEY = b'"bytecodeSha1": "'
+
+
+def build_hash(path):
+    """bytecodeSha1 of a Brownie artifact, without parsing the JSON, or None"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            start = data.find(BUILD_HASH_KEY)
+            if start == -1:
+                return None
+            start += len(BUILD_HASH_KEY)
+            return data[start : data.find(b'"', start)].decode()
+
+
+def _fingerprint(path):
+    # artifacts without a build hash fall back to their size and mtime
+    hash_ = build_hash(path)
+    if hash_ is not None:
+        return [hash_]
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def event_signature(event_abi):
+    types = ",".join(i["type"] for i in event_abi["inputs"])
+    return f"{event_abi['name']}({types})"
+
+
+def _compact(artifact):
+    # eth_utils takes longer to import than the cached ABI to read, so it is
+    # imported only when the cache is rebuilt
+    from eth_utils import keccak, to_hex
+
+    events = [item for item in artifact["abi"] if item.get("type") == "event"]
+    return {
+        "build_hash": artifact.get("bytecodeSha1"),
+        "abi": artifact["abi"],
+        "topics": {
+            event_signature(event): to_hex(keccak(text=event_signature(event)))
+            for event in events
+        },
+    }
+
+
+@lru_cache(maxsize=None)
+def _load(artifact_path, cache_path, fingerprint):
+    cache_file = Path(cache_path) / f"{Path(artifact_path).stem}.json"
+    try:
+        with open(cache_file) as f:
+            cached = json.load(f)
+        if cached["fingerprint"] == list(fingerprint):
+            return cached
+    except (OSError, ValueError, KeyError):
+        pass
+    with open(artifact_path) as f:
+        cached = _compact(json.load(f))
+    cached["fingerprint"] = list(fingerprint)
+    os.makedirs(cache_path, exist_ok=True)
+    # written aside and renamed, so a concurrent reader never sees half a file
+    temporary = cache_file.with_suffix(f".{os.getpid()}.tmp")
+    with open(temporary, "w") as f:
+        json.dump(cached, f)
+    os.replace(temporary, cache_file)
+    return cached
+
+
+def load_artifact(name, build_path=BUILD_PATH, cache_path=CACHE_PATH):
+    """Returns the compact artifact of a contract: build hash, ABI and event topics.
+    The cache is rebuilt when the build hash of the artifact changes.
+
+    Args:
+        name (string): contract name, for example "WorldOfLedger"
+        build_path (string): directory of the Brownie artifacts
+        cache_path (string): directory of the compact artifacts
+
+    Returns:
+        dict with "build_hash", "abi" and "topics" ({event signature: topic})
+    """
+    artifact_path = os.path.join(build_path, f"{name}.json")
+    return _load(artifact_path, str(cache_path), tuple(_fingerprint(artifact_path)))
+
+
+def load_abi(name, build_path=BUILD_PATH, cache_path=CACHE_PATH):
+    return load_artifact(name, build_path, cache_path)["abi"]
+
+
+def event_topics(name, build_path=BUILD_PATH, cache_path=CACHE_PATH):
+    """{event name: topic} of the events of a contract"""
+    topics = load_artifact(name, build_path, cache_path)["topics"]
+    return {signature.split("(")[0]: topic for signature, topic in topics.items()}
+
+
+_handles = {}
+
+
+def get_contract_handle(w3, name, address, build_path=BUILD_PATH):
+    """web3 contract of the cached ABI, memoized per provider and address"""
+    from eth_utils import to_checksum_address
+
+    provider = getattr(w3.provider, "endpoint_uri", None) or id(w3.provider)
+    key = (provider, name, to_checksum_address(address))
+    if key not in _handles:
+        _handles[key] = w3.eth.contract(address=key[2], abi=load_abi(name, build_path))
+    return _handles[key]
+
+
+COLD_STARTS = {
+    "full artifact": "import json; json.load(open({path!r}))['abi']",
+    "cached abi": "from scripts.artifact_cache import load_abi; load_abi({name!r})",
+    "brownie project": "from brownie import project; project.load({project!r}).{name}.abi",
+}
+
+
+def measure_cold_start(statement, runs):
+    """Median wall time of a fresh interpreter running the statement"""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], cwd=PROJECT_PATH, check=True)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main(name="WorldOfLedger", runs=5):
+    runs = int(runs)
+    path = str(BUILD_PATH / f"{name}.json")
+    # the first load writes the cache, the measured ones read it
+    load_artifact(name)
+    print(f"cold start loading the {name} ABI, median of {runs} runs")
+    for mode, template in COLD_STARTS.items():
+        statement = template.format(path=path, name=name, project=str(PROJECT_PATH))
+        print(f"{mode:>16} | {measure_cold_start(statement, runs) * 1000:>8.0f} ms")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,158 @@
+"""Concurrent eth_getLogs fetching for the event indexer.
+
+Block ranges are requested through web3's async provider with at most `concurrency`
+requests in flight, and delivered to the consumer strictly in block order. A range
+the provider rejects as too large is bisected, other failures are retried.
+"""
+import asyncio
+from collections import deque
+
+import aiohttp
+from eth_utils import to_int
+from hexbytes import HexBytes
+from web3 import AsyncHTTPProvider
+
+
+# parts of the error messages providers return for eth_getLogs over too many blocks or logs
+TOO_LARGE_ERRORS = (
+    "more than",
+    "too many",
+    "too large",
+    "block range",
+    "exceeded",
+    "is limited to",
+)
+
+
+class RangeTooLarge(Exception):
+    pass
+
+
+class AsyncLogFetcher:
+    """Fetches logs of one contract over many block ranges in parallel.
+
+    Args:
+        rpc_url (string): HTTP endpoint of the node
+        address (string): contract address
+        topics (list): topics filter of eth_getLogs
+        concurrency (int): maximum number of requests in flight
+        chunk_size (int): size of the block range of one request
+        max_retries (int): retries of a failed range before giving up
+        retry_delay (float): delay before the first retry in seconds, doubled every retry
+    """
+
+    def __init__(
+        self,
+        rpc_url,
+        address,
+        topics,
+        concurrency=8,
+        chunk_size=2000,
+        max_retries=3,
+        retry_delay=0.5,
+    ):
+        self.provider = AsyncHTTPProvider(rpc_url)
+        self.session = None
+        self.address = address
+        self.topics = topics
+        self.concurrency = concurrency
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+
+    async def _make_request(self, method, params):
+        if self.session is None:
+            # one pooled session for all requests, closed by `close`
+            self.session = aiohttp.ClientSession()
+            await self.provider.cache_async_session(self.session)
+        return await self.provider.make_request(method, params)
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def block_number(self):
+        response = await self._make_request("eth_blockNumber", [])
+        return to_int(hexstr=response["result"])
+
+    async def iter_ranges(self, start, end):
+        """Yields (last block of the range, logs of the range) in block order while
+        up to `concurrency` following ranges are already being fetched.
+        """
+        ranges = (
+            (chunk_start, min(chunk_start + self.chunk_size - 1, end))
+            for chunk_start in range(start, end + 1, self.chunk_size)
+        )
+        window = deque()
+        try:
+            for chunk_start, chunk_end in ranges:
+                task = asyncio.ensure_future(self.fetch(chunk_start, chunk_end))
+                window.append((chunk_end, task))
+                if len(window) >= self.concurrency:
+                    chunk_end, task = window.popleft()
+                    yield chunk_end, await task
+            while window:
+                chunk_end, task = window.popleft()
+                yield chunk_end, await task
+        finally:
+            for _, task in window:
+                task.cancel()
+
+    async def fetch(self, start, end):
+        """Returns logs of the range, bisecting it while the provider rejects it as too large"""
+        try:
+            return await self._fetch_with_retry(start, end)
+        except RangeTooLarge:
+            if start == end:
+                raise
+            middle = (start + end) // 2
+            first, second = await asyncio.gather(
+                self.fetch(start, middle), self.fetch(middle + 1, end)
+            )
+            return first + second
+
+    async def _fetch_with_retry(self, start, end):
+        delay = self.retry_delay
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await self._get_logs(start, end)
+            except (IOError, aiohttp.ClientError, asyncio.TimeoutError):
+                if attempt == self.max_retries:
+                    raise
+            await asyncio.sleep(delay)
+            delay *= 2
+
+    async def _get_logs(self, start, end):
+        response = await self._make_request(
+            "eth_getLogs",
+            [
+                {
+                    "address": self.address,
+                    "fromBlock": hex(start),
+                    "toBlock": hex(end),
+                    "topics": self.topics,
+                }
+            ],
+        )
+        if "error" in response:
+            message = str(response["error"].get("message", "")).lower()
+            if any(error in message for error in TOO_LARGE_ERRORS):
+                raise RangeTooLarge(message)
+            raise IOError(response["error"])
+        return [_format_log(log) for log in response["result"]]
+
+
+def _format_log(log):
+    """Converts JSON-RPC log to the format web3 returns, so it may be decoded the same way"""
+    return {
+        "address": log["address"],
+        "topics": [HexBytes(topic) for topic in log["topics"]],
+        "data": HexBytes(log["data"]),
+        "blockNumber": to_int(hexstr=log["blockNumber"]),
+        "blockHash": HexBytes(log["blockHash"]),
+        "logIndex": to_int(hexstr=log["logIndex"]),
+        "transactionHash": HexBytes(log["transactionHash"]),
+        "transactionIndex": to_int(hexstr=log["transactionIndex"]),
+        "removed": log.get("removed", False),
+    }
@@ -0,0 +1,109 @@
+"""Batched reads of the game state for dashboards and bots.
+
+Instead of one eth_call per getter and player, players are read with the
+`getPlayers` view in chunks of `chunk_size` addresses, and the boss with the
+round with one `getRoundState` call.
+
+    brownie run scripts/batch_reader.py main [players] [chunk size]
+        compares latency of the per-getter loop with the batched reads
+"""
+import time
+
+from scripts.helpful_scripts import get_account, get_players
+from scripts.gas_benchmark import setup_game, create_characters
+
+
+DEFAULT_CHUNK_SIZE = 500
+CHARACTER_FIELDS = ("hp", "damage", "xp", "level", "isAlive", "fireBoltTime")
+BOSS_FIELDS = ("hp", "damage", "reward", "id")
+
+
+def _chunks(items, chunk_size):
+    for start in range(0, len(items), chunk_size):
+        yield items[start : start + chunk_size]
+
+
+def read_players(game, addresses, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Reads state of the players with one eth_call per `chunk_size` addresses.
+    Rewards and pending NFTs include the share of the finished round that is not
+    settled yet.
+
+    Args:
+        game (Contract): WorldOfLedger contract
+        addresses (list): addresses of the players
+        chunk_size (int): addresses in one call, limited by the node call gas cap
+
+    Returns:
+        dict of player state by address
+    """
+    players = {}
+    for chunk in _chunks(list(addresses), chunk_size):
+        for address, state in zip(chunk, game.getPlayers(chunk)):
+            character, damage_made, round_id, rewards, pending_nfts = state
+            players[address] = {
+                "character": dict(zip(CHARACTER_FIELDS, character)),
+                "damageMade": damage_made,
+                "round": round_id,
+                "rewards": rewards,
+                "pendingRewardNFTs": pending_nfts,
+            }
+    return players
+
+
+def read_round_state(game):
+    """Reads the current boss and round with one eth_call"""
+    boss, boss_alive, round_id, total_damage = game.getRoundState()
+    return {
+        "boss": dict(zip(BOSS_FIELDS, boss)),
+        "bossAlive": boss_alive,
+        "round": round_id,
+        "totalDamage": total_damage,
+    }
+
+
+def read_players_per_getter(game, addresses):
+    """Reads the same data as `read_players` and `read_round_state` with the public
+    getters, one eth_call per value. Kept as the reference of the latency comparison.
+    """
+    players = {}
+    for address in addresses:
+        pending_nfts = game.pendingRewardNFTs(address)
+        players[address] = {
+            "character": dict(zip(CHARACTER_FIELDS, game.usersCharacters(address))),
+            "damageMade": game.damageMade(address),
+            "round": game.usersRound(address),
+            "rewards": game.usersRewards(address),
+            "pendingRewardNFTs": pending_nfts,
+            "allowedNFTs": [
+                game.userToNFTAllowed(address, i) for i in range(pending_nfts)
+            ],
+        }
+    round_state = {
+        "boss": dict(zip(BOSS_FIELDS, game.currentBoss())),
+        "bossAlive": game.bossAlive(),
+        "round": game.currentRound(),
+    }
+    return players, round_state
+
+
+def main(players=1000, chunk_size=DEFAULT_CHUNK_SIZE):
+    players, chunk_size = int(players), int(chunk_size)
+    coordinator, _, game = setup_game()
+    accounts = get_players(players)
+    create_characters(coordinator, game, accounts)
+    addresses = [account.address for account in accounts]
+    game.populate_boss(10**9, 0, 100, {"from": get_account()})
+
+    started = time.perf_counter()
+    read_players_per_getter(game, addresses)
+    per_getter = time.perf_counter() - started
+
+    started = time.perf_counter()
+    read_players(game, addresses, chunk_size)
+    read_round_state(game)
+    batched = time.perf_counter() - started
+
+    calls = -(-players // chunk_size) + 1
+    print(f"{players} players")
+    print(f"{'per getter':>12} | {per_getter:>8.2f} s | {players * 5 + 3:>6} calls")
+    print(f"{'batched':>12} | {batched:>8.2f} s | {calls:>6} calls")
@@ -1,10 +1,19 @@
-from brownie import WorldOfLedger, config, network
+from brownie import WorldOfLedger, GameProofs, RewardMetadata, config, network
 from scripts.helpful_scripts import get_account, get_contract
 
 
 def deploy_game():
     print(network.show_active())
     account = get_account()
+    # linked libraries, reused by later deployments on the same network
+    for library in (RewardMetadata, GameProofs):
+        if len(library) == 0:
+            library.deploy(
+                {"from": account},
+                publish_source=config["networks"][network.show_active()].get(
+                    "verify", False
+                ),
+            )
 
     world_of_ledger = WorldOfLedger.deploy(
         get_contract("vrf_v2_coordinator"),
@@ -0,0 +1,297 @@
+"""Streaming, resumable indexer of the World Of Ledger events.
+
+Pages through the chain history in adaptive block ranges, decodes the game events
+with the build ABI and stores them to a local SQLite database together with the
+last indexed block. Every run continues from that checkpoint, and only one block
+range is kept in memory at a time.
+
+    brownie run scripts/event_indexer.py main <contract address> [from block] [database] [concurrency]
+"""
+import asyncio
+import json
+import os
+import sqlite3
+from functools import lru_cache
+
+from eth_utils import keccak, to_checksum_address, to_hex
+from web3 import Web3
+from web3.exceptions import Web3RPCError
+
+from scripts.async_log_fetcher import AsyncLogFetcher
+from scripts import artifact_cache
+
+
+DEFAULT_RPC_URL = "https://goerli.infura.io/v3/7755d5bcc3fe48e39078a9b963f1f3bf"
+DEFAULT_DATABASE = "world_of_ledger_events.sqlite"
+INDEXED_EVENTS = ["BossCreated", "DamageMade", "RequestedRandomness", "Transfer"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    address TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    transaction_hash TEXT NOT NULL,
+    event TEXT NOT NULL,
+    args TEXT NOT NULL,
+    PRIMARY KEY (address, block_number, log_index)
+);
+CREATE INDEX IF NOT EXISTS events_by_name ON events (address, event, block_number);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    address TEXT PRIMARY KEY,
+    last_block INTEGER NOT NULL
+);
+"""
+
+
+def load_abi(name="WorldOfLedger"):
+    """ABI from the compact artifact cache, see scripts/artifact_cache.py"""
+    return artifact_cache.load_abi(name)
+
+
+def _to_json_value(value):
+    if isinstance(value, bytes):
+        return to_hex(value)
+    return value
+
+
+class EventIndexer:
+    """Indexes events of one contract to SQLite.
+
+    Args:
+        w3 (Web3): connected web3 instance
+        address (string): address of the WorldOfLedger contract
+        abi (list): contract ABI, see `load_abi`
+        database (string): path to the SQLite database
+        from_block (int): first block to index if there is no checkpoint yet
+        confirmations (int): blocks behind the head that are not indexed yet
+        chunk_size (int): initial size of the block range of one eth_getLogs call
+        max_chunk_size (int): upper limit of the block range
+        target_logs (int): the range shrinks when one call returns more logs
+        event_names (list): names of the indexed events
+    """
+
+    def __init__(
+        self,
+        w3,
+        address,
+        abi,
+        database=DEFAULT_DATABASE,
+        from_block=0,
+        confirmations=0,
+        chunk_size=2000,
+        max_chunk_size=100000,
+        target_logs=5000,
+        event_names=INDEXED_EVENTS,
+    ):
+        self.w3 = w3
+        self.address = to_checksum_address(address)
+        self.from_block = from_block
+        self.confirmations = confirmations
+        self.chunk_size = chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.target_logs = target_logs
+        self.event_abis = {}
+        self.decoders = {}
+        for abi_item in abi:
+            if abi_item.get("type") == "event" and abi_item["name"] in event_names:
+                topic = _event_topic(abi_item)
+                self.event_abis[topic] = abi_item
+                self.decoders[topic] = EventDecoder(w3.codec, abi_item)
+        self.db = sqlite3.connect(database)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    @property
+    def last_block(self):
+        """Last indexed block or None if the contract was not indexed yet"""
+        row = self.db.execute(
+            "SELECT last_block FROM checkpoints WHERE address = ?", (self.address,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def run(self, to_block=None):
+        """Indexes events up to `to_block` (default: head minus confirmations).
+
+        Returns:
+            int: number of stored events
+        """
+        if to_block is None:
+            to_block = self.w3.eth.block_number - self.confirmations
+        last_block = self.last_block
+        start = self.from_block if last_block is None else last_block + 1
+        stored = 0
+        for chunk_end, events in self.iter_chunks(start, to_block):
+            self._store(events, chunk_end)
+            stored += len(events)
+        return stored
+
+    async def run_async(self, fetcher, to_block=None):
+        """Same as `run`, but block ranges are fetched concurrently by `fetcher`,
+        see scripts/async_log_fetcher.py. Ranges are still stored in block order.
+
+        Returns:
+            int: number of stored events
+        """
+        try:
+            if to_block is None:
+                to_block = await fetcher.block_number() - self.confirmations
+            last_block = self.last_block
+            start = self.from_block if last_block is None else last_block + 1
+            stored = 0
+            async for chunk_end, logs in fetcher.iter_ranges(start, to_block):
+                events = [self.decode(log) for log in logs]
+                self._store(events, chunk_end)
+                stored += len(events)
+            return stored
+        finally:
+            await fetcher.close()
+
+    @property
+    def topics(self):
+        """eth_getLogs topics filter matching any of the indexed events"""
+        return [list(self.event_abis)]
+
+    def iter_chunks(self, start, end):
+        """Yields (last block of the range, decoded events of the range) in block order.
+        The range grows while calls are cheap and shrinks when the provider fails
+        or returns too many logs.
+        """
+        while start <= end:
+            chunk_end = min(start + self.chunk_size - 1, end)
+            try:
+                logs = self._get_logs(start, chunk_end)
+            # providers reject too large ranges with a JSON-RPC error
+            except (Web3RPCError, ValueError, IOError):
+                if self.chunk_size == 1:
+                    raise
+                self.chunk_size = max(self.chunk_size // 2, 1)
+                continue
+            if len(logs) > self.target_logs and self.chunk_size > 1:
+                self.chunk_size = max(self.chunk_size // 2, 1)
+            elif len(logs) < self.target_logs // 2:
+                self.chunk_size = min(self.chunk_size * 2, self.max_chunk_size)
+            yield chunk_end, [self.decode(log) for log in logs]
+            start = chunk_end + 1
+
+    def _get_logs(self, start, end):
+        return self.w3.eth.get_logs(
+            {
+                "address": self.address,
+                "fromBlock": start,
+                "toBlock": end,
+                "topics": self.topics,
+            }
+        )
+
+    def decode(self, log):
+        return self.decoders[to_hex(log["topics"][0])](log)
+
+    def _store(self, events, last_block):
+        # events and the checkpoint are committed together, so a crash never skips events
+        with self.db:
+            self.db.executemany(
+                "INSERT OR IGNORE INTO events VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        self.address,
+                        event["blockNumber"],
+                        event["logIndex"],
+                        to_hex(event["transactionHash"]),
+                        event["event"],
+                        json.dumps(
+                            {k: _to_json_value(v) for k, v in event["args"].items()}
+                        ),
+                    )
+                    for event in events
+                ],
+            )
+            self.db.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?)",
+                (self.address, last_block),
+            )
+
+
+class EventDecoder:
+    """Decodes logs of one event to dicts with the same keys as web3 event data.
+    Types are resolved once per event instead of once per log, which is what makes
+    decoding with web3 `get_event_data` the bottleneck of a long history.
+    """
+
+    def __init__(self, codec, event_abi):
+        self.name = event_abi["name"]
+        inputs = event_abi["inputs"]
+        self.topic_inputs = [(i["name"], i["type"]) for i in inputs if i["indexed"]]
+        self.data_names = [i["name"] for i in inputs if not i["indexed"]]
+        self.data_types = [i["type"] for i in inputs if not i["indexed"]]
+        self.names = [i["name"] for i in inputs]
+        # eth-abi renamed decode_abi to decode in v4
+        self.decode_values = getattr(codec, "decode", None) or codec.decode_abi
+
+    def __call__(self, log):
+        args = dict(
+            zip(
+                self.data_names, self.decode_values(self.data_types, bytes(log["data"]))
+            )
+        )
+        for (name, type_), topic in zip(self.topic_inputs, log["topics"][1:]):
+            args[name] = self.decode_values([type_], bytes(topic))[0]
+        for name, value in args.items():
+            if isinstance(value, str) and len(value) == 42 and value.startswith("0x"):
+                args[name] = _checksum(value)
+        return {
+            "event": self.name,
+            "args": {name: args[name] for name in self.names},
+            "address": log["address"],
+            "blockNumber": log["blockNumber"],
+            "logIndex": log["logIndex"],
+            "transactionHash": log["transactionHash"],
+            "transactionIndex": log.get("transactionIndex"),
+        }
+
+
+@lru_cache(maxsize=100000)
+def _checksum(address):
+    return to_checksum_address(address)
+
+
+def _event_topic(event_abi):
+    return to_hex(keccak(text=artifact_cache.event_signature(event_abi)))
+
+
+def read_events(database, address, event=None, from_block=0):
+    """Yields stored events in chain order as (block number, log index, event name, args)"""
+    db = sqlite3.connect(database)
+    query = (
+        "SELECT block_number, log_index, event, args FROM events "
+        "WHERE address = ? AND block_number >= ?"
+    )
+    params = [to_checksum_address(address), from_block]
+    if event is not None:
+        query += " AND event = ?"
+        params.append(event)
+    query += " ORDER BY block_number, log_index"
+    try:
+        for block_number, log_index, name, args in db.execute(query, params):
+            yield block_number, log_index, name, json.loads(args)
+    finally:
+        db.close()
+
+
+def main(address, from_block=0, database=DEFAULT_DATABASE, concurrency=1):
+    """Indexes the game events. With concurrency above 1 block ranges are fetched
+    in parallel by the async fetcher.
+    """
+    rpc_url = os.getenv("WEB3_PROVIDER_URI", DEFAULT_RPC_URL)
+    w3 = Web3(Web3.HTTPProvider(rpc_url))
+    indexer = EventIndexer(w3, address, load_abi(), database, int(from_block))
+    if int(concurrency) > 1:
+        fetcher = AsyncLogFetcher(
+            rpc_url, indexer.address, indexer.topics, concurrency=int(concurrency)
+        )
+        stored = asyncio.run(indexer.run_async(fetcher))
+    else:
+        stored = indexer.run()
+    print(f"Stored {stored} events, indexed up to block {indexer.last_block}")
+    indexer.close()
@@ -0,0 +1,323 @@
+"""Off-chain simulator of the World Of Ledger game for balancing and load modelling.
+
+Characters are stored as NumPy arrays, and every action is applied to a whole batch
+of players at once, with the same integer arithmetic as the contract. A batch is
+equivalent to the players sending their transactions one after another in the
+given order: calls the contract would revert are skipped and reported as failed.
+
+Values are kept in int64, so boss reward multiplied by the damage of a round and
+character xp must stay below 2**63. OverflowError is raised otherwise.
+
+    brownie run scripts/game_simulator.py main [players] [rounds] [boss hp] [boss damage] [boss reward]
+    python -m scripts.game_simulator
+"""
+import time
+
+import numpy as np
+
+
+UINT32_MAX = 2**32 - 1
+INT64_MAX = 2**63 - 1
+DAY = 24 * 60 * 60
+
+
+def isqrt(values):
+    """Integer square root of every value, the same as OpenZeppelin `Math.sqrt`"""
+    values = np.asarray(values, dtype=np.int64)
+    root = np.floor(np.sqrt(values.astype(np.float64))).astype(np.int64)
+    # float square root may be one off for big values
+    root -= root * root > values
+    # (root + 1) ** 2 <= values, without overflowing int64 near 2**63
+    root += root <= (values - 2 * root - 1) // np.maximum(root, 1)
+    return root
+
+
+def level_of(xp):
+    """Character level of the xp, see `WorldOfLedger._updateUserLevel`"""
+    return isqrt(xp) * 20 // 100
+
+
+def random_characters(amount, rng):
+    """hp and damage of new characters, both in [1, 100] like `fulfillRandomWords`"""
+    return rng.integers(1, 101, amount), rng.integers(1, 101, amount)
+
+
+class GameSimulator:
+    """State of the game contract for a fixed set of players.
+
+    Args:
+        hp (array): hp of the players characters, 0 damage means no character
+        damage (array): damage of the players characters
+        heal_spell_level (int): see `setHealSpellLevel`
+        fire_bolt_spell_level (int): see `setFireBoltSpellLevel`
+        fire_bolt_cooldown (int): see `setFireBoltCooldownPeriod`, in seconds
+    """
+
+    def __init__(
+        self,
+        hp,
+        damage,
+        heal_spell_level=2,
+        fire_bolt_spell_level=3,
+        fire_bolt_cooldown=DAY,
+    ):
+        self.hp = np.array(hp, dtype=np.int64)
+        self.damage = np.array(damage, dtype=np.int64)
+        players = len(self.hp)
+        self.xp = np.zeros(players, dtype=np.int64)
+        self.level = np.zeros(players, dtype=np.int64)
+        self.is_alive = self.damage != 0
+        self.fire_bolt_time = np.zeros(players, dtype=np.int64)
+
+        self.damage_made = np.zeros(players, dtype=np.int64)
+        self.users_round = np.zeros(players, dtype=np.int64)
+        self.users_rewards = np.zeros(players, dtype=np.int64)
+        self.pending_reward_nfts = np.zeros(players, dtype=np.int64)
+
+        self.heal_spell_level = heal_spell_level
+        self.fire_bolt_spell_level = fire_bolt_spell_level
+        self.fire_bolt_cooldown = fire_bolt_cooldown
+
+        self.boss_hp = 0
+        self.boss_damage = 0
+        self.boss_reward = 0
+        self.boss_alive = False
+        self.current_round = 1
+        # index is the round id, round 0 is never played
+        self.round_reward = [0, 0]
+        self.round_total_damage = [0, 0]
+
+    @property
+    def has_character(self):
+        return self.damage != 0
+
+    def populate_boss(self, hp, damage, reward):
+        if self.boss_alive:
+            raise ValueError(
+                "You can not pupulate new boss while there is another alive"
+            )
+        self.boss_hp, self.boss_damage, self.boss_reward = hp, damage, reward
+        self.boss_alive = True
+
+    def attack(self, players):
+        """`attackBoss` by every player in order.
+
+        Args:
+            players (array): distinct player indexes
+
+        Returns:
+            bool array, False where the call reverts
+        """
+        players = self._distinct(players)
+        allowed = self.has_character[players] & self.is_alive[players]
+        succeeded = self._damage_boss(players, allowed, self.damage[players])
+        attackers = players[succeeded]
+        self.hp[attackers] = np.maximum(self.hp[attackers] - self.boss_damage, 0)
+        died = attackers[self.hp[attackers] == 0]
+        self.is_alive[died] = False
+        self.xp[died] = 0
+        self.level[died] = 0
+        self._finalize_round_if_killed()
+        return succeeded
+
+    def cast_fire_bolt(self, players, now):
+        """`castFireBolt` by every player in order in a block with timestamp `now`
+
+        Returns:
+            bool array, False where the call reverts
+        """
+        players = self._distinct(players)
+        allowed = (self.level[players] >= self.fire_bolt_spell_level) & (
+            now >= self.fire_bolt_time[players]
+        )
+        succeeded = self._damage_boss(players, allowed, self.damage[players] * 2)
+        self.fire_bolt_time[players[succeeded]] = now + self.fire_bolt_cooldown
+        self._finalize_round_if_killed()
+        return succeeded
+
+    def heal(self, healers, healed):
+        """`healCharacter(healed[i])` by every healers[i]
+
+        Returns:
+            bool array, False where the call reverts
+        """
+        healers = np.asarray(healers, dtype=np.int64)
+        healed = np.asarray(healed, dtype=np.int64)
+        succeeded = (
+            self.has_character[healers]
+            & self.is_alive[healers]
+            & (self.xp[healers] > 0)
+            & self.has_character[healed]
+            & (self.level[healers] >= self.heal_spell_level)
+            & (healers != healed)
+        )
+        # saturating every addition is the same as saturating their sum
+        np.add.at(self.hp, healed[succeeded], self.damage[healers[succeeded]])
+        np.minimum(self.hp, UINT32_MAX, out=self.hp)
+        return succeeded
+
+    def claim_rewards(self, players):
+        """`claimRewards` by every player"""
+        players = np.asarray(players, dtype=np.int64)
+        self._settle(players)
+        xp = self.xp[players] + self.users_rewards[players]
+        if np.any(xp < 0):
+            raise OverflowError("xp is out of the simulated range")
+        self.xp[players] = xp
+        self.level[players] = level_of(xp)
+        self.users_rewards[players] = 0
+
+    def mint_reward_nfts(self, players):
+        """`mintRewardNFT` by every player
+
+        Returns:
+            number of minted NFTs of every player, 0 where the call reverts
+        """
+        players = np.asarray(players, dtype=np.int64)
+        self._settle(players)
+        minted = self.pending_reward_nfts[players].copy()
+        self.pending_reward_nfts[players] = 0
+        return minted
+
+    def _distinct(self, players):
+        players = np.asarray(players, dtype=np.int64)
+        if len(np.unique(players)) != len(players):
+            raise ValueError("every player may act only once in a batch")
+        return players
+
+    def _damage_boss(self, players, allowed, damage):
+        """`_userAttackProcess` of the allowed players in order, until the boss dies
+
+        Returns:
+            bool array of players that made damage
+        """
+        if not self.boss_alive:
+            return np.zeros(len(players), dtype=bool)
+        damage = np.where(allowed, damage, 0)
+        total = np.cumsum(damage)
+        killing = allowed & (total >= self.boss_hp)
+        killer = np.argmax(killing) if killing.any() else len(players)
+        # calls after the killing blow revert because the boss is dead
+        succeeded = allowed & (np.arange(len(players)) <= killer)
+        if killer < len(players):
+            damage[killer] -= total[killer] - self.boss_hp
+        damage[~succeeded] = 0
+
+        attackers = players[succeeded]
+        returned = attackers[self.users_round[attackers] != self.current_round]
+        self._settle(returned)
+        self.users_round[returned] = self.current_round
+
+        self.damage_made[attackers] += damage[succeeded]
+        made = int(damage.sum())
+        self.round_total_damage[self.current_round] += made
+        self.boss_hp -= made
+        return succeeded
+
+    def _finalize_round_if_killed(self):
+        if not self.boss_alive or self.boss_hp != 0:
+            return
+        if self.boss_reward * self.round_total_damage[self.current_round] > INT64_MAX:
+            raise OverflowError("reward shares are out of the simulated range")
+        self.boss_alive = False
+        self.round_reward[self.current_round] = self.boss_reward
+        self.current_round += 1
+        self.round_reward.append(0)
+        self.round_total_damage.append(0)
+
+    def _settle(self, players):
+        """`_settleRewards` of every player"""
+        rounds = self.users_round[players]
+        damage = self.damage_made[players]
+        unsettled = (damage != 0) & (rounds != self.current_round)
+        players, rounds, damage = (
+            players[unsettled],
+            rounds[unsettled],
+            damage[unsettled],
+        )
+        reward = np.asarray(self.round_reward, dtype=np.int64)[rounds]
+        total_damage = np.asarray(self.round_total_damage, dtype=np.int64)[rounds]
+        self.users_rewards[players] += reward * damage // total_damage
+        self.pending_reward_nfts[players] += 1
+        self.damage_made[players] = 0
+
+
+def simulate(
+    players,
+    rounds,
+    boss_hp,
+    boss_damage,
+    boss_reward,
+    seed=0,
+    heal_spell_level=2,
+    fire_bolt_spell_level=3,
+    fire_bolt_cooldown=DAY,
+    turn_time=60 * 60,
+):
+    """Plays `rounds` rounds of `players` players. In every turn all alive players
+    attack the boss in random order, and every player that may cast a firebolt does
+    so before. Turns are `turn_time` seconds apart. After every round all players
+    claim their rewards.
+
+    Returns:
+        dict with per round arrays of attacks to kill the boss, deaths and alive
+        players, and the final simulator
+    """
+    rng = np.random.default_rng(seed)
+    game = GameSimulator(
+        *random_characters(players, rng),
+        heal_spell_level=heal_spell_level,
+        fire_bolt_spell_level=fire_bolt_spell_level,
+        fire_bolt_cooldown=fire_bolt_cooldown,
+    )
+    everyone = np.arange(players)
+    now = 0
+    attacks, deaths, alive = [], [], []
+    for _ in range(rounds):
+        game.populate_boss(boss_hp, boss_damage, boss_reward)
+        alive_before = int(game.is_alive.sum())
+        round_attacks = 0
+        while game.boss_alive and game.is_alive.any():
+            now += turn_time
+            order = rng.permutation(everyone)
+            round_attacks += int(game.cast_fire_bolt(order, now).sum())
+            round_attacks += int(game.attack(order[game.is_alive[order]]).sum())
+        game.claim_rewards(everyone)
+        attacks.append(round_attacks)
+        deaths.append(alive_before - int(game.is_alive.sum()))
+        alive.append(int(game.is_alive.sum()))
+        if game.boss_alive:
+            # nobody is left to kill the boss, and no new boss may be populated
+            break
+    return {
+        "attacks": np.array(attacks),
+        "deaths": np.array(deaths),
+        "alive": np.array(alive),
+        "game": game,
+    }
+
+
+def main(players=10000, rounds=200, boss_hp=50, boss_damage=1, boss_reward=10):
+    """Boss hp and reward are given per player"""
+    players, rounds = int(players), int(rounds)
+    started = time.perf_counter()
+    result = simulate(
+        players,
+        rounds,
+        boss_hp=players * int(boss_hp),
+        boss_damage=int(boss_damage),
+        boss_reward=players * int(boss_reward),
+    )
+    elapsed = time.perf_counter() - started
+    game = result["game"]
+    played = len(result["attacks"])
+    print(f"{players} players, {played} rounds in {elapsed:.2f} s")
+    print(f"attacks per kill: median {np.median(result['attacks']):.0f}")
+    print(f"deaths: {result['deaths'].sum()}, alive: {result['alive'][-1]}")
+    print(f"xp percentiles 10/50/90: {np.percentile(game.xp, [10, 50, 90])}")
+    levels, counts = np.unique(game.level, return_counts=True)
+    print("levels: " + ", ".join(f"{l}: {c}" for l, c in zip(levels, counts)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,444 @@
+"""Gas benchmark suite of the game contracts.
+
+    brownie run scripts/gas_benchmark.py record
+        runs all scenarios and writes gas used by every call to gas_baseline.json
+    brownie run scripts/gas_benchmark.py main [threshold]
+        runs all scenarios and fails if any call costs more than `threshold`
+        percent (default 5) above the baseline. Without gas_baseline.json it
+        only prints the results
+
+Both take the number of workers as the last argument, to run the scenarios in
+parallel on chains of their own, see scripts/parallel_runner.py.
+"""
+import json
+import math
+import os
+import sys
+from pathlib import Path
+
+from brownie import GameProofs, RewardMetadata, web3
+
+from scripts.helpful_scripts import (
+    get_account,
+    get_key_from_event,
+    get_players,
+    deploy_mocks,
+    create_character_for_testing,
+    create_boss_nft,
+)
+from scripts.deploy_game import deploy_game
+from scripts.merkle_rewards import build_round
+from scripts.action_bundles import action, sign_actions
+
+
+BASELINE_PATH = Path(__file__).parent.parent / "gas_baseline.json"
+DEFAULT_THRESHOLD = float(os.getenv("GAS_REGRESSION_THRESHOLD", 5))
+
+ATTACKERS = [1, 10, 100, 500, 1000]
+PENDING_REWARDS = [1, 10, 100]
+ENROLLMENT_BATCHES = [1, 10, 40]
+BUNDLE_SIZES = [1, 10, 100]
+LEVEL_XP = [10**2, 10**6, 10**12, 10**18, 10**24, 2**96 - 1]
+# EIP-170 limit of the runtime bytecode of a contract
+CODE_SIZE_LIMIT = 24576
+
+
+def setup_game():
+    account = get_account()
+    coordinator, boss_contract = deploy_mocks()
+    game = deploy_game()
+    subscription_id_game = get_key_from_event(game.tx.events[1], "subId")
+    coordinator.fundSubscription(subscription_id_game, 100000000000, {"from": account})
+    coordinator.fundSubscription(
+        subscription_id_game - 1, 100000000000, {"from": account}
+    )
+    create_boss_nft(coordinator, boss_contract, account, 3)
+    return coordinator, boss_contract, game
+
+
+def code_sizes(game):
+    """Runtime bytecode size in bytes of the game and of its linked libraries"""
+    contracts = {
+        "WorldOfLedger": game,
+        "GameProofs": GameProofs[-1],
+        "RewardMetadata": RewardMetadata[-1],
+    }
+    return {
+        name: len(web3.eth.get_code(contract.address))
+        for name, contract in contracts.items()
+    }
+
+
+def benchmark_code_size():
+    """Bytecode sizes are recorded with the gas, so a growing contract shows up as
+    a regression long before it hits CODE_SIZE_LIMIT.
+    """
+    _, _, game = setup_game()
+    return {f"code size[{name}]": size for name, size in code_sizes(game).items()}
+
+
+def create_characters(coordinator, game, players):
+    """Creates characters for the players and returns gas used by the last
+    createRandomCharacter and fulfillRandomWords calls.
+    """
+    for player in players:
+        create_tx, fulfill_tx = create_character_for_testing(coordinator, game, player)
+    return {
+        "createRandomCharacter": create_tx.gas_used,
+        "fulfillRandomWords": fulfill_tx.gas_used,
+    }
+
+
+def play_round(game, players):
+    """Spawns a boss with hp equal to the total damage of the players and lets every
+    player attack it once. Boss damage is 0, so nobody dies before the killing blow.
+
+    Returns:
+        transactions of populate_boss and of the killing blow
+    """
+    owner = get_account()
+    total_damage = sum(game.usersCharacters(player)[1] for player in players)
+    populate_tx = game.populate_boss(total_damage, 0, 100, {"from": owner})
+    for player in players[:-1]:
+        game.attackBoss({"from": player})
+    kill_tx = game.attackBoss({"from": players[-1]})
+    assert game.bossAlive() == False
+    return populate_tx, kill_tx
+
+
+def benchmark_rounds(attackers=ATTACKERS):
+    coordinator, _, game = setup_game()
+    players = get_players(max(attackers))
+    results = create_characters(coordinator, game, players)
+    for amount in sorted(attackers):
+        # killer is always a fresh player, so the sweeps are comparable
+        populate_tx, kill_tx = play_round(game, players[:amount])
+        claim_tx = game.claimRewards({"from": players[0]})
+        results["populate_boss"] = populate_tx.gas_used
+        results[f"attackBoss killing blow[attackers={amount}]"] = kill_tx.gas_used
+        results[f"claimRewards[attackers={amount}]"] = claim_tx.gas_used
+    return results
+
+
+def benchmark_reward_creation(participants=10):
+    """Average gas of claimRewards that settles the reward of a participant,
+    which creates the reward record of the participant.
+    """
+    coordinator, _, game = setup_game()
+    players = get_players(participants)
+    create_characters(coordinator, game, players)
+    play_round(game, players)
+    gas_used = [game.claimRewards({"from": player}).gas_used for player in players]
+    return {
+        "claimRewards creating reward[per participant]": sum(gas_used) // len(players)
+    }
+
+
+def benchmark_merkle_settlement(participants=10):
+    """Gas of a round settled with a Merkle root: the killing blow, publishing the
+    root and the average claimRewardsWithProof of a participant.
+    """
+    coordinator, _, game = setup_game()
+    players = get_players(participants)
+    create_characters(coordinator, game, players)
+    game.setMerkleSettlement(True, {"from": get_account()})
+    round_id = game.currentRound()
+    total_damage = sum(game.usersCharacters(player)[1] for player in players)
+    populate_tx = game.populate_boss(total_damage, 0, 100, {"from": get_account()})
+    attack_txs = [game.attackBoss({"from": player}) for player in players]
+    kill_tx = attack_txs[-1]
+    events = [
+        (event.name, dict(event))
+        for tx in [populate_tx] + attack_txs
+        for event in tx.events
+    ]
+    tree = build_round(game, round_id, events)
+    publish_tx = game.publishRewardRoot(round_id, tree.root, {"from": get_account()})
+    gas_used = [
+        game.claimRewardsWithProof(
+            round_id, *tree.claims[player], tree.proof(player), {"from": player}
+        ).gas_used
+        for player in players
+    ]
+    return {
+        f"attackBoss killing blow merkle[attackers={participants}]": kill_tx.gas_used,
+        f"publishRewardRoot[attackers={participants}]": publish_tx.gas_used,
+        "claimRewardsWithProof[per participant]": sum(gas_used) // len(players),
+    }
+
+
+def mint_reward_gas(game, player, pending_rewards):
+    """Lets the player kill `pending_rewards` bosses alone and returns gas used by
+    mintRewardNFT that mints all of them.
+    """
+    owner = get_account()
+    damage = game.usersCharacters(player)[1]
+    for _ in range(pending_rewards):
+        game.populate_boss(damage, 0, 100, {"from": owner})
+        game.attackBoss({"from": player})
+    tx = game.mintRewardNFT({"from": player})
+    assert game.balanceOf(player) == pending_rewards
+    return tx.gas_used
+
+
+def benchmark_reward_mint(pending_rewards=PENDING_REWARDS):
+    coordinator, _, game = setup_game()
+    players = get_players(len(pending_rewards))
+    create_characters(coordinator, game, players)
+    return {
+        f"mintRewardNFT[pending_rewards={amount}]": mint_reward_gas(
+            game, player, amount
+        )
+        for player, amount in zip(players, pending_rewards)
+    }
+
+
+def benchmark_character_actions():
+    """Returns gas used by attackBoss, healCharacter and castFireBolt of a level 3
+    character. The first attack of the round also registers the player in the round.
+    """
+    coordinator, _, game = setup_game()
+    owner = get_account()
+    player, healed_player = get_players(2)
+    create_characters(coordinator, game, [player, healed_player])
+    # 225 xp gives level 3, enough for both spells
+    game.populate_boss(game.usersCharacters(player)[1], 0, 225, {"from": owner})
+    game.attackBoss({"from": player})
+    game.claimRewards({"from": player})
+
+    game.populate_boss(10**9, 0, 100, {"from": owner})
+    return {
+        "attackBoss (first in round)": game.attackBoss({"from": player}).gas_used,
+        "attackBoss": game.attackBoss({"from": player}).gas_used,
+        "healCharacter": game.healCharacter(healed_player, {"from": player}).gas_used,
+        "castFireBolt": game.castFireBolt({"from": player}).gas_used,
+    }
+
+
+def benchmark_action_bundles(sizes=BUNDLE_SIZES):
+    """Gas per attack of a separate attackBoss transaction, of performActions with
+    N attacks of one player, and of relayActions with one signed attack of N players.
+    """
+    coordinator, _, game = setup_game()
+    players = get_players(max(sizes), signing=True)
+    create_characters(coordinator, game, players)
+    game.populate_boss(10**12, 0, 100, {"from": get_account()})
+    # the first attack of the round also registers the player in the round
+    for player in players:
+        game.attackBoss({"from": player})
+    results = {"attackBoss[per action]": game.attackBoss({"from": players[0]}).gas_used}
+    for size in sizes:
+        tx = game.performActions([action("attackBoss")] * size, {"from": players[0]})
+        results[f"performActions[per action, actions={size}]"] = tx.gas_used // size
+        bundle = [
+            sign_actions(game, player, [action("attackBoss")])
+            for player in players[:size]
+        ]
+        tx = game.relayActions(bundle, {"from": get_account()})
+        results[f"relayActions[per action, players={size}]"] = tx.gas_used // size
+    return results
+
+
+def benchmark_level_claims(xp_range=LEVEL_XP):
+    """Gas of claimRewards that brings the character xp to every value of the range,
+    and of a claim that leaves the level unchanged at the top of it. Levels are
+    checked against sqrt(xp) * 20 / 100 on the way.
+    """
+    coordinator, _, game = setup_game()
+    owner = get_account()
+    player = get_players(1)[0]
+    create_characters(coordinator, game, [player])
+    xp, results = 0, {}
+
+    def claim(reward):
+        game.populate_boss(1, 0, reward, {"from": owner})
+        game.attackBoss({"from": player})
+        return game.claimRewards({"from": player}).gas_used
+
+    for target in xp_range:
+        gas_used = claim(target - xp)
+        xp = target
+        assert game.usersCharacters(player)[3] == math.isqrt(xp) * 20 // 100
+        results[f"claimRewards[xp={xp:.0e}]"] = gas_used
+    level = game.usersCharacters(player)[3]
+    results["claimRewards[level unchanged]"] = claim(1)
+    assert game.usersCharacters(player)[3] == level
+    return results
+
+
+def benchmark_boss_spawn(staged=10):
+    """Gas of stageBosses per boss, and of the killing blow with and without
+    a staged boss spawning after it.
+    """
+    coordinator, _, game = setup_game()
+    owner = get_account()
+    player = get_players(1)[0]
+    create_characters(coordinator, game, [player])
+    damage = game.usersCharacters(player)[1]
+    bosses = [(damage, 0, 100, 1 + i % 3) for i in range(staged)]
+    stage_tx = game.stageBosses(bosses, {"from": owner})
+    spawn_kill_tx = game.attackBoss({"from": player})
+    for _ in range(staged - 2):
+        game.attackBoss({"from": player})
+    last_kill_tx = game.attackBoss({"from": player})
+    assert game.bossAlive() == False
+    return {
+        f"stageBosses[per boss, bosses={staged}]": stage_tx.gas_used // staged,
+        "attackBoss killing blow spawning staged boss": spawn_kill_tx.gas_used,
+        "attackBoss killing blow with empty queue": last_kill_tx.gas_used,
+    }
+
+
+def enroll_characters(coordinator, game, players):
+    """Enrolls the players, requests their characters and fulfills the requests.
+
+    Returns:
+        gas used and LINK paid per character
+    """
+    gas_used = sum(
+        game.enrollCharacter({"from": player}).gas_used for player in players
+    )
+    request_tx = game.requestEnrolledCharacters({"from": players[0]})
+    gas_used += request_tx.gas_used
+    payment = 0
+    for event in request_tx.events["RequestedEnrolledCharacters"]:
+        fulfill_tx = coordinator.fulfillRandomWords(event["requestId"], game)
+        assert fulfill_tx.events["RandomWordsFulfilled"]["success"] == True
+        gas_used += fulfill_tx.gas_used
+        payment += fulfill_tx.events["RandomWordsFulfilled"]["payment"]
+    for player in players:
+        assert game.usersCharacters(player)[1] != 0
+    return gas_used // len(players), payment // len(players)
+
+
+def enrollment_callback_gas(coordinator, game, players):
+    """Gas of the enrollment callback per character, before refunds. The mock
+    coordinator charges BASE_FEE + fulfillment gas * GAS_PRICE_LINK, so the payments
+    of a batch of one player and of a batch of all the others give the gas of every
+    further character. Every player of the batch is new, so all slots are cold.
+    """
+    batch = len(players) - 1
+    game.setEnrollmentBatchSize(batch, {"from": get_account()})
+    _, single = enroll_characters(coordinator, game, players[:1])
+    _, per_character = enroll_characters(coordinator, game, players[1:])
+    extra_payment = per_character * batch - single
+    return extra_payment // (coordinator.GAS_PRICE_LINK() * (batch - 1))
+
+
+def benchmark_enrollment(batches=ENROLLMENT_BATCHES, callback_batch=20):
+    """Gas and LINK per character of createRandomCharacter and of enrollment batches.
+    Gas per character covers all transactions: request, fulfillment and enrollment.
+    The callback gas per character is the budget ENROLLMENT_CALLBACK_CHARACTER_GAS
+    of WorldOfLedgerFactory has to cover.
+    """
+    coordinator, _, game = setup_game()
+    players = get_players(1 + sum(batches) + 1 + callback_batch)
+    create_tx, fulfill_tx = create_character_for_testing(coordinator, game, players[0])
+    results = {
+        "character gas[createRandomCharacter]": create_tx.gas_used
+        + fulfill_tx.gas_used,
+        "character LINK[createRandomCharacter]": fulfill_tx.events[
+            "RandomWordsFulfilled"
+        ]["payment"],
+    }
+    start = 1
+    for size in batches:
+        game.setEnrollmentBatchSize(size, {"from": get_account()})
+        gas_used, payment = enroll_characters(
+            coordinator, game, players[start : start + size]
+        )
+        results[f"character gas[enrollment batch={size}]"] = gas_used
+        results[f"character LINK[enrollment batch={size}]"] = payment
+        start += size
+    results["enrollment callback gas[per character]"] = enrollment_callback_gas(
+        coordinator, game, players[start:]
+    )
+    return results
+
+
+SCENARIOS = [
+    "benchmark_rounds",
+    "benchmark_reward_creation",
+    "benchmark_merkle_settlement",
+    "benchmark_reward_mint",
+    "benchmark_character_actions",
+    "benchmark_enrollment",
+    "benchmark_boss_spawn",
+    "benchmark_action_bundles",
+    "benchmark_level_claims",
+    "benchmark_code_size",
+]
+
+
+def run_benchmarks(workers=1):
+    """Runs all scenarios, each on a fresh deployment. Above 1 worker the scenarios
+    run in parallel processes, each with its own chain.
+    """
+    if workers > 1:
+        from scripts.parallel_runner import run_sharded
+
+        return run_sharded(SCENARIOS, workers)
+    results = {}
+    for name in SCENARIOS:
+        results.update(globals()[name]())
+    return results
+
+
+def load_baseline(path=BASELINE_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(results, path=BASELINE_PATH):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare_with_baseline(results, baseline, threshold):
+    """Prints gas used by every call next to its baseline.
+
+    Args:
+        results (dict): gas used by call name
+        baseline (dict): recorded gas used by call name
+        threshold (float): allowed growth in percents
+
+    Returns:
+        list of call names that cost more than threshold above the baseline
+    """
+    regressions = []
+    print(f"{'call':>42} | {'baseline':>10} | {'gas used':>10} | {'change':>8}")
+    for name, gas_used in results.items():
+        if name not in baseline:
+            print(f"{name:>42} | {'-':>10} | {gas_used:>10} | {'new':>8}")
+            continue
+        change = (gas_used - baseline[name]) * 100 / baseline[name]
+        print(f"{name:>42} | {baseline[name]:>10} | {gas_used:>10} | {change:>7.2f}%")
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def record(workers=1):
+    results = run_benchmarks(int(workers))
+    save_baseline(results)
+    print(f"Baseline of {len(results)} calls saved to {BASELINE_PATH}")
+
+
+def main(threshold=DEFAULT_THRESHOLD, workers=1):
+    threshold = float(threshold)
+    results = run_benchmarks(int(workers))
+    if not BASELINE_PATH.exists():
+        # the gate is not active until a baseline is recorded and committed
+        compare_with_baseline(results, {}, threshold)
+        print(
+            f"{BASELINE_PATH} not found, gas regressions are not checked. "
+            "Run `brownie run scripts/gas_benchmark.py record` and commit it"
+        )
+        return
+    regressions = compare_with_baseline(results, load_baseline(), threshold)
+    if regressions:
+        sys.exit(
+            f"Gas regression above {threshold}% in: {', '.join(sorted(regressions))}"
+        )
+    print(f"No gas regression above {threshold}%")
@@ -0,0 +1,212 @@
+"""Gas profiler of the game entry points.
+
+Runs a scenario, walks the opcode trace of every transaction and attributes the
+gas of each step to the stack of functions executing it, internal ones
+included. Prints a hotspot table ranked by gas, with SLOAD and SSTORE counts,
+and writes the stacks in the folded format of flamegraph.pl and speedscope.
+
+    brownie run scripts/gas_profiler.py main [scenario] [folded file]
+
+Scenarios: attack, kill, claim, spells, mint, character. Gas is execution gas of
+the opcodes, without the intrinsic transaction cost and storage refunds.
+"""
+from collections import defaultdict
+from pathlib import Path
+
+from scripts.helpful_scripts import get_account, get_players
+from scripts.gas_benchmark import (
+    setup_game,
+    create_characters,
+    play_round,
+)
+
+
+REPORTS_PATH = Path(__file__).parent.parent / "reports"
+STORAGE_OPS = ("SLOAD", "SSTORE")
+
+
+def step_costs(trace):
+    """Gas of every step. The cost of a call step includes the gas forwarded to
+    the callee, which is charged to the steps of the callee instead.
+    """
+    costs = []
+    for i, step in enumerate(trace):
+        cost = step["gasCost"]
+        if i + 1 < len(trace) and trace[i + 1]["depth"] > step["depth"]:
+            cost -= trace[i + 1]["gas"]
+        costs.append(max(cost, 0))
+    return costs
+
+
+def step_stacks(trace):
+    """Yields the stack of function names of every step, outermost first"""
+    frames = []
+    for step in trace:
+        level = (step["depth"], step["jumpDepth"])
+        while frames and frames[-1][0] >= level:
+            frames.pop()
+        frames.append((level, step.get("fn") or step.get("contractName") or "?"))
+        yield [name for _, name in frames]
+
+
+class GasProfile:
+    """Gas by function and by stack, aggregated over many transactions"""
+
+    def __init__(self):
+        self.inclusive = defaultdict(int)
+        self.self_gas = defaultdict(int)
+        self.folded = defaultdict(int)
+        self.op_counts = defaultdict(lambda: defaultdict(int))
+        self.op_gas = defaultdict(lambda: defaultdict(int))
+
+    def add_trace(self, label, trace):
+        """Adds the steps of one transaction trace, with `label` as the root frame"""
+        for step, cost, stack in zip(trace, step_costs(trace), step_stacks(trace)):
+            function = stack[-1]
+            self.self_gas[function] += cost
+            # recursive frames are counted once
+            for name in set(stack):
+                self.inclusive[name] += cost
+            self.folded[";".join([label] + stack)] += cost
+            if step["op"] in STORAGE_OPS:
+                self.op_counts[function][step["op"]] += 1
+                self.op_gas[function][step["op"]] += cost
+
+    def add_transaction(self, tx, label=None):
+        self.add_trace(label or tx.fn_name or "transaction", tx.trace)
+
+    def hotspots(self):
+        """Rows of (function, inclusive gas, self gas, SLOADs, SSTOREs, storage gas)
+        sorted by inclusive gas
+        """
+        return sorted(
+            (
+                (
+                    name,
+                    self.inclusive[name],
+                    self.self_gas[name],
+                    self.op_counts[name]["SLOAD"],
+                    self.op_counts[name]["SSTORE"],
+                    sum(self.op_gas[name].values()),
+                )
+                for name in self.inclusive
+            ),
+            key=lambda row: (-row[1], row[0]),
+        )
+
+    def print_hotspots(self, limit=30):
+        print(
+            f"{'function':>48} | {'inclusive':>10} | {'self':>9} | {'SLOAD':>6} | "
+            f"{'SSTORE':>6} | {'storage gas':>11}"
+        )
+        for name, inclusive, self_gas, sloads, sstores, storage_gas in self.hotspots()[
+            :limit
+        ]:
+            print(
+                f"{name[-48:]:>48} | {inclusive:>10} | {self_gas:>9} | {sloads:>6} | "
+                f"{sstores:>6} | {storage_gas:>11}"
+            )
+
+    def write_folded(self, path):
+        """Writes `stack count` lines, see https://github.com/brendangregg/FlameGraph"""
+        with open(path, "w") as f:
+            for stack, gas in sorted(self.folded.items()):
+                if gas:
+                    f.write(f"{stack} {gas}\n")
+
+
+def _level_3_player(coordinator, game, player):
+    create_characters(coordinator, game, [player])
+    game.populate_boss(game.usersCharacters(player)[1], 0, 225, {"from": get_account()})
+    game.attackBoss({"from": player})
+    game.claimRewards({"from": player})
+
+
+def scenario_attack():
+    coordinator, _, game = setup_game()
+    player = get_players(1)[0]
+    create_characters(coordinator, game, [player])
+    game.populate_boss(10**9, 1, 100, {"from": get_account()})
+    return [
+        ("attackBoss (first in round)", game.attackBoss({"from": player})),
+        ("attackBoss", game.attackBoss({"from": player})),
+    ]
+
+
+def scenario_kill(attackers=10):
+    coordinator, _, game = setup_game()
+    players = get_players(attackers)
+    create_characters(coordinator, game, players)
+    _, kill_tx = play_round(game, players)
+    return [("attackBoss killing blow", kill_tx)]
+
+
+def scenario_claim(attackers=10):
+    coordinator, _, game = setup_game()
+    players = get_players(attackers)
+    create_characters(coordinator, game, players)
+    play_round(game, players)
+    return [("claimRewards", game.claimRewards({"from": players[0]}))]
+
+
+def scenario_spells():
+    coordinator, _, game = setup_game()
+    player, healed_player = get_players(2)
+    create_characters(coordinator, game, [healed_player])
+    _level_3_player(coordinator, game, player)
+    game.populate_boss(10**9, 0, 100, {"from": get_account()})
+    return [
+        ("castFireBolt", game.castFireBolt({"from": player})),
+        ("healCharacter", game.healCharacter(healed_player, {"from": player})),
+    ]
+
+
+def scenario_mint(pending_rewards=10):
+    coordinator, _, game = setup_game()
+    player = get_players(1)[0]
+    create_characters(coordinator, game, [player])
+    damage = game.usersCharacters(player)[1]
+    for _ in range(pending_rewards):
+        game.populate_boss(damage, 0, 100, {"from": get_account()})
+        game.attackBoss({"from": player})
+    return [("mintRewardNFT", game.mintRewardNFT({"from": player}))]
+
+
+def scenario_character():
+    coordinator, _, game = setup_game()
+    player = get_players(1)[0]
+    create_tx = game.createRandomCharacter({"from": player})
+    request_id = create_tx.events["RequestedRandomness"]["requestId"]
+    fulfill_tx = coordinator.fulfillRandomWords(request_id, game)
+    return [("createRandomCharacter", create_tx), ("fulfillRandomWords", fulfill_tx)]
+
+
+SCENARIOS = {
+    "attack": scenario_attack,
+    "kill": scenario_kill,
+    "claim": scenario_claim,
+    "spells": scenario_spells,
+    "mint": scenario_mint,
+    "character": scenario_character,
+}
+
+
+def profile(scenario):
+    profile = GasProfile()
+    for label, tx in SCENARIOS[scenario]():
+        profile.add_transaction(tx, label)
+    return profile
+
+
+def main(scenario="attack", folded_path=None):
+    if scenario not in SCENARIOS:
+        raise ValueError(
+            f"Unknown scenario {scenario}, use one of {', '.join(SCENARIOS)}"
+        )
+    result = profile(scenario)
+    result.print_hotspots()
+    if folded_path is None:
+        REPORTS_PATH.mkdir(exist_ok=True)
+        folded_path = REPORTS_PATH / f"gas_profile_{scenario}.folded"
+    result.write_folded(folded_path)
+    print(f"Folded stacks saved to {folded_path}")
@@ -48,6 +48,8 @@ contract_to_mock = {
     "link_token": LinkToken,
     "boss_contract": BossContract,
 }
+# contracts created from the ABI, by network and address
+_contracts_from_abi = {}
 
 
 def get_contract(contract_name):
@@ -60,7 +62,8 @@ def get_contract(contract_name):
 
         Returns:
             brownie.network.contract.ProjectContract: The most recently deployed
-            version of this contract.
+            version of this contract. Contracts of non-local networks are created
+            once per network and address.
     """
     contract_type = contract_to_mock[contract_name]
     if network.show_active() in LOCAL_BLOCKCHAIN_ENVIRONMENTS:
@@ -71,12 +74,12 @@ def get_contract(contract_name):
         # Else choose last one
     else:
         contract_address = config["networks"][network.show_active()][contract_name]
-        # address
-        # ABI
-        contract = Contract.from_abi(
-            contract_type._name, contract_address, contract_type.abi
-        )
-        # MockV3Aggregator.abi
+        key = (network.show_active(), contract_address)
+        if key not in _contracts_from_abi:
+            _contracts_from_abi[key] = Contract.from_abi(
+                contract_type._name, contract_address, contract_type.abi
+            )
+        contract = _contracts_from_abi[key]
     return contract
 
 
@@ -112,7 +115,29 @@ def create_character_for_testing(coordinator, world_of_ledger_contract, account)
     create_char_tx = world_of_ledger_contract.createRandomCharacter({"from": account})
     chain.mine(5)
     _requestId = get_key_from_event(create_char_tx.events[0], "requestId")
-    coordinator.fulfillRandomWords(_requestId, world_of_ledger_contract)
+    fulfill_tx = coordinator.fulfillRandomWords(_requestId, world_of_ledger_contract)
+    return create_char_tx, fulfill_tx
+
+
+def get_players(amount, funding="0.1 ether", signing=False):
+    """Returns a list of development accounts to play the game with.
+    Uses the unlocked local accounts first (except the owner) and then generates
+    new funded ones, so scenarios may have more players than local accounts.
+
+    Args:
+        amount (int): number of players
+        funding (string): amount of ether sent to every generated account
+        signing (bool): only generated accounts, whose private keys are known
+
+    Returns:
+        list of accounts
+    """
+    players = [] if signing else list(accounts[1 : amount + 1])
+    while len(players) < amount:
+        player = accounts.add()
+        get_account().transfer(player, funding)
+        players.append(player)
+    return players
 
 
 def create_boss_nft(coordinator, boss_contract, account, amount=1):
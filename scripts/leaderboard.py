@@ -0,0 +1,248 @@
+"""Damage leaderboards of the current round and of all time.
+
+The contract deletes the damage of every player when the round ends, so the
+leaderboards are materialized from the events instead: every BossCreated event
+starts a round and every DamageMade event adds damage of a player. Events are
+read from the database of scripts/event_indexer.py and the state is checkpointed
+to a JSON file, so every run continues from the last applied event.
+
+    brownie run scripts/leaderboard.py main <contract address> [database] [checkpoint] [k]
+    python -m scripts.leaderboard [events] [players]
+        replays synthetic events and reports events/s and peak memory
+"""
+import heapq
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+from scripts.event_indexer import DEFAULT_DATABASE, read_events
+
+
+DEFAULT_CHECKPOINT = "world_of_ledger_leaderboard.json"
+DEFAULT_K = 10
+KEPT_ROUNDS = 100
+
+
+class TopK:
+    """K players with the most damage. Damage of a player only grows, so an update
+    either raises a member or may replace the weakest one, O(log K) per update.
+    The ranking is sorted once after a change and then returned as is.
+    """
+
+    def __init__(self, k):
+        self.k = k
+        self.members = {}
+        # min heap of (damage, player), entries of raised members are stale
+        self.heap = []
+        self._ranking = []
+
+    def update(self, player, damage):
+        """Offers the new total damage of the player"""
+        if player in self.members:
+            self.members[player] = damage
+        elif len(self.members) < self.k:
+            self.members[player] = damage
+        else:
+            weakest_damage, weakest = self._weakest()
+            if damage <= weakest_damage:
+                return
+            heapq.heappop(self.heap)
+            del self.members[weakest]
+            self.members[player] = damage
+        heapq.heappush(self.heap, (damage, player))
+        if len(self.heap) > 2 * self.k:
+            self.heap = [(d, p) for p, d in self.members.items()]
+            heapq.heapify(self.heap)
+        self._ranking = None
+
+    def _weakest(self):
+        while self.members.get(self.heap[0][1]) != self.heap[0][0]:
+            heapq.heappop(self.heap)
+        return self.heap[0]
+
+    def ranking(self):
+        """[(player, damage)] from the most damage, ties by address"""
+        if self._ranking is None:
+            self._ranking = sorted(self.members.items(), key=lambda m: (-m[1], m[0]))
+        return self._ranking
+
+
+class Leaderboard:
+    """Top K players by damage of the current round and of all time.
+
+    Totals of all players are kept for all time, totals of the current round only
+    until the next boss. Finished rounds keep their final top K, for the last
+    `kept_rounds` rounds.
+
+    Args:
+        k (int): size of the leaderboards
+        kept_rounds (int): finished rounds whose leaderboard is kept
+    """
+
+    def __init__(self, k=DEFAULT_K, kept_rounds=KEPT_ROUNDS):
+        self.k = k
+        self.kept_rounds = kept_rounds
+        self.round = -1
+        self.position = None
+        self.total_damage = {}
+        self.round_damage = {}
+        self.overall = TopK(k)
+        self.current = TopK(k)
+        self.finished_rounds = {}
+
+    def apply(self, event, args, position=None):
+        """Applies one event. Events at or before the last applied position are
+        skipped, so the same range may be replayed.
+
+        Args:
+            event (string): event name, events other than BossCreated and DamageMade are ignored
+            args (dict): event arguments
+            position (tuple): (block number, log index) of the event
+
+        Returns:
+            bool: False if the event was skipped
+        """
+        if position is not None:
+            if self.position is not None and tuple(position) <= self.position:
+                return False
+            self.position = tuple(position)
+        if event == "BossCreated":
+            self._start_round()
+        elif event == "DamageMade":
+            player, amount = args["user"], int(args["amount"])
+            self.total_damage[player] = self.total_damage.get(player, 0) + amount
+            self.round_damage[player] = self.round_damage.get(player, 0) + amount
+            self.overall.update(player, self.total_damage[player])
+            self.current.update(player, self.round_damage[player])
+        return True
+
+    def _start_round(self):
+        if self.round >= 0:
+            self.finished_rounds[self.round] = self.current.ranking()
+            self.finished_rounds.pop(self.round - self.kept_rounds, None)
+        self.round += 1
+        self.round_damage = {}
+        self.current = TopK(self.k)
+
+    def top_overall(self):
+        return self.overall.ranking()
+
+    def top_of_round(self, round_id=None):
+        """Leaderboard of a round, of the current one by default. None if the round
+        is not kept.
+        """
+        if round_id is None or round_id == self.round:
+            return self.current.ranking()
+        return self.finished_rounds.get(round_id)
+
+    def save(self, path):
+        state = {
+            "k": self.k,
+            "kept_rounds": self.kept_rounds,
+            "round": self.round,
+            "position": self.position,
+            "total_damage": self.total_damage,
+            "round_damage": self.round_damage,
+            "finished_rounds": self.finished_rounds,
+        }
+        # written aside and renamed, so a crash never leaves half a checkpoint
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as f:
+            json.dump(state, f)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            state = json.load(f)
+        leaderboard = cls(state["k"], state["kept_rounds"])
+        leaderboard.round = state["round"]
+        if state["position"] is not None:
+            leaderboard.position = tuple(state["position"])
+        leaderboard.total_damage = state["total_damage"]
+        leaderboard.round_damage = state["round_damage"]
+        leaderboard.finished_rounds = {
+            int(round_id): [tuple(member) for member in ranking]
+            for round_id, ranking in state["finished_rounds"].items()
+        }
+        for player, damage in leaderboard.total_damage.items():
+            leaderboard.overall.update(player, damage)
+        for player, damage in leaderboard.round_damage.items():
+            leaderboard.current.update(player, damage)
+        return leaderboard
+
+
+def load_or_create(path, k=DEFAULT_K):
+    if os.path.exists(path):
+        return Leaderboard.load(path)
+    return Leaderboard(k)
+
+
+def update_from_database(leaderboard, database, address):
+    """Applies the indexed events newer than the last applied one.
+
+    Returns:
+        int: number of applied events
+    """
+    from_block = leaderboard.position[0] if leaderboard.position else 0
+    applied = 0
+    for block_number, log_index, event, args in read_events(
+        database, address, from_block=from_block
+    ):
+        if event in ("BossCreated", "DamageMade"):
+            applied += leaderboard.apply(event, args, (block_number, log_index))
+    return applied
+
+
+def print_ranking(title, ranking):
+    print(title)
+    for place, (player, damage) in enumerate(ranking, 1):
+        print(f"{place:>4} | {player} | {damage:>10}")
+
+
+def main(
+    address, database=DEFAULT_DATABASE, checkpoint=DEFAULT_CHECKPOINT, k=DEFAULT_K
+):
+    leaderboard = load_or_create(checkpoint, int(k))
+    applied = update_from_database(leaderboard, database, address)
+    leaderboard.save(checkpoint)
+    print(f"Applied {applied} events, round {leaderboard.round}")
+    print_ranking("Current round", leaderboard.top_of_round())
+    print_ranking("All time", leaderboard.top_overall())
+
+
+def synthetic_events(amount, players, boss_every=1000, seed=0):
+    """Yields (event, args, position) of BossCreated followed by DamageMade events
+    of random players, with a new boss every `boss_every` events
+    """
+    rng = random.Random(seed)
+    addresses = [f"0x{i:040x}" for i in range(players)]
+    for i in range(amount):
+        if i % boss_every == 0:
+            yield "BossCreated", {"bossID": i, "tokenURI": ""}, (i, 0)
+        else:
+            player = addresses[rng.randrange(players)]
+            yield "DamageMade", {"user": player, "amount": rng.randint(1, 100)}, (i, 0)
+
+
+def benchmark(events=1_000_000, players=10_000):
+    tracemalloc.start()
+    leaderboard = Leaderboard()
+    started = time.perf_counter()
+    for event in synthetic_events(events, players):
+        leaderboard.apply(*event)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{events} events of {players} players in {elapsed:.2f} s, "
+        f"{events / elapsed:.0f} events/s, peak memory {peak / 2**20:.1f} MiB"
+    )
+    return elapsed, peak
+
+
+if __name__ == "__main__":
+    benchmark(*map(int, sys.argv[1:]))
@@ -0,0 +1,211 @@
+"""Load generator for the game on a local development node.
+
+Creates characters for many development accounts, stages bosses, and sends a
+random mix of player actions from a pool of worker threads, so transactions of
+different players are in flight at the same time. Reports throughput,
+confirmation latency percentiles and gas per action, then measures the killing
+blow as the number of attackers of a round grows, and the kill throughput with
+several arena bosses alive at once.
+
+    brownie run scripts/load_generator.py main [players] [actions] [workers]
+"""
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from brownie.exceptions import VirtualMachineError
+
+from scripts.helpful_scripts import get_account, get_players
+from scripts.gas_benchmark import setup_game, enroll_characters
+
+
+ACTION_MIX = {
+    "attackBoss": 0.6,
+    "healCharacter": 0.15,
+    "castFireBolt": 0.1,
+    "claimRewards": 0.1,
+    "mintRewardNFT": 0.05,
+}
+PARTICIPATION = [1, 10, 50, 100]
+ARENAS = [1, 2, 4, 8]
+STAGED_BOSSES = 50
+
+
+class ActionStats:
+    """Outcome of every sent action: latency, gas used and reverts"""
+
+    def __init__(self):
+        self.latency = defaultdict(list)
+        self.gas_used = defaultdict(list)
+        self.reverted = defaultdict(int)
+
+    def record(self, action, latency, tx):
+        self.latency[action].append(latency)
+        if tx is None:
+            self.reverted[action] += 1
+        else:
+            self.gas_used[action].append(tx.gas_used)
+
+    def print_report(self, elapsed):
+        sent = sum(len(latency) for latency in self.latency.values())
+        print(f"{sent} transactions in {elapsed:.2f} s, {sent / elapsed:.1f} tx/s")
+        print(
+            f"{'action':>14} | {'sent':>6} | {'reverted':>8} | {'p50 ms':>8} | "
+            f"{'p90 ms':>8} | {'p99 ms':>8} | {'mean gas':>9}"
+        )
+        for action in ACTION_MIX:
+            latency = self.latency.get(action)
+            if not latency:
+                continue
+            p50, p90, p99 = np.percentile(np.array(latency) * 1000, [50, 90, 99])
+            gas_used = self.gas_used.get(action)
+            mean_gas = f"{np.mean(gas_used):>9.0f}" if gas_used else f"{'-':>9}"
+            print(
+                f"{action:>14} | {len(latency):>6} | {self.reverted[action]:>8} | "
+                f"{p50:>8.1f} | {p90:>8.1f} | {p99:>8.1f} | {mean_gas}"
+            )
+
+
+def send(game, action, player, args=()):
+    """Sends one action and waits for its confirmation.
+
+    Returns:
+        (latency in seconds, receipt or None if the call reverted)
+    """
+    started = time.perf_counter()
+    try:
+        tx = getattr(game, action)(*args, {"from": player})
+    except VirtualMachineError:
+        tx = None
+    return time.perf_counter() - started, tx
+
+
+def setup(players):
+    """Deploys the game and creates characters of `players` accounts in enrollment batches"""
+    coordinator, _, game = setup_game()
+    accounts = get_players(players)
+    enroll_characters(coordinator, game, accounts)
+    return game, accounts
+
+
+def stage_bosses(game, players, amount=STAGED_BOSSES):
+    """Stages bosses that take a few attacks of every player to kill"""
+    total_damage = sum(c[1] for c in game.getCharacters(players))
+    bosses = [
+        (total_damage * 3, 1, 100 * len(players), 1 + i % 3) for i in range(amount)
+    ]
+    game.stageBosses(bosses, {"from": get_account()})
+
+
+def random_actions(players, amount, mix=ACTION_MIX, seed=0):
+    """Returns `amount` (action, player, args) picked with the weights of the mix"""
+    rng = np.random.default_rng(seed)
+    names = list(mix)
+    weights = np.array([mix[name] for name in names], dtype=float)
+    picked = rng.choice(len(names), amount, p=weights / weights.sum())
+    senders = rng.integers(0, len(players), amount)
+    targets = rng.integers(0, len(players), amount)
+    actions = []
+    for name, sender, target in zip(picked, senders, targets):
+        action = names[name]
+        args = (players[target],) if action == "healCharacter" else ()
+        actions.append((action, players[sender], args))
+    return actions
+
+
+def run_mix(game, actions, workers):
+    """Sends the actions from `workers` threads.
+
+    Returns:
+        ActionStats and elapsed seconds
+    """
+    stats = ActionStats()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(lambda action: send(game, *action), actions)
+        for (action, _, _), (latency, tx) in zip(actions, results):
+            stats.record(action, latency, tx)
+    return stats, time.perf_counter() - started
+
+
+def killing_blow_sweep(participation=PARTICIPATION, workers=16):
+    """Gas of the killing blow of rounds with a growing number of attackers,
+    all attacking in parallel.
+    """
+    game, players = setup(max(participation))
+    results = {}
+    for amount in participation:
+        attackers = players[:amount]
+        total_damage = sum(c[1] for c in game.getCharacters(attackers))
+        game.stageBosses([(total_damage, 0, 100, 1)], {"from": get_account()})
+        round_id = game.currentRound()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            receipts = [
+                tx
+                for _, tx in executor.map(
+                    lambda player: send(game, "attackBoss", player), attackers
+                )
+                if tx is not None
+            ]
+        assert game.currentRound() == round_id + 1
+        # everyone attacked before the boss died, the last mined attack killed it
+        killing_blow = max(receipts, key=lambda tx: (tx.block_number, tx.txindex))
+        results[amount] = killing_blow.gas_used
+    return results
+
+
+def arena_kill_throughput(arenas=ARENAS, players=64, workers=16):
+    """Kills with K arena bosses alive at once. Players are split between the
+    arenas and every arena boss has the hp of the damage of its players, so the
+    same attacks, sent in parallel, kill K bosses.
+
+    Returns:
+        {arenas: (kills, kills per second, attacks per second)}
+    """
+    game, accounts = setup(players)
+    damage = [character[1] for character in game.getCharacters(accounts)]
+    results = {}
+    for amount in arenas:
+        groups = [range(i, players, amount) for i in range(amount)]
+        bosses = [
+            (sum(damage[j] for j in group), 0, 100, 1 + i % 3)
+            for i, group in enumerate(groups)
+        ]
+        first_arena = game.arenasOpened() + 1
+        game.openArenas(bosses, {"from": get_account()})
+        attacks = [
+            (accounts[j], first_arena + i)
+            for i, group in enumerate(groups)
+            for j in group
+        ]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(
+                executor.map(
+                    lambda attack: send(game, "attackBoss", attack[0], (attack[1],)),
+                    attacks,
+                )
+            )
+        elapsed = time.perf_counter() - started
+        kills = sum(game.arenaBosses(first_arena + i)[0] == 0 for i in range(amount))
+        results[amount] = (kills, kills / elapsed, len(attacks) / elapsed)
+    return results
+
+
+def main(players=100, actions=1000, workers=16):
+    players, actions, workers = int(players), int(actions), int(workers)
+    game, accounts = setup(players)
+    stage_bosses(game, accounts)
+    stats, elapsed = run_mix(game, random_actions(accounts, actions), workers)
+    stats.print_report(elapsed)
+
+    print(f"{'attackers':>10} | {'killing blow gas':>16}")
+    for amount, gas_used in killing_blow_sweep(workers=workers).items():
+        print(f"{amount:>10} | {gas_used:>16}")
+
+    print(f"{'arenas':>10} | {'kills':>6} | {'kills/s':>8} | {'attacks/s':>9}")
+    for amount, (kills, kill_rate, attack_rate) in arena_kill_throughput(
+        players=players, workers=workers
+    ).items():
+        print(f"{amount:>10} | {kills:>6} | {kill_rate:>8.2f} | {attack_rate:>9.1f}")
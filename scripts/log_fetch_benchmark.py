@@ -0,0 +1,205 @@
+"""Throughput benchmark of the event indexer fetch modes.
+
+Starts a local JSON-RPC stand-in of a hosted node that serves synthetic DamageMade
+logs with a fixed response latency and rejects too large eth_getLogs ranges, then
+indexes the same history with the synchronous indexer and with the async fetcher
+at several concurrency levels.
+
+    python -m scripts.log_fetch_benchmark
+    brownie run scripts/log_fetch_benchmark.py main [blocks] [latency in ms] [blocks per request]
+"""
+import asyncio
+import os
+import multiprocessing
+import tempfile
+import time
+
+from aiohttp import web
+from eth_utils import keccak, to_checksum_address, to_hex
+from web3 import Web3
+
+from scripts.async_log_fetcher import AsyncLogFetcher
+from scripts.event_indexer import EventIndexer
+
+
+CONTRACT_ADDRESS = "0x" + "11" * 20
+PLAYER_ADDRESS = "0x" + "22" * 20
+DAMAGE_MADE_ABI = {
+    "anonymous": False,
+    "inputs": [
+        {"indexed": False, "name": "user", "type": "address"},
+        {"indexed": False, "name": "amount", "type": "uint256"},
+    ],
+    "name": "DamageMade",
+    "type": "event",
+}
+DAMAGE_MADE_TOPIC = to_hex(keccak(text="DamageMade(address,uint256)"))
+CONCURRENCY = [1, 4, 8, 16]
+
+
+class NodeStandIn:
+    """JSON-RPC server with `events_per_block` DamageMade logs in every block.
+
+    Args:
+        blocks (int): chain height
+        events_per_block (int): logs in every block
+        latency (float): delay of every response in seconds
+        max_range (int): eth_getLogs over more blocks is rejected
+        port (int): port to listen on
+    """
+
+    def __init__(
+        self, blocks, events_per_block=1, latency=0.2, max_range=1000, port=8599
+    ):
+        self.blocks = blocks
+        self.events_per_block = events_per_block
+        self.latency = latency
+        self.max_range = max_range
+        self.url = f"http://127.0.0.1:{port}"
+        self.port = port
+        # abi encoded (PLAYER_ADDRESS, 10)
+        self.data = (
+            "0x" + PLAYER_ADDRESS[2:].rjust(64, "0") + hex(10)[2:].rjust(64, "0")
+        )
+
+    def _log(self, block, index):
+        return {
+            "address": to_checksum_address(CONTRACT_ADDRESS),
+            "topics": [DAMAGE_MADE_TOPIC],
+            "data": self.data,
+            "blockNumber": hex(block),
+            "blockHash": to_hex(block.to_bytes(32, "big")),
+            "logIndex": hex(index),
+            "transactionHash": to_hex(keccak(block.to_bytes(32, "big"))),
+            "transactionIndex": "0x0",
+            "removed": False,
+        }
+
+    async def _handle(self, request):
+        body = await request.json()
+        await asyncio.sleep(self.latency)
+        if body["method"] == "eth_blockNumber":
+            result = hex(self.blocks)
+        elif body["method"] == "eth_chainId":
+            result = "0x539"
+        elif body["method"] == "eth_getLogs":
+            params = body["params"][0]
+            start = int(params["fromBlock"], 16)
+            end = min(int(params["toBlock"], 16), self.blocks)
+            if end - start + 1 > self.max_range:
+                return web.json_response(
+                    {
+                        "jsonrpc": "2.0",
+                        "id": body["id"],
+                        "error": {
+                            "code": -32005,
+                            "message": f"eth_getLogs is limited to {self.max_range} block range",
+                        },
+                    }
+                )
+            result = [
+                self._log(block, index)
+                for block in range(start, end + 1)
+                for index in range(self.events_per_block)
+            ]
+        else:
+            result = None
+        return web.json_response({"jsonrpc": "2.0", "id": body["id"], "result": result})
+
+    def _serve(self, started):
+        app = web.Application()
+        app.router.add_post("/", self._handle)
+
+        async def on_startup(app):
+            started.set()
+
+        app.on_startup.append(on_startup)
+        web.run_app(app, host="127.0.0.1", port=self.port, print=None)
+
+    def start(self):
+        """Runs the server in a separate process, so it doesn't compete with the
+        measured client for the interpreter lock
+        """
+        started = multiprocessing.Event()
+        self.process = multiprocessing.Process(
+            target=self._serve, args=(started,), daemon=True
+        )
+        self.process.start()
+        started.wait()
+
+    def stop(self):
+        self.process.terminate()
+        self.process.join()
+
+
+def _indexer(node, database, chunk_size):
+    w3 = Web3(Web3.HTTPProvider(node.url))
+    return EventIndexer(
+        w3,
+        CONTRACT_ADDRESS,
+        [DAMAGE_MADE_ABI],
+        database,
+        chunk_size=chunk_size,
+        max_chunk_size=chunk_size,
+    )
+
+
+def measure_sync(node, database, chunk_size):
+    indexer = _indexer(node, database, chunk_size)
+    started = time.perf_counter()
+    stored = indexer.run()
+    elapsed = time.perf_counter() - started
+    indexer.close()
+    return stored, elapsed
+
+
+def measure_async(node, database, chunk_size, concurrency):
+    indexer = _indexer(node, database, chunk_size)
+    fetcher = AsyncLogFetcher(
+        node.url,
+        indexer.address,
+        indexer.topics,
+        concurrency=concurrency,
+        chunk_size=chunk_size,
+    )
+    started = time.perf_counter()
+    stored = asyncio.run(indexer.run_async(fetcher))
+    elapsed = time.perf_counter() - started
+    indexer.close()
+    return stored, elapsed
+
+
+def print_row(mode, blocks, stored, elapsed):
+    print(
+        f"{mode:>16} | {elapsed:>8.2f} s | {blocks / elapsed:>10.0f} blocks/s "
+        f"| {stored / elapsed:>10.0f} events/s"
+    )
+
+
+def main(blocks=20000, latency_ms=200, chunk_size=500):
+    blocks, chunk_size = int(blocks), int(chunk_size)
+    node = NodeStandIn(blocks, latency=int(latency_ms) / 1000)
+    node.start()
+    print(
+        f"{blocks} blocks, {latency_ms} ms per request, {chunk_size} blocks per request"
+    )
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            stored, elapsed = measure_sync(
+                node, os.path.join(directory, "sync.sqlite"), chunk_size
+            )
+            print_row("sync", blocks, stored, elapsed)
+            for concurrency in CONCURRENCY:
+                stored, elapsed = measure_async(
+                    node,
+                    os.path.join(directory, f"async_{concurrency}.sqlite"),
+                    chunk_size,
+                    concurrency,
+                )
+                print_row(f"async x{concurrency}", blocks, stored, elapsed)
+    finally:
+        node.stop()
+
+
+if __name__ == "__main__":
+    main()
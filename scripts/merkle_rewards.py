@@ -0,0 +1,192 @@
+"""Merkle settlement of the round rewards.
+
+In Merkle settlement mode the game doesn't store damage of every user. After the
+round the shares are computed off chain from the DamageMade events of the round,
+with the same formula as the contract, and only the Merkle root of the shares is
+published. Users claim their share with `claimRewardsWithProof` or
+`mintRewardNFTWithProof` and the proof from the saved claims file.
+
+    brownie run scripts/merkle_rewards.py main <round> [database] [claims file]
+        builds the shares of the round from the event indexer database,
+        publishes the root and saves the claims
+    python -m scripts.merkle_rewards [participants]
+        measures building the tree of many participants
+"""
+import json
+import sys
+import time
+
+from eth_utils import to_checksum_address, to_hex
+
+try:
+    # pysha3 hashes several times faster than the pycryptodome backend of eth-hash
+    from sha3 import keccak_256
+
+    def keccak(data):
+        return keccak_256(data).digest()
+
+except ImportError:
+    from eth_utils import keccak
+
+
+def round_damage(events, round_id):
+    """Damage of every user in the round, from events in chain order.
+    Every BossCreated event starts the next round, the first one starts round 1.
+
+    Args:
+        events: iterable of (event name, args)
+        round_id (int): id of the round
+
+    Returns:
+        dict {user: damage}
+    """
+    current_round = 0
+    damage = {}
+    for event, args in events:
+        if event == "BossCreated":
+            current_round += 1
+            if current_round > round_id:
+                break
+        elif event == "DamageMade" and current_round == round_id:
+            user = to_checksum_address(args["user"])
+            damage[user] = damage.get(user, 0) + int(args["amount"])
+    return damage
+
+
+def shares(damage, reward, total_damage):
+    """{user: (damage, reward)}, share is round reward * user damage / round total damage
+    rounded down, like in _unsettledReward
+    """
+    return {
+        user: (amount, reward * amount // total_damage)
+        for user, amount in damage.items()
+    }
+
+
+def leaf_hash(user, round_id, damage, reward):
+    """keccak256(keccak256(abi.encode(user, round, damage, reward)))"""
+    encoded = (
+        bytes.fromhex(user[2:]).rjust(32, b"\0")
+        + round_id.to_bytes(32, "big")
+        + damage.to_bytes(32, "big")
+        + reward.to_bytes(32, "big")
+    )
+    return keccak(keccak(encoded))
+
+
+def hash_pair(a, b):
+    """Pairs are hashed sorted, like in OpenZeppelin MerkleProof"""
+    return keccak(a + b) if a < b else keccak(b + a)
+
+
+class MerkleRewards:
+    """Merkle tree of the shares of one round. The last node of a level with an
+    odd number of nodes moves to the next level as is.
+
+    Args:
+        round_id (int): id of the round
+        claims (dict): {user: (damage, reward)}, see `shares`
+    """
+
+    def __init__(self, round_id, claims):
+        self.round_id = round_id
+        self.claims = claims
+        self.users = sorted(claims)
+        self.index = {user: i for i, user in enumerate(self.users)}
+        level = [leaf_hash(user, round_id, *claims[user]) for user in self.users]
+        self.levels = [level]
+        while len(level) > 1:
+            level = [
+                hash_pair(level[i], level[i + 1]) if i + 1 < len(level) else level[i]
+                for i in range(0, len(level), 2)
+            ]
+            self.levels.append(level)
+
+    @property
+    def root(self):
+        return self.levels[-1][0] if self.users else bytes(32)
+
+    def proof(self, user):
+        """Sibling hashes from the leaf of the user up to the root"""
+        proof = []
+        i = self.index[user]
+        for level in self.levels[:-1]:
+            sibling = i ^ 1
+            if sibling < len(level):
+                proof.append(level[sibling])
+            i //= 2
+        return proof
+
+    def to_json(self):
+        return {
+            "round": self.round_id,
+            "root": to_hex(self.root),
+            "claims": {
+                user: {
+                    "damage": damage,
+                    "reward": reward,
+                    "proof": [to_hex(node) for node in self.proof(user)],
+                }
+                for user, (damage, reward) in self.claims.items()
+            },
+        }
+
+
+def verify(proof, root, leaf):
+    """The same check as MerkleProof.verify"""
+    node = leaf
+    for sibling in proof:
+        node = hash_pair(node, sibling)
+    return node == root
+
+
+def build_round(game, round_id, events):
+    """Shares and tree of a finished round of the game, checked against its ledger"""
+    _, reward, total_damage, merkle_settlement = game.rounds(round_id)
+    assert merkle_settlement, f"Round {round_id} is not settled with a Merkle root"
+    damage = round_damage(events, round_id)
+    assert (
+        sum(damage.values()) == total_damage
+    ), "Events don't add up to the round damage"
+    return MerkleRewards(round_id, shares(damage, reward, total_damage))
+
+
+def main(round_id, database=None, claims_path=None):
+    # the project is only loaded by brownie run, the benchmark runs without it
+    from brownie import WorldOfLedger
+    from scripts.helpful_scripts import get_account
+    from scripts.event_indexer import DEFAULT_DATABASE, read_events
+
+    round_id = int(round_id)
+    game = WorldOfLedger[-1]
+    events = (
+        (event, args)
+        for _, _, event, args in read_events(database or DEFAULT_DATABASE, game.address)
+    )
+    tree = build_round(game, round_id, events)
+    game.publishRewardRoot(round_id, tree.root, {"from": get_account()})
+    claims_path = claims_path or f"rewards_round_{round_id}.json"
+    with open(claims_path, "w") as f:
+        json.dump(tree.to_json(), f)
+    print(
+        f"Published root {to_hex(tree.root)} of {len(tree.users)} shares to {claims_path}"
+    )
+
+
+def benchmark(participants=100_000):
+    damage = {f"0x{i:040x}": 1 + i % 100 for i in range(1, participants + 1)}
+    started = time.perf_counter()
+    tree = MerkleRewards(1, shares(damage, 10**18, sum(damage.values())))
+    built = time.perf_counter() - started
+    started = time.perf_counter()
+    for user in tree.users:
+        tree.proof(user)
+    proved = time.perf_counter() - started
+    print(
+        f"{participants} participants: tree in {built:.2f} s, "
+        f"all proofs in {proved:.2f} s, {len(tree.levels) - 1} proof nodes"
+    )
+
+
+if __name__ == "__main__":
+    benchmark(*map(int, sys.argv[1:]))
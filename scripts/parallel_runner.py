@@ -0,0 +1,162 @@
+"""Sharded runs of the tests and of the gas benchmarks across CPU cores.
+
+Every worker runs its own development chain on its own port and deploys its own
+LinkToken, VRFCoordinatorV2Mock, BossContract and WorldOfLedger, so workers never
+share state:
+
+- tests are sharded by module with `brownie test -n <workers>`, which starts the
+  chain of worker N on the default port + N. Module scoped deployments stay in one
+  worker, and tests/conftest.py merges the gas profiles of the workers, so
+  `brownie test -n 4 --gas` prints and saves the gas of the whole suite;
+- benchmark scenarios of scripts/gas_benchmark.py are sent to a pool of processes,
+  worker N on BENCHMARK_PORT + N, and their results are merged in scenario order.
+
+    python -m scripts.parallel_runner [workers ...]
+        times the tests and the benchmarks with 1, 4 and 8 workers
+"""
+import json
+import multiprocessing
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+
+PROJECT_PATH = Path(__file__).parent.parent
+GAS_PROFILE_PATH = PROJECT_PATH / "reports" / "gas_profile.json"
+NETWORK = "development"
+# above the ports of `brownie run` and of the test workers
+BENCHMARK_PORT = 8645
+WORKERS = [1, 4, 8]
+
+
+def merge_gas_profiles(profile, other):
+    """Adds the gas profile of another process to the profile, both in the format
+    of brownie TxHistory().gas_profile: {function: {avg, high, low, count,
+    count_success, avg_success}}.
+    """
+    for fn_name, gas in other.items():
+        if fn_name not in profile:
+            profile[fn_name] = dict(gas)
+            continue
+        merged = profile[fn_name]
+        count = merged["count"] + gas["count"]
+        count_success = merged["count_success"] + gas["count_success"]
+        merged.update(
+            avg=(merged["avg"] * merged["count"] + gas["avg"] * gas["count"]) // count,
+            high=max(merged["high"], gas["high"]),
+            low=min(merged["low"], gas["low"]),
+            count=count,
+        )
+        if count_success:
+            merged["avg_success"] = (
+                merged["avg_success"] * merged["count_success"]
+                + gas["avg_success"] * gas["count_success"]
+            ) // count_success
+        merged["count_success"] = count_success
+    return profile
+
+
+def save_gas_profile(profile, path=GAS_PROFILE_PATH):
+    path.parent.mkdir(exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(profile, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def _load_project():
+    # the scripts import the contracts from the brownie namespace, like under
+    # `brownie run`, so the project is loaded before they are imported
+    from brownie import project
+
+    game_project = project.load(PROJECT_PATH)
+    game_project.load_config()
+    game_project._add_to_main_namespace()
+
+
+def _connect_worker(ports):
+    # runs once in every spawned process, before its first scenario
+    from brownie import network
+    from brownie._config import CONFIG
+
+    _load_project()
+    CONFIG.networks[NETWORK]["cmd_settings"]["port"] = ports.get()
+    network.connect(NETWORK)
+
+
+def _run_scenario(name):
+    from scripts import gas_benchmark
+
+    started = time.perf_counter()
+    results = getattr(gas_benchmark, name)()
+    return results, time.perf_counter() - started
+
+
+def run_sharded(scenarios, workers):
+    """Runs the scenarios of scripts/gas_benchmark.py on `workers` processes, each
+    with its own chain. Idle workers take the next scenario, so a long scenario
+    doesn't hold back the others.
+
+    Args:
+        scenarios (list): names of the benchmark functions
+        workers (int): number of processes
+
+    Returns:
+        dict: results of all scenarios, merged in scenario order
+    """
+    context = multiprocessing.get_context("spawn")
+    ports = context.Queue()
+    for i in range(workers):
+        ports.put(BENCHMARK_PORT + i)
+    with ProcessPoolExecutor(
+        workers, mp_context=context, initializer=_connect_worker, initargs=(ports,)
+    ) as pool:
+        futures = [pool.submit(_run_scenario, name) for name in scenarios]
+        results = {}
+        for name, future in zip(scenarios, futures):
+            scenario_results, elapsed = future.result()
+            print(f"{name:>32} | {elapsed:>8.1f} s")
+            results.update(scenario_results)
+    return results
+
+
+def run_tests(workers, path="tests/unit"):
+    """Runs the tests with `brownie test`, sharded by module above 1 worker.
+
+    Returns:
+        (wall time in seconds, exit code)
+    """
+    command = ["brownie", "test", path]
+    if workers > 1:
+        command += ["-n", str(workers)]
+    started = time.perf_counter()
+    exit_code = subprocess.run(command, cwd=PROJECT_PATH).returncode
+    return time.perf_counter() - started, exit_code
+
+
+def main(*workers):
+    _load_project()
+    from scripts.gas_benchmark import SCENARIOS
+
+    workers = [int(amount) for amount in workers] or WORKERS
+    timings = {}
+    reference = None
+    for amount in workers:
+        tests_time, exit_code = run_tests(amount)
+        started = time.perf_counter()
+        results = run_sharded(SCENARIOS, amount)
+        timings[amount] = (tests_time, exit_code, time.perf_counter() - started)
+        if reference is None:
+            reference = results
+        elif results != reference:
+            print(f"Gas results of {amount} workers differ from {workers[0]} worker(s)")
+    print(f"{'workers':>7} | {'tests s':>8} | {'exit':>4} | {'benchmarks s':>12}")
+    for amount, (tests_time, exit_code, benchmarks_time) in timings.items():
+        print(
+            f"{amount:>7} | {tests_time:>8.1f} | {exit_code:>4} | {benchmarks_time:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,733 @@
+"""Event-sourced replay of the World Of Ledger state at any block.
+
+Characters, round damage, pending rewards and reward NFT owners are rebuilt from
+the chain history instead of calling the getters of every address at an archive
+node. Successful transactions sent to the game are decoded and applied with the
+same integer arithmetic as the contract, and the game events carry what the
+inputs don't: CharacterCreated the random stats of new characters, BossCreated the
+id of a populated boss and Transfer the owners of the reward NFTs. DamageMade
+events are compared with the replayed damage, so a transaction the replay doesn't
+model (for example a call of the game from another contract) stops it with
+ReplayError instead of silently diverging.
+
+The state is saved to a compact columnar .npz snapshot every `snapshot_every`
+blocks, and any block is restored from the nearest snapshot before it plus a
+short replay.
+
+    WEB3_PROVIDER_URI=<rpc url> brownie run scripts/state_replay.py main <game address>
+        <deployment block> [block] [snapshot directory] [verify]
+"""
+import json
+import math
+import os
+from collections import defaultdict, deque
+from pathlib import Path
+
+import numpy as np
+from eth_utils import to_checksum_address
+from web3 import Web3
+
+from scripts import artifact_cache
+from scripts.event_indexer import DEFAULT_RPC_URL, EventIndexer
+
+
+REPLAY_EVENTS = ["CharacterCreated", "BossCreated", "DamageMade", "Transfer"]
+DEFAULT_SNAPSHOT_DIR = "snapshots"
+DEFAULT_SNAPSHOT_EVERY = 10_000
+DAY = 24 * 60 * 60
+UINT32_MAX = 2**32 - 1
+UINT96_MAX = 2**96 - 1
+
+ACTION_ATTACK = 0
+ACTION_ATTACK_ARENA = 1
+ACTION_FIRE_BOLT = 2
+ACTION_HEAL = 3
+ACTION_CLAIM_REWARDS = 4
+ACTION_MINT_REWARD_NFT = 5
+ACTION_SETTLE_ARENA = 6
+
+
+class ReplayError(Exception):
+    pass
+
+
+def level_of(xp):
+    """Character level of the xp, see `WorldOfLedger._updateUserLevel`"""
+    return math.isqrt(xp) * 20 // 100
+
+
+def _struct(value, *names):
+    # web3 decodes structs to dicts, older versions to tuples
+    if isinstance(value, dict):
+        return [value[name] for name in names]
+    return list(value)
+
+
+class Character:
+    __slots__ = ("hp", "damage", "xp", "level", "is_alive", "fire_bolt_time")
+
+    def __init__(self, hp, damage, xp=0, level=0, is_alive=True, fire_bolt_time=0):
+        self.hp = hp
+        self.damage = damage
+        self.xp = xp
+        self.level = level
+        self.is_alive = is_alive
+        self.fire_bolt_time = fire_bolt_time
+
+    def as_tuple(self):
+        """The same order as the usersCharacters getter"""
+        return (
+            self.hp,
+            self.damage,
+            self.xp,
+            self.level,
+            self.is_alive,
+            self.fire_bolt_time,
+        )
+
+
+class GameState:
+    """State of the game after `block`, changed by the same rules as the contract.
+    Only successful transactions are applied, so the requires of the contract are
+    not checked again.
+    """
+
+    def __init__(self, block=0):
+        self.block = block
+        self.characters = {}
+        self.damage_made = defaultdict(int)
+        self.users_round = defaultdict(int)
+        self.users_rewards = defaultdict(int)
+        self.pending_reward_nfts = defaultdict(int)
+        self.token_owners = {}
+        # round id: [boss id, reward, total damage, merkle settlement]
+        self.rounds = defaultdict(lambda: [0, 0, 0, False])
+        self.current_round = 1
+        # bosses are [hp, damage, reward, id]
+        self.boss = [0, 0, 0, 0]
+        self.boss_alive = False
+        self.boss_queue = deque()
+        self.arena_bosses = {}
+        self.arena_total_damage = defaultdict(int)
+        self.arena_damage = defaultdict(int)
+        self.heal_spell_level = 2
+        self.fire_bolt_spell_level = 3
+        self.fire_bolt_cooldown = DAY
+        self.merkle_settlement = False
+        self.next_merkle_settlement = False
+        # DamageMade of the transaction being applied, checked against its events
+        self.emitted_damage = []
+
+    # player actions
+
+    def attack(self, user):
+        character = self.characters[user]
+        self._user_attack(user, character.damage)
+        self._boss_attack(character, self.boss[1])
+        if character.hp == 0:
+            self._character_died(character)
+        if self.boss[0] == 0:
+            self._finalize_round()
+
+    def attack_arena(self, user, arena_id):
+        character = self.characters[user]
+        boss = self.arena_bosses[arena_id]
+        damage = min(character.damage, boss[0])
+        boss[0] -= damage
+        self.arena_total_damage[arena_id] += damage
+        self.arena_damage[arena_id, user] += damage
+        self._boss_attack(character, boss[1])
+        if character.hp == 0:
+            self._character_died(character)
+
+    def heal(self, user, healed_user):
+        healed = self.characters[healed_user]
+        healed.hp = min(healed.hp + self.characters[user].damage, UINT32_MAX)
+
+    def fire_bolt(self, user, timestamp):
+        character = self.characters[user]
+        character.fire_bolt_time = timestamp + self.fire_bolt_cooldown
+        self._user_attack(user, character.damage * 2)
+        if self.boss[0] == 0:
+            self._finalize_round()
+
+    def claim_rewards(self, user):
+        self._settle_rewards(user)
+        character = self.characters.get(user)
+        if character is not None:
+            character.xp = min(character.xp + self.users_rewards[user], UINT96_MAX)
+            character.level = level_of(character.xp)
+        self.users_rewards[user] = 0
+
+    def mint_reward_nft(self, user):
+        self._settle_rewards(user)
+        self.pending_reward_nfts[user] = 0
+
+    def settle_with_proof(self, user, reward):
+        self.users_rewards[user] += reward
+        self.pending_reward_nfts[user] += 1
+
+    def settle_arena(self, user, arena_id):
+        damage = self.arena_damage.pop((arena_id, user))
+        reward = self.arena_bosses[arena_id][2]
+        self.users_rewards[user] += reward * damage // self.arena_total_damage[arena_id]
+        self.pending_reward_nfts[user] += 1
+
+    def perform_actions(self, user, actions, timestamp):
+        for action in actions:
+            kind, arg = _struct(action, "kind", "arg")
+            if kind == ACTION_ATTACK:
+                self.attack(user)
+            elif kind == ACTION_ATTACK_ARENA:
+                self.attack_arena(user, arg)
+            elif kind == ACTION_FIRE_BOLT:
+                self.fire_bolt(user, timestamp)
+            elif kind == ACTION_HEAL:
+                # the contract truncates the argument with address(uint160(arg))
+                healed_user = (arg % 2**160).to_bytes(20, "big")
+                self.heal(user, to_checksum_address(healed_user))
+            elif kind == ACTION_CLAIM_REWARDS:
+                self.claim_rewards(user)
+            elif kind == ACTION_MINT_REWARD_NFT:
+                self.mint_reward_nft(user)
+            elif kind == ACTION_SETTLE_ARENA:
+                self.settle_arena(user, arg)
+
+    # owner actions
+
+    def populate_boss(self, hp, damage, reward, boss_id):
+        self.boss = [hp, damage, reward, boss_id]
+        self.boss_alive = True
+
+    def stage_bosses(self, bosses):
+        self.boss_queue.extend(
+            _struct(boss, "hp", "damage", "reward", "id") for boss in bosses
+        )
+        if not self.boss_alive:
+            self._spawn_staged_boss()
+
+    def open_arenas(self, bosses):
+        for boss in bosses:
+            arena_id = len(self.arena_bosses) + 1
+            self.arena_bosses[arena_id] = _struct(boss, "hp", "damage", "reward", "id")
+
+    def set_merkle_settlement(self, enabled):
+        self.next_merkle_settlement = enabled
+        if not self.boss_alive:
+            self.merkle_settlement = enabled
+
+    # internal functions of the contract
+
+    def _user_attack(self, user, damage):
+        if self.users_round[user] != self.current_round:
+            self._settle_rewards(user)
+            self.users_round[user] = self.current_round
+        damage = min(damage, self.boss[0])
+        self.rounds[self.current_round][2] += damage
+        if not self.merkle_settlement:
+            self.damage_made[user] += damage
+        self.boss[0] -= damage
+        self.emitted_damage.append((user, damage))
+
+    @staticmethod
+    def _boss_attack(character, boss_damage):
+        character.hp = max(character.hp - boss_damage, 0)
+
+    @staticmethod
+    def _character_died(character):
+        character.is_alive = False
+        character.xp = 0
+        character.level = 0
+
+    def _finalize_round(self):
+        self.boss_alive = False
+        round_ = self.rounds[self.current_round]
+        round_[0], round_[1], round_[3] = (
+            self.boss[3],
+            self.boss[2],
+            self.merkle_settlement,
+        )
+        self.merkle_settlement = self.next_merkle_settlement
+        self.current_round += 1
+        self._spawn_staged_boss()
+
+    def _spawn_staged_boss(self):
+        if self.boss_queue:
+            self.boss = list(self.boss_queue.popleft())
+            self.boss_alive = True
+
+    def _settle_rewards(self, user):
+        damage = self.damage_made.get(user, 0)
+        round_id = self.users_round.get(user, 0)
+        if damage == 0 or round_id == self.current_round:
+            return
+        _, reward, total_damage, _ = self.rounds[round_id]
+        self.users_rewards[user] += reward * damage // total_damage
+        self.pending_reward_nfts[user] += 1
+        del self.damage_made[user]
+
+    def users(self):
+        """Addresses with a character or with any reward state"""
+        return (
+            set(self.characters)
+            | set(self.damage_made)
+            | set(self.users_round)
+            | set(self.users_rewards)
+            | set(self.pending_reward_nfts)
+        )
+
+    # snapshots
+
+    def to_columns(self):
+        """Columnar arrays of the state for np.savez. Values that may not fit
+        int64 (xp, rewards, boss hp) are stored as decimal strings.
+        """
+        users = sorted(self.users())
+        characters = [
+            self.characters.get(user, Character(0, 0, is_alive=False)) for user in users
+        ]
+        arena_keys = sorted(self.arena_damage)
+        round_ids = sorted(self.rounds)
+        tokens = sorted(self.token_owners)
+        meta = {
+            "block": self.block,
+            "current_round": self.current_round,
+            "boss": self.boss,
+            "boss_alive": self.boss_alive,
+            "boss_queue": list(self.boss_queue),
+            "arena_bosses": self.arena_bosses,
+            "arena_total_damage": self.arena_total_damage,
+            "heal_spell_level": self.heal_spell_level,
+            "fire_bolt_spell_level": self.fire_bolt_spell_level,
+            "fire_bolt_cooldown": self.fire_bolt_cooldown,
+            "merkle_settlement": self.merkle_settlement,
+            "next_merkle_settlement": self.next_merkle_settlement,
+        }
+        return {
+            "meta": np.array(json.dumps(meta)),
+            "users": np.array(users, dtype="U42"),
+            "has_character": np.array(
+                [user in self.characters for user in users], dtype=bool
+            ),
+            "hp": np.array([c.hp for c in characters], dtype=np.int64),
+            "damage": np.array([c.damage for c in characters], dtype=np.int64),
+            "xp": _decimal([c.xp for c in characters]),
+            "level": np.array([c.level for c in characters], dtype=np.int64),
+            "is_alive": np.array([c.is_alive for c in characters], dtype=bool),
+            "fire_bolt_time": np.array(
+                [c.fire_bolt_time for c in characters], dtype=np.int64
+            ),
+            "damage_made": _decimal([self.damage_made.get(u, 0) for u in users]),
+            "users_round": np.array(
+                [self.users_round.get(u, 0) for u in users], dtype=np.int64
+            ),
+            "users_rewards": _decimal([self.users_rewards.get(u, 0) for u in users]),
+            "pending_reward_nfts": np.array(
+                [self.pending_reward_nfts.get(u, 0) for u in users], dtype=np.int64
+            ),
+            "round_ids": np.array(round_ids, dtype=np.int64),
+            "round_boss_ids": np.array(
+                [self.rounds[r][0] for r in round_ids], dtype=np.int64
+            ),
+            "round_rewards": _decimal([self.rounds[r][1] for r in round_ids]),
+            "round_total_damage": _decimal([self.rounds[r][2] for r in round_ids]),
+            "round_merkle": np.array(
+                [self.rounds[r][3] for r in round_ids], dtype=bool
+            ),
+            "arena_ids": np.array([a for a, _ in arena_keys], dtype=np.int64),
+            "arena_users": np.array([u for _, u in arena_keys], dtype="U42"),
+            "arena_damage": _decimal([self.arena_damage[k] for k in arena_keys]),
+            "token_ids": np.array(tokens, dtype=np.int64),
+            "token_owners": np.array(
+                [self.token_owners[t] for t in tokens], dtype="U42"
+            ),
+        }
+
+    @classmethod
+    def from_columns(cls, columns):
+        meta = json.loads(str(columns["meta"]))
+        state = cls(meta["block"])
+        state.current_round = meta["current_round"]
+        state.boss = meta["boss"]
+        state.boss_alive = meta["boss_alive"]
+        state.boss_queue = deque(meta["boss_queue"])
+        state.arena_bosses = {int(a): b for a, b in meta["arena_bosses"].items()}
+        state.arena_total_damage.update(
+            {int(a): d for a, d in meta["arena_total_damage"].items()}
+        )
+        state.heal_spell_level = meta["heal_spell_level"]
+        state.fire_bolt_spell_level = meta["fire_bolt_spell_level"]
+        state.fire_bolt_cooldown = meta["fire_bolt_cooldown"]
+        state.merkle_settlement = meta["merkle_settlement"]
+        state.next_merkle_settlement = meta["next_merkle_settlement"]
+
+        users = [str(user) for user in columns["users"]]
+        xp = _integers(columns["xp"])
+        damage_made = _integers(columns["damage_made"])
+        users_rewards = _integers(columns["users_rewards"])
+        for i, user in enumerate(users):
+            if columns["has_character"][i]:
+                state.characters[user] = Character(
+                    int(columns["hp"][i]),
+                    int(columns["damage"][i]),
+                    xp[i],
+                    int(columns["level"][i]),
+                    bool(columns["is_alive"][i]),
+                    int(columns["fire_bolt_time"][i]),
+                )
+            # zero values are not stored, like deleted storage of the contract
+            for mapping, value in (
+                (state.damage_made, damage_made[i]),
+                (state.users_round, int(columns["users_round"][i])),
+                (state.users_rewards, users_rewards[i]),
+                (state.pending_reward_nfts, int(columns["pending_reward_nfts"][i])),
+            ):
+                if value:
+                    mapping[user] = value
+
+        for i, round_id in enumerate(columns["round_ids"]):
+            state.rounds[int(round_id)] = [
+                int(columns["round_boss_ids"][i]),
+                _integers(columns["round_rewards"][i : i + 1])[0],
+                _integers(columns["round_total_damage"][i : i + 1])[0],
+                bool(columns["round_merkle"][i]),
+            ]
+        arena_damage = _integers(columns["arena_damage"])
+        for arena_id, user, damage in zip(
+            columns["arena_ids"], columns["arena_users"], arena_damage
+        ):
+            state.arena_damage[int(arena_id), str(user)] = damage
+        state.token_owners = {
+            int(token): str(owner)
+            for token, owner in zip(columns["token_ids"], columns["token_owners"])
+        }
+        return state
+
+    def save(self, path):
+        # written aside and renamed, so a crash never leaves half a snapshot
+        # through a file handle, so numpy doesn't add .npz and the snapshot glob
+        # never matches a temporary file left by a crash
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as f:
+            np.savez_compressed(f, **self.to_columns())
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as columns:
+            return cls.from_columns(columns)
+
+
+def _decimal(values):
+    return np.array([str(value) for value in values], dtype="U80")
+
+
+def _integers(column):
+    return [int(value) for value in column]
+
+
+class GameTransactions:
+    """Applies decoded transactions of the game to a GameState"""
+
+    def __init__(self, contract):
+        self.contract = contract
+
+    def apply(self, state, sender, data, timestamp, events):
+        """Applies one successful transaction sent to the game.
+
+        Args:
+            state (GameState): state to change
+            sender (string): checksum address of the sender
+            data (bytes): input of the transaction
+            timestamp (int): timestamp of the block
+            events (list): decoded game events of the transaction
+        """
+        function, args = self.contract.decode_function_input(data)
+        name = function.fn_name
+        if name == "attackBoss" and "arenaId" in args:
+            state.attack_arena(sender, args["arenaId"])
+        elif name == "attackBoss":
+            state.attack(sender)
+        elif name == "healCharacter":
+            state.heal(sender, args["healed_user"])
+        elif name == "castFireBolt":
+            state.fire_bolt(sender, timestamp)
+        elif name == "claimRewards":
+            state.claim_rewards(sender)
+        elif name == "mintRewardNFT":
+            state.mint_reward_nft(sender)
+        elif name == "claimRewardsWithProof":
+            state.settle_with_proof(sender, args["reward"])
+            state.claim_rewards(sender)
+        elif name == "mintRewardNFTWithProof":
+            state.settle_with_proof(sender, args["reward"])
+            state.mint_reward_nft(sender)
+        elif name == "settleArenaRewards":
+            for arena_id in args["arenaIds"]:
+                state.settle_arena(sender, arena_id)
+        elif name == "performActions":
+            state.perform_actions(sender, args["actions"], timestamp)
+        elif name == "relayActions":
+            for signed in args["bundle"]:
+                player, actions, _, _ = _struct(
+                    signed, "player", "actions", "deadline", "signature"
+                )
+                state.perform_actions(player, actions, timestamp)
+        elif name == "populate_boss":
+            (boss_id,) = [
+                e["args"]["bossID"] for e in events if e["event"] == "BossCreated"
+            ]
+            state.populate_boss(args["hp"], args["damage"], args["reward"], boss_id)
+        elif name == "stageBosses":
+            state.stage_bosses(args["bosses"])
+        elif name == "openArenas":
+            state.open_arenas(args["bosses"])
+        elif name == "setHealSpellLevel":
+            state.heal_spell_level = args["newLevel"]
+        elif name == "setFireBoltSpellLevel":
+            state.fire_bolt_spell_level = args["newLevel"]
+        elif name == "setFireBoltCooldownPeriod":
+            state.fire_bolt_cooldown = args["timeInDays"] * DAY
+        elif name == "setMerkleSettlement":
+            state.set_merkle_settlement(args["enabled"])
+        # other functions change nothing the replay keeps: requests of random
+        # words, enrollment, subscription, Merkle roots, approvals and transfers,
+        # whose Transfer events are applied below
+
+
+def apply_events(state, events):
+    """Applies the game events that carry state not found in the inputs"""
+    for event in events:
+        args = event["args"]
+        if event["event"] == "CharacterCreated":
+            state.characters[args["user"]] = Character(args["hp"], args["damage"])
+        elif event["event"] == "Transfer":
+            state.token_owners[args["tokenId"]] = args["to"]
+
+
+class ReplayEngine:
+    """Restores the game state at any block from snapshots and the chain history.
+
+    Args:
+        w3 (Web3): connected web3 instance
+        address (string): address of the WorldOfLedger contract
+        abi (list): contract ABI
+        deployment_block (int): block of the game deployment, the replay starts there
+        snapshot_dir (string): directory of the snapshots of this game
+        snapshot_every (int): blocks between snapshots
+    """
+
+    def __init__(
+        self,
+        w3,
+        address,
+        abi,
+        deployment_block,
+        snapshot_dir=DEFAULT_SNAPSHOT_DIR,
+        snapshot_every=DEFAULT_SNAPSHOT_EVERY,
+    ):
+        self.w3 = w3
+        self.address = to_checksum_address(address)
+        self.contract = w3.eth.contract(address=self.address, abi=abi)
+        self.transactions = GameTransactions(self.contract)
+        self.indexer = EventIndexer(
+            w3, self.address, abi, ":memory:", event_names=REPLAY_EVENTS
+        )
+        self.deployment_block = deployment_block
+        self.snapshot_dir = Path(snapshot_dir) / self.address
+        self.snapshot_every = snapshot_every
+
+    def snapshots(self):
+        """Blocks of the saved snapshots, in order"""
+        if not self.snapshot_dir.exists():
+            return []
+        return sorted(int(path.stem) for path in self.snapshot_dir.glob("*.npz"))
+
+    def state_at(self, block):
+        """State after all transactions of the block. Replays from the nearest
+        snapshot at or before the block and saves snapshots on the way.
+        """
+        earlier = [b for b in self.snapshots() if b <= block]
+        if earlier:
+            state = GameState.load(self.snapshot_dir / f"{earlier[-1]}.npz")
+        else:
+            state = GameState(self.deployment_block - 1)
+        self.replay(state, block)
+        return state
+
+    def replay(self, state, to_block):
+        """Applies the blocks after state.block up to to_block"""
+        start = state.block + 1
+        while start <= to_block:
+            # snapshots are taken at multiples of snapshot_every
+            end = min(
+                to_block, (start // self.snapshot_every + 1) * self.snapshot_every - 1
+            )
+            self._replay_range(state, start, end)
+            if (end + 1) % self.snapshot_every == 0:
+                self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+                state.save(self.snapshot_dir / f"{end}.npz")
+            start = end + 1
+        return state
+
+    def _replay_range(self, state, start, end):
+        # {block: {transaction index: events}}
+        logs = defaultdict(lambda: defaultdict(list))
+        for _, events in self.indexer.iter_chunks(start, end):
+            for event in events:
+                logs[event["blockNumber"]][event["transactionIndex"]].append(event)
+        # transactions without events (heals, claims) are found only in the blocks
+        for number in range(start, end + 1):
+            block = self.w3.eth.get_block(number, full_transactions=True)
+            block_logs = logs.pop(number, {})
+            game_transactions = {
+                tx["transactionIndex"]: tx
+                for tx in block["transactions"]
+                if tx["to"] is not None
+                and to_checksum_address(tx["to"]) == self.address
+            }
+            for index in sorted(set(block_logs) | set(game_transactions)):
+                events = block_logs.get(index, [])
+                tx = game_transactions.get(index)
+                if tx is not None:
+                    self._apply_transaction(state, tx, block["timestamp"], events)
+                apply_events(state, events)
+            state.block = number
+
+    def _apply_transaction(self, state, tx, timestamp, events):
+        receipt = self.w3.eth.get_transaction_receipt(tx["hash"])
+        if receipt["status"] != 1:
+            return
+        state.emitted_damage = []
+        self.transactions.apply(
+            state,
+            to_checksum_address(tx["from"]),
+            bytes(tx["input"]),
+            timestamp,
+            events,
+        )
+        emitted = [
+            (e["args"]["user"], e["args"]["amount"])
+            for e in events
+            if e["event"] == "DamageMade"
+        ]
+        if emitted != state.emitted_damage:
+            raise ReplayError(
+                f"Replay of transaction {tx['hash'].hex()} diverged: "
+                f"events {emitted}, replayed {state.emitted_damage}"
+            )
+
+
+def verify(state, contract):
+    """Differences between the replayed state and the getters of the game at
+    state.block, empty if they match.
+
+    Args:
+        state (GameState): replayed state
+        contract: web3 contract of the game
+
+    Returns:
+        list of (getter, key, replayed value, live value)
+    """
+    functions = contract.functions
+    block = state.block
+    differences = []
+
+    def compare(getter, key, replayed, live):
+        live = live.call(block_identifier=block)
+        if isinstance(live, (list, tuple)):
+            live = tuple(live)
+        if replayed != live:
+            differences.append((getter, key, replayed, live))
+
+    for user in sorted(state.users()):
+        character = state.characters.get(user, Character(0, 0, is_alive=False))
+        compare(
+            "usersCharacters",
+            user,
+            character.as_tuple(),
+            functions.usersCharacters(user),
+        )
+        compare(
+            "damageMade",
+            user,
+            state.damage_made.get(user, 0),
+            functions.damageMade(user),
+        )
+        compare(
+            "usersRound",
+            user,
+            state.users_round.get(user, 0),
+            functions.usersRound(user),
+        )
+        compare(
+            "usersRewards",
+            user,
+            state.users_rewards.get(user, 0),
+            functions.usersRewards(user),
+        )
+        compare(
+            "pendingRewardNFTs",
+            user,
+            state.pending_reward_nfts.get(user, 0),
+            functions.pendingRewardNFTs(user),
+        )
+    compare("currentRound", None, state.current_round, functions.currentRound())
+    compare("bossAlive", None, state.boss_alive, functions.bossAlive())
+    compare("currentBoss", None, tuple(state.boss), functions.currentBoss())
+    compare("stagedBosses", None, len(state.boss_queue), functions.stagedBosses())
+    for round_id in sorted(state.rounds):
+        boss_id, reward, total_damage, merkle = state.rounds[round_id]
+        compare(
+            "rounds",
+            round_id,
+            (boss_id, reward, total_damage, merkle),
+            functions.rounds(round_id),
+        )
+    for arena_id, boss in state.arena_bosses.items():
+        compare("arenaBosses", arena_id, tuple(boss), functions.arenaBosses(arena_id))
+        compare(
+            "arenaTotalDamage",
+            arena_id,
+            state.arena_total_damage.get(arena_id, 0),
+            functions.arenaTotalDamage(arena_id),
+        )
+    for (arena_id, user), damage in state.arena_damage.items():
+        compare(
+            "arenaDamage",
+            (arena_id, user),
+            damage,
+            functions.arenaDamage(arena_id, user),
+        )
+    for token_id, owner in state.token_owners.items():
+        compare("ownerOf", token_id, owner, functions.ownerOf(token_id))
+    return differences
+
+
+def main(
+    address,
+    deployment_block,
+    block=None,
+    snapshot_dir=DEFAULT_SNAPSHOT_DIR,
+    check=False,
+):
+    """Restores the state at the block, the latest one by default, and prints a
+    summary. With check the state is compared with the getters of the game.
+    """
+    w3 = Web3(Web3.HTTPProvider(os.getenv("WEB3_PROVIDER_URI", DEFAULT_RPC_URL)))
+    abi = artifact_cache.load_abi("WorldOfLedger")
+    engine = ReplayEngine(w3, address, abi, int(deployment_block), snapshot_dir)
+    block = w3.eth.block_number if block is None else int(block)
+    state = engine.state_at(block)
+    alive = sum(character.is_alive for character in state.characters.values())
+    print(
+        f"Block {state.block}: round {state.current_round}, {len(state.characters)} "
+        f"characters ({alive} alive), {len(state.token_owners)} reward NFTs, "
+        f"{sum(state.pending_reward_nfts.values())} pending"
+    )
+    if check:
+        differences = verify(state, engine.contract)
+        for getter, key, replayed, live in differences:
+            print(f"{getter}({key}): replayed {replayed}, live {live}")
+        print(f"{len(differences)} differences with the live getters")
+        return differences
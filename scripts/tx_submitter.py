@@ -0,0 +1,292 @@
+"""Pipelined transaction submission for bulk seeding and admin scripts.
+
+Brownie sends one transaction at a time, waits for its receipt and asks the node
+for the nonce of the sender before every transaction. `TxSubmitter` keeps nonces
+locally instead, signs the transactions of local accounts itself, sends many of
+them in one JSON-RPC batch over a pooled HTTP session, and collects the receipts
+afterwards. Transactions that are not mined in time are replaced with the same
+nonce and a higher gas price.
+
+    brownie run scripts/tx_submitter.py main [characters]
+        compares seeding characters with Brownie calls and with the submitter
+"""
+import time
+
+import requests
+from eth_account import Account as EthAccount
+from eth_utils import keccak, to_checksum_address, to_hex, to_int
+
+from brownie import web3
+
+from scripts.helpful_scripts import get_account, get_players
+from scripts.gas_benchmark import setup_game
+
+
+REQUESTED_RANDOMNESS_TOPIC = to_hex(keccak(text="RequestedRandomness(uint256)"))
+
+
+class TxSubmitter:
+    """Submits transactions of many accounts in JSON-RPC batches. The accounts
+    shouldn't send transactions through Brownie meanwhile, as their nonces are
+    only read from the node once.
+
+    Args:
+        rpc_url (string): HTTP endpoint of the node
+        batch_size (int): requests in one JSON-RPC batch
+        poll_interval (float): delay between receipt polls in seconds
+        replace_after (float): seconds without a receipt before the transaction is replaced
+        max_replacements (int): replacements of one transaction before giving up
+        gas_price_bump (float): gas price multiplier of a replacement
+    """
+
+    def __init__(
+        self,
+        rpc_url,
+        batch_size=100,
+        poll_interval=0.05,
+        replace_after=30,
+        max_replacements=3,
+        gas_price_bump=1.125,
+    ):
+        self.rpc_url = rpc_url
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.replace_after = replace_after
+        self.max_replacements = max_replacements
+        self.gas_price_bump = gas_price_bump
+        self.session = requests.Session()
+        self.nonces = {}
+        self.queued = []
+        self.pending = []
+        self._request_id = 0
+        self.chain_id = to_int(hexstr=self._call("eth_chainId", []))
+        self.gas_price = to_int(hexstr=self._call("eth_gasPrice", []))
+
+    def close(self):
+        self.session.close()
+
+    def _batch(self, calls):
+        """Sends (method, params) calls in one HTTP request and returns
+        (result, error) of every call in the same order
+        """
+        payload = []
+        for method, params in calls:
+            self._request_id += 1
+            payload.append(
+                {
+                    "jsonrpc": "2.0",
+                    "id": self._request_id,
+                    "method": method,
+                    "params": params,
+                }
+            )
+        response = self.session.post(self.rpc_url, json=payload)
+        response.raise_for_status()
+        by_id = {item["id"]: item for item in response.json()}
+        return [
+            (by_id[call["id"]].get("result"), by_id[call["id"]].get("error"))
+            for call in payload
+        ]
+
+    def _call(self, method, params):
+        result, error = self._batch([(method, params)])[0]
+        if error:
+            raise IOError(error)
+        return result
+
+    def _next_nonce(self, address):
+        if address not in self.nonces:
+            self.nonces[address] = to_int(
+                hexstr=self._call("eth_getTransactionCount", [address, "pending"])
+            )
+        nonce = self.nonces[address]
+        self.nonces[address] += 1
+        return nonce
+
+    def submit(self, account, to, data, gas, value=0):
+        """Queues a transaction. Nothing is sent before `flush` or `wait`.
+
+        Args:
+            account: brownie account; local accounts are signed here, the others by the node
+            to (string): recipient address
+            data (string): calldata, for example `contract.method.encode_input(*args)`
+            gas (int): gas limit, there is no estimation
+            value (int): wei to send
+
+        Returns:
+            int index of the transaction in the list returned by `wait`
+        """
+        address = to_checksum_address(account.address)
+        tx = {
+            "from": address,
+            "to": to_checksum_address(str(to)),
+            "data": data,
+            "gas": gas,
+            "value": value,
+            "nonce": self._next_nonce(address),
+            "gasPrice": self.gas_price,
+            "chainId": self.chain_id,
+        }
+        self.queued.append(
+            {
+                "tx": tx,
+                "key": getattr(account, "private_key", None),
+                "hashes": [],
+                "sent_at": None,
+                "replacements": 0,
+                "receipt": None,
+            }
+        )
+        return len(self.pending) + len(self.queued) - 1
+
+    def _send_call(self, entry):
+        tx = entry["tx"]
+        if entry["key"] is None:
+            params = {k: v for k, v in tx.items() if k != "chainId"}
+            hex_params = {
+                k: (hex(v) if isinstance(v, int) else v) for k, v in params.items()
+            }
+            return "eth_sendTransaction", [hex_params]
+        signed = EthAccount.sign_transaction(
+            {k: v for k, v in tx.items() if k != "from"}, entry["key"]
+        )
+        # eth-account renamed rawTransaction to raw_transaction
+        raw = getattr(signed, "raw_transaction", None) or signed.rawTransaction
+        return "eth_sendRawTransaction", [to_hex(raw)]
+
+    def _send(self, entries, replacing=False):
+        for start in range(0, len(entries), self.batch_size):
+            chunk = entries[start : start + self.batch_size]
+            results = self._batch([self._send_call(entry) for entry in chunk])
+            now = time.monotonic()
+            for entry, (tx_hash, error) in zip(chunk, results):
+                entry["sent_at"] = now
+                if error:
+                    # the replaced transaction may have been mined meanwhile,
+                    # its receipt is found by the next poll
+                    if replacing:
+                        continue
+                    raise IOError(error)
+                entry["hashes"].append(tx_hash)
+
+    def flush(self):
+        """Sends all queued transactions without waiting for receipts"""
+        queued, self.queued = self.queued, []
+        self._send(queued)
+        self.pending.extend(queued)
+
+    def wait(self):
+        """Sends queued transactions and waits for receipts of all of them.
+        Transactions without a receipt for `replace_after` seconds are replaced.
+
+        Returns:
+            list of receipts (JSON-RPC dicts) in submission order
+        """
+        self.flush()
+        waiting = [entry for entry in self.pending if entry["receipt"] is None]
+        while waiting:
+            calls = [
+                ("eth_getTransactionReceipt", [tx_hash])
+                for entry in waiting
+                for tx_hash in entry["hashes"]
+            ]
+            receipts = []
+            for start in range(0, len(calls), self.batch_size):
+                receipts += self._batch(calls[start : start + self.batch_size])
+            receipts = iter(receipts)
+            for entry in waiting:
+                # any of the replaced transactions may be the mined one
+                for _ in entry["hashes"]:
+                    receipt, _ = next(receipts)
+                    if receipt is not None:
+                        entry["receipt"] = receipt
+            waiting = [entry for entry in waiting if entry["receipt"] is None]
+            self._replace_stuck(waiting)
+            if waiting:
+                time.sleep(self.poll_interval)
+        receipts = [entry["receipt"] for entry in self.pending]
+        self.pending = []
+        return receipts
+
+    def _replace_stuck(self, waiting):
+        now = time.monotonic()
+        stuck = [e for e in waiting if now - e["sent_at"] > self.replace_after]
+        for entry in stuck:
+            if entry["replacements"] == self.max_replacements:
+                raise TimeoutError(
+                    f"Transaction {entry['hashes'][-1]} was not mined after "
+                    f"{self.max_replacements} replacements"
+                )
+            entry["replacements"] += 1
+            entry["tx"]["gasPrice"] = (
+                int(entry["tx"]["gasPrice"] * self.gas_price_bump) + 1
+            )
+        self._send(stuck, replacing=True)
+
+
+def request_ids(receipts):
+    """requestId of every RequestedRandomness event in the receipts"""
+    return [
+        to_int(hexstr=log["data"])
+        for receipt in receipts
+        for log in receipt["logs"]
+        if log["topics"] and log["topics"][0] == REQUESTED_RANDOMNESS_TOPIC
+    ]
+
+
+def seed_characters(submitter, coordinator, game, players):
+    """Creates characters of the players: every player requests a character,
+    then the owner fulfills all requests. Transactions of each step are pipelined.
+    """
+    create_data = game.createRandomCharacter.encode_input()
+    create_gas = int(
+        game.createRandomCharacter.estimate_gas({"from": players[0]}) * 1.2
+    )
+    for player in players:
+        submitter.submit(player, game.address, create_data, create_gas)
+    receipts = submitter.wait()
+    assert all(to_int(hexstr=r["status"]) == 1 for r in receipts)
+
+    owner = get_account()
+    for request_id in request_ids(receipts):
+        data = coordinator.fulfillRandomWords.encode_input(request_id, game.address)
+        # the callback gas limit bounds the fulfillment
+        submitter.submit(owner, coordinator.address, data, 800000)
+    receipts = submitter.wait()
+    assert all(to_int(hexstr=r["status"]) == 1 for r in receipts)
+
+
+def seed_characters_with_brownie(coordinator, game, players):
+    """The same seeding with one Brownie call at a time, as a reference"""
+    owner = get_account()
+    for player in players:
+        tx = game.createRandomCharacter({"from": player})
+        request_id = tx.events["RequestedRandomness"]["requestId"]
+        coordinator.fulfillRandomWords(request_id, game, {"from": owner})
+
+
+def main(characters=1000):
+    characters = int(characters)
+    # characters belong to the game, so both runs may use the same players
+    players = get_players(characters)
+    timings = {}
+
+    coordinator, _, game = setup_game()
+    started = time.perf_counter()
+    seed_characters_with_brownie(coordinator, game, players)
+    timings["brownie"] = time.perf_counter() - started
+
+    coordinator, _, game = setup_game()
+    submitter = TxSubmitter(web3.provider.endpoint_uri)
+    started = time.perf_counter()
+    seed_characters(submitter, coordinator, game, players)
+    timings["submitter"] = time.perf_counter() - started
+    submitter.close()
+    for player in players:
+        assert game.usersCharacters(player)[1] != 0
+
+    print(f"seeding {characters} characters")
+    for mode, elapsed in timings.items():
+        print(
+            f"{mode:>10} | {elapsed:>8.2f} s | {characters / elapsed:>8.1f} characters/s"
+        )
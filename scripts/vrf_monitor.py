@@ -0,0 +1,313 @@
+"""Monitor of the VRF requests of the game.
+
+Characters are created asynchronously: the game emits RequestedRandomness (or
+RequestedEnrolledCharacters for enrolled users) when it asks the coordinator for
+random words, and creates the characters when the coordinator calls back. The
+monitor pairs every request with its fulfillment and reports how long players
+wait, in blocks and in seconds, and which requests are still unfulfilled past a
+threshold. Fulfillments are detected either
+
+- by event: the callback emits RandomnessFulfilled, or
+- by state polling: the game deletes requestIdToAddress and
+  requestIdToEnrollmentBatch of a request when it is fulfilled, which also works
+  for deployments older than the RandomnessFulfilled event.
+
+Counters are written in the Prometheus text format, to be scraped with the
+textfile collector of node_exporter.
+
+    WEB3_PROVIDER_URI=<rpc url> brownie run scripts/vrf_monitor.py main <game address>
+        [from block] [mode] [stuck blocks] [stuck seconds] [interval] [iterations]
+"""
+import os
+import time
+from collections import Counter, namedtuple
+
+from web3 import Web3
+
+from scripts import artifact_cache
+from scripts.event_indexer import DEFAULT_RPC_URL, EventIndexer
+
+
+VRF_EVENTS = [
+    "RequestedRandomness",
+    "RequestedEnrolledCharacters",
+    "RandomnessFulfilled",
+    "EnrollmentBatchRetried",
+]
+DEFAULT_STUCK_BLOCKS = 50
+DEFAULT_STUCK_SECONDS = 600
+DEFAULT_METRICS_PATH = "reports/vrf_metrics.prom"
+QUANTILES = [0.5, 0.9, 0.99]
+METRICS_PREFIX = "world_of_ledger_vrf"
+ZERO_ADDRESS = "0x" + "0" * 40
+
+Request = namedtuple("Request", "request_id kind characters block timestamp")
+
+
+def quantile(values, q):
+    """Nearest rank quantile of sorted values"""
+    if not values:
+        return 0
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+
+class VrfMonitor:
+    """Pending VRF requests and fulfillment latency of the fulfilled ones.
+
+    Args:
+        stuck_blocks (int): a pending request is stuck after this many blocks
+        stuck_seconds (int): or after this many seconds
+    """
+
+    def __init__(
+        self, stuck_blocks=DEFAULT_STUCK_BLOCKS, stuck_seconds=DEFAULT_STUCK_SECONDS
+    ):
+        self.stuck_blocks = stuck_blocks
+        self.stuck_seconds = stuck_seconds
+        self.pending = {}
+        self.requested = Counter()
+        self.fulfilled = Counter()
+        self.latency_blocks = []
+        self.latency_seconds = []
+
+    def request(self, request_id, kind, characters, block, timestamp):
+        self.pending[request_id] = Request(
+            request_id, kind, characters, block, timestamp
+        )
+        self.requested[kind] += 1
+
+    def fulfill(self, request_id, block, timestamp):
+        """Records the fulfillment of a pending request.
+
+        Returns:
+            (blocks, seconds) of waiting, None for a request that is not pending
+        """
+        request = self.pending.pop(request_id, None)
+        if request is None:
+            return None
+        self.fulfilled[request.kind] += 1
+        latency = (block - request.block, timestamp - request.timestamp)
+        self.latency_blocks.append(latency[0])
+        self.latency_seconds.append(latency[1])
+        return latency
+
+    def apply(self, event, timestamp, use_fulfillment_events=True):
+        """Applies a decoded VRF event, see `VrfEventSource`"""
+        args, block = event["args"], event["blockNumber"]
+        if event["event"] == "RequestedRandomness":
+            self.request(args["requestId"], "character", 1, block, timestamp)
+        elif event["event"] == "RequestedEnrolledCharacters":
+            self.request(
+                args["requestId"], "enrollment", args["characters"], block, timestamp
+            )
+        elif event["event"] == "RandomnessFulfilled" and use_fulfillment_events:
+            self.fulfill(args["requestId"], block, timestamp)
+        elif event["event"] == "EnrollmentBatchRetried":
+            # the game ignores the old request, the new one has its own event
+            self.pending.pop(args["requestId"], None)
+
+    def poll(self, is_pending, block, timestamp):
+        """Fulfills the requests that the game doesn't keep anymore, at the polled
+        block, so the latency is rounded up to the polling interval.
+
+        Args:
+            is_pending (callable): request -> bool, see `pending_check`
+
+        Returns:
+            list of fulfilled requests
+        """
+        done = [r for r in list(self.pending.values()) if not is_pending(r)]
+        for request in done:
+            self.fulfill(request.request_id, block, timestamp)
+        return done
+
+    def stuck(self, block, timestamp):
+        """Pending requests older than either threshold, the oldest first"""
+        return sorted(
+            (
+                request
+                for request in self.pending.values()
+                if block - request.block >= self.stuck_blocks
+                or timestamp - request.timestamp >= self.stuck_seconds
+            ),
+            key=lambda request: request.block,
+        )
+
+    def percentiles(self):
+        """{quantile: (blocks, seconds)} of the fulfilled requests"""
+        blocks, seconds = sorted(self.latency_blocks), sorted(self.latency_seconds)
+        return {q: (quantile(blocks, q), quantile(seconds, q)) for q in QUANTILES}
+
+    def prometheus(self, block, timestamp):
+        """Counters, gauges and latency summaries in the Prometheus text format"""
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {METRICS_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRICS_PREFIX}_{name} {kind}")
+            for suffix, labels, value in samples:
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                label_text = f"{{{label_text}}}" if label_text else ""
+                lines.append(f"{METRICS_PREFIX}_{name}{suffix}{label_text} {value}")
+
+        kinds = sorted(set(self.requested) | {"character", "enrollment"})
+        metric(
+            "requests_total",
+            "counter",
+            "VRF requests of the game.",
+            [("", {"kind": kind}, self.requested[kind]) for kind in kinds],
+        )
+        metric(
+            "fulfilled_total",
+            "counter",
+            "Fulfilled VRF requests of the game.",
+            [("", {"kind": kind}, self.fulfilled[kind]) for kind in kinds],
+        )
+        oldest = min((r.timestamp for r in self.pending.values()), default=timestamp)
+        metric(
+            "pending_requests",
+            "gauge",
+            "Requests waiting for random words.",
+            [("", {}, len(self.pending))],
+        )
+        metric(
+            "stuck_requests",
+            "gauge",
+            "Requests unfulfilled past the threshold.",
+            [("", {}, len(self.stuck(block, timestamp)))],
+        )
+        metric(
+            "oldest_pending_seconds",
+            "gauge",
+            "Age of the oldest pending request.",
+            [("", {}, timestamp - oldest)],
+        )
+        for unit, values in (
+            ("blocks", self.latency_blocks),
+            ("seconds", self.latency_seconds),
+        ):
+            ordered = sorted(values)
+            metric(
+                f"fulfillment_{unit}",
+                "summary",
+                f"Fulfillment latency of the requests in {unit}.",
+                [("", {"quantile": q}, quantile(ordered, q)) for q in QUANTILES]
+                + [("_sum", {}, sum(values)), ("_count", {}, len(values))],
+            )
+        return "\n".join(lines) + "\n"
+
+
+def write_metrics(text, path=DEFAULT_METRICS_PATH):
+    """Written aside and renamed, so the collector never reads half a file"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as f:
+        f.write(text)
+    os.replace(temporary, path)
+
+
+def pending_check(contract):
+    """State polling of a web3 contract of the game: a request is pending while the
+    game keeps the requesting user or the enrolled batch of the request.
+    usersCharacters can't tell a new character from one created earlier, so the
+    request mappings are read instead.
+    """
+
+    def is_pending(request):
+        if request.kind == "enrollment":
+            batch = contract.functions.requestIdToEnrollmentBatch(request.request_id)
+            return batch.call()[1] != 0
+        user = contract.functions.requestIdToAddress(request.request_id).call()
+        return user != ZERO_ADDRESS
+
+    return is_pending
+
+
+class VrfEventSource:
+    """VRF events of the game newer than the last read block, decoded by the
+    event indexer without storing them.
+
+    Args:
+        w3 (Web3): connected web3 instance
+        address (string): address of the WorldOfLedger contract
+        abi (list): contract ABI
+        from_block (int): first block to read
+    """
+
+    def __init__(self, w3, address, abi, from_block=0):
+        self.w3 = w3
+        self.indexer = EventIndexer(
+            w3, address, abi, ":memory:", from_block, event_names=VRF_EVENTS
+        )
+        self.next_block = from_block
+        self._timestamps = {}
+
+    def timestamp(self, block):
+        if block not in self._timestamps:
+            self._timestamps[block] = self.w3.eth.get_block(block)["timestamp"]
+        return self._timestamps[block]
+
+    def read(self, monitor, to_block=None, use_fulfillment_events=True):
+        """Applies the events up to `to_block` (default: head) to the monitor.
+
+        Returns:
+            int: the last read block
+        """
+        if to_block is None:
+            to_block = self.w3.eth.block_number
+        for _, events in self.indexer.iter_chunks(self.next_block, to_block):
+            for event in events:
+                monitor.apply(
+                    event, self.timestamp(event["blockNumber"]), use_fulfillment_events
+                )
+        self.next_block = to_block + 1
+        return to_block
+
+
+def print_report(monitor, block, timestamp):
+    requested, fulfilled = sum(monitor.requested.values()), len(monitor.latency_blocks)
+    print(
+        f"block {block}: {requested} requests, {fulfilled} fulfilled, "
+        f"{len(monitor.pending)} pending"
+    )
+    for q, (blocks, seconds) in monitor.percentiles().items():
+        print(f"  p{q * 100:g} latency {blocks} blocks, {seconds} s")
+    for request in monitor.stuck(block, timestamp):
+        print(
+            f"  stuck {request.kind} request {request.request_id} of block "
+            f"{request.block}, {block - request.block} blocks, "
+            f"{timestamp - request.timestamp} s"
+        )
+
+
+def main(
+    address,
+    from_block=0,
+    mode="events",
+    stuck_blocks=DEFAULT_STUCK_BLOCKS,
+    stuck_seconds=DEFAULT_STUCK_SECONDS,
+    interval=15,
+    iterations=0,
+    metrics_path=DEFAULT_METRICS_PATH,
+):
+    """Follows the requests of the game and rewrites the metrics every `interval`
+    seconds, forever with iterations 0. In "polling" mode fulfillments are read
+    from the game state instead of the RandomnessFulfilled events.
+    """
+    w3 = Web3(Web3.HTTPProvider(os.getenv("WEB3_PROVIDER_URI", DEFAULT_RPC_URL)))
+    abi = artifact_cache.load_abi("WorldOfLedger")
+    source = VrfEventSource(w3, address, abi, int(from_block))
+    is_pending = pending_check(w3.eth.contract(address=source.indexer.address, abi=abi))
+    monitor = VrfMonitor(int(stuck_blocks), int(stuck_seconds))
+    iteration = 0
+    while True:
+        block = source.read(monitor, use_fulfillment_events=mode == "events")
+        timestamp = source.timestamp(block)
+        if mode == "polling":
+            monitor.poll(is_pending, block, timestamp)
+        write_metrics(monitor.prometheus(block, timestamp), metrics_path)
+        print_report(monitor, block, timestamp)
+        iteration += 1
+        if iteration == int(iterations):
+            return monitor
+        time.sleep(float(interval))
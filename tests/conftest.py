@@ -0,0 +1,96 @@
+import pytest
+from brownie._config import CONFIG
+from brownie.network.state import TxHistory
+from brownie.test import output
+from scripts.helpful_scripts import (
+    get_account,
+    get_key_from_event,
+    deploy_mocks,
+    create_character_for_testing,
+    create_boss_nft,
+)
+from scripts.deploy_game import deploy_game
+from scripts.parallel_runner import merge_gas_profiles, save_gas_profile
+
+
+def pytest_sessionfinish(session):
+    """xdist workers hand their gas profile over to the master"""
+    if hasattr(session.config, "workeroutput"):
+        session.config.workeroutput["gas_profile"] = TxHistory().gas_profile
+
+
+def pytest_testnodedown(node, error):
+    """The master merges the gas profiles of the workers as they finish"""
+    gas_profile = getattr(node, "workeroutput", {}).get("gas_profile", {})
+    merge_gas_profiles(TxHistory().gas_profile, gas_profile)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    """Workers don't print their gas profiles, so with `brownie test -n N --gas` the
+    master prints the merged one and saves it to reports/gas_profile.json
+    """
+    if hasattr(config, "workerinput") or not config.getoption("numprocesses"):
+        return
+    if CONFIG.argv["gas"]:
+        terminalreporter.section("Gas Profile")
+        for line in output._build_gas_profile_output():
+            terminalreporter.write_line(line)
+        save_gas_profile(TxHistory().gas_profile)
+
+
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    """Every test starts from the snapshot taken after module scoped fixtures"""
+    pass
+
+
+@pytest.fixture(scope="module")
+def deploy_mocks_and_game(module_isolation):
+    """Deploys mocks and the game once per test module"""
+    account = get_account()
+    coordinator, boss_contract = deploy_mocks()
+    game = deploy_game()
+    subscription_id_game = get_key_from_event(game.tx.events[1], "subId")
+    coordinator.fundSubscription(subscription_id_game, 100000000000, {"from": account})
+    coordinator.fundSubscription(
+        subscription_id_game - 1, 100000000000, {"from": account}
+    )
+    create_boss_nft(coordinator, boss_contract, account, 3)
+    return coordinator, boss_contract, game
+
+
+def play_round_alone(world_of_ledger_contract, account, reward):
+    """Populates boss with 1 hp and no damage, kills it by the account and claims reward"""
+    owner_account = get_account()
+    world_of_ledger_contract.populate_boss(1, 0, reward, {"from": owner_account})
+    world_of_ledger_contract.attackBoss({"from": account})
+    world_of_ledger_contract.claimRewards({"from": account})
+
+
+@pytest.fixture(scope="module")
+def finish_round(deploy_mocks_and_game):
+    """Checkpoint: account 1 has a character, killed the boss alone and claimed 100 xp.
+    Module scoped, so it should be used by every test of the module.
+    """
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    reward = 100
+    not_owner_account = get_account(index=1)
+    create_character_for_testing(
+        coordinator, world_of_ledger_contract, not_owner_account
+    )
+    play_round_alone(world_of_ledger_contract, not_owner_account, reward)
+    return reward
+
+
+@pytest.fixture(scope="module")
+def character_level_3(deploy_mocks_and_game):
+    """Checkpoint: account 1 has a level 3 character with 225 xp, enough for both spells.
+    Module scoped, so it should be used by every test of the module.
+    """
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    not_owner_account = get_account(index=1)
+    create_character_for_testing(
+        coordinator, world_of_ledger_contract, not_owner_account
+    )
+    play_round_alone(world_of_ledger_contract, not_owner_account, 225)
+    return not_owner_account
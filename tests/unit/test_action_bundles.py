@@ -0,0 +1,76 @@
+from brownie import chain, reverts
+from eth_account.messages import _hash_eip191_message, encode_typed_data
+
+from scripts.helpful_scripts import (
+    get_account,
+    get_players,
+    create_character_for_testing,
+)
+from scripts.action_bundles import action, sign_actions, typed_actions
+
+
+def test_player_performs_actions_in_one_transaction(
+    deploy_mocks_and_game, character_level_3
+):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    healed_player = get_account(index=2)
+    create_character_for_testing(coordinator, world_of_ledger_contract, healed_player)
+    hp = world_of_ledger_contract.usersCharacters(healed_player)[0]
+    damage = world_of_ledger_contract.usersCharacters(character_level_3)[1]
+    world_of_ledger_contract.populate_boss(damage * 4, 0, 100, {"from": get_account()})
+    world_of_ledger_contract.performActions(
+        [
+            action("attackBoss"),
+            action("healCharacter", healed_player),
+            action("castFireBolt"),
+            action("attackBoss"),
+            action("claimRewards"),
+            action("mintRewardNFT"),
+        ],
+        {"from": character_level_3},
+    )
+    assert world_of_ledger_contract.usersCharacters(healed_player)[0] == hp + damage
+    assert world_of_ledger_contract.bossAlive() == False
+    (_, _, xp, _, _, _) = world_of_ledger_contract.usersCharacters(character_level_3)
+    assert xp == 225 + 100
+    # the reward of the round of the fixture is minted too
+    assert world_of_ledger_contract.balanceOf(character_level_3) == 2
+    with reverts("Unknown action"):
+        world_of_ledger_contract.performActions([(7, 0)], {"from": character_level_3})
+
+
+def test_relayer_sends_actions_of_many_players(deploy_mocks_and_game):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    relayer = get_account(index=1)
+    players = get_players(3, signing=True)
+    for player in players:
+        create_character_for_testing(coordinator, world_of_ledger_contract, player)
+    world_of_ledger_contract.populate_boss(10**6, 0, 100, {"from": get_account()})
+    actions = [action("attackBoss"), action("attackBoss")]
+    deadline = chain.time() + 100
+    message = typed_actions(world_of_ledger_contract, players[0], actions, 0, deadline)
+    assert world_of_ledger_contract.actionsDigest(
+        players[0], actions, 0, deadline
+    ) == _hash_eip191_message(encode_typed_data(full_message=message))
+
+    bundle = [sign_actions(world_of_ledger_contract, p, actions) for p in players]
+    world_of_ledger_contract.relayActions(bundle, {"from": relayer})
+    for player in players:
+        damage = world_of_ledger_contract.usersCharacters(player)[1]
+        assert world_of_ledger_contract.damageMade(player) == damage * 2
+        assert world_of_ledger_contract.actionNonces(player) == 1
+    assert world_of_ledger_contract.damageMade(relayer) == 0
+
+    with reverts("Invalid actions signature"):
+        world_of_ledger_contract.relayActions(bundle[:1], {"from": relayer})
+    # signed by another player
+    forged = sign_actions(world_of_ledger_contract, players[1], actions)
+    with reverts("Invalid actions signature"):
+        world_of_ledger_contract.relayActions(
+            [(players[0].address,) + forged[1:]], {"from": relayer}
+        )
+    expired = sign_actions(
+        world_of_ledger_contract, players[0], actions, chain.time() - 1
+    )
+    with reverts("Signed actions expired"):
+        world_of_ledger_contract.relayActions([expired], {"from": relayer})
@@ -1,42 +1,8 @@
 import pytest
-from scripts.helpful_scripts import (
-    get_account,
-    get_key_from_event,
-    deploy_mocks,
-    create_character_for_testing,
-    create_boss_nft,
-)
-from scripts.deploy_game import deploy_game
+from scripts.helpful_scripts import get_account
 from brownie import reverts
 
-
-@pytest.fixture
-def deploy_mocks_and_game():
-    account = get_account()
-    coordinator, boss_contract = deploy_mocks()
-    game = deploy_game()
-    subscription_id_game = get_key_from_event(game.tx.events[1], "subId")
-    coordinator.fundSubscription(subscription_id_game, 100000000000, {"from": account})
-    coordinator.fundSubscription(
-        subscription_id_game - 1, 100000000000, {"from": account}
-    )
-    create_boss_nft(coordinator, boss_contract, account, 3)
-    return coordinator, boss_contract, game
-
-
-@pytest.fixture
-def finish_round(deploy_mocks_and_game):
-    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
-    owner_account = get_account()
-    hp, xp, reward = 1, 1, 100
-    world_of_ledger_contract.populate_boss(hp, xp, reward, {"from": owner_account})
-    not_owner_account = get_account(index=1)
-    create_character_for_testing(
-        coordinator, world_of_ledger_contract, not_owner_account
-    )
-    world_of_ledger_contract.attackBoss({"from": not_owner_account})
-    world_of_ledger_contract.claimRewards({"from": not_owner_account})
-    return reward
+pytestmark = pytest.mark.usefixtures("finish_round")
 
 
 def test_user_can_claim_rewards(deploy_mocks_and_game, finish_round):
@@ -77,3 +43,13 @@ def test_user_cant_mint_nft_twice(deploy_mocks_and_game, finish_round):
     world_of_ledger_contract.mintRewardNFT({"from": not_owner_account})
     with reverts("User doesn't have any NFT to mint"):
         world_of_ledger_contract.mintRewardNFT({"from": not_owner_account})
+
+
+def test_owner_may_populate_boss_after_round_finished(
+    deploy_mocks_and_game, finish_round
+):
+    _, _, world_of_ledger_contract = deploy_mocks_and_game
+    owner_account = get_account()
+    assert world_of_ledger_contract.currentRound() == 2
+    world_of_ledger_contract.populate_boss(10, 1, 100, {"from": owner_account})
+    assert world_of_ledger_contract.bossAlive() == True
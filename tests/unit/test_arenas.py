@@ -0,0 +1,50 @@
+from brownie import reverts
+
+from scripts.helpful_scripts import get_account, create_character_for_testing
+from scripts.load_generator import arena_kill_throughput
+
+
+def test_arenas_keep_separate_ledgers(deploy_mocks_and_game):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    owner_account = get_account()
+    players = [get_account(index=i) for i in range(1, 4)]
+    for player in players:
+        create_character_for_testing(coordinator, world_of_ledger_contract, player)
+    damages = [world_of_ledger_contract.usersCharacters(p)[1] for p in players]
+    world_of_ledger_contract.openArenas(
+        [(damages[0] + damages[1], 0, 1000, 1), (10**6, 1, 100, 2)],
+        {"from": owner_account},
+    )
+    assert world_of_ledger_contract.arenasOpened() == 2
+    assert world_of_ledger_contract.bossAlive() == False
+
+    hp = world_of_ledger_contract.usersCharacters(players[2])[0]
+    world_of_ledger_contract.attackBoss(2, {"from": players[2]})
+    world_of_ledger_contract.attackBoss(1, {"from": players[0]})
+    with reverts("Arena boss is not killed"):
+        world_of_ledger_contract.settleArenaRewards([1], {"from": players[0]})
+    kill_tx = world_of_ledger_contract.attackBoss(1, {"from": players[1]})
+    assert kill_tx.events["ArenaBossKilled"]["arenaId"] == 1
+    with reverts("There is no active Boss in this arena"):
+        world_of_ledger_contract.attackBoss(1, {"from": players[2]})
+    # the other arena is still fighting, and its boss hit back
+    assert world_of_ledger_contract.arenaBosses(2)[0] == 10**6 - damages[2]
+    assert world_of_ledger_contract.arenaDamage(2, players[2]) == damages[2]
+    assert world_of_ledger_contract.usersCharacters(players[2])[0] == hp - 1
+
+    for player, damage in zip(players[:2], damages):
+        world_of_ledger_contract.settleArenaRewards([1], {"from": player})
+        world_of_ledger_contract.claimRewards({"from": player})
+        assert world_of_ledger_contract.usersCharacters(player)[2] == (
+            1000 * damage // (damages[0] + damages[1])
+        )
+    assert world_of_ledger_contract.pendingRewardNFTs(players[0]) == 1
+    with reverts("You have no reward in this arena"):
+        world_of_ledger_contract.settleArenaRewards([1], {"from": players[0]})
+    with reverts("Arena boss is not killed"):
+        world_of_ledger_contract.settleArenaRewards([3], {"from": players[0]})
+
+
+def test_every_arena_is_killed_by_its_players():
+    results = arena_kill_throughput(arenas=[1, 3], players=6, workers=4)
+    assert [kills for kills, _, _ in results.values()] == [1, 3]
@@ -0,0 +1,59 @@
+import json
+import os
+
+from brownie import WorldOfLedger, web3
+from eth_utils import keccak, to_hex
+
+from scripts.artifact_cache import (
+    build_hash,
+    event_topics,
+    get_contract_handle,
+    load_artifact,
+)
+
+
+def write_artifact(build_path, abi, build_hash):
+    artifact = {"abi": abi, "bytecodeSha1": build_hash, "ast": {}, "bytecode": "00"}
+    with open(build_path / "Game.json", "w") as f:
+        json.dump(artifact, f)
+
+
+def test_cache_follows_the_artifact(tmp_path):
+    build_path, cache_path = tmp_path / "build", tmp_path / "cache"
+    build_path.mkdir()
+    event = {
+        "type": "event",
+        "name": "DamageMade",
+        "inputs": [
+            {"name": "user", "type": "address", "indexed": False},
+            {"name": "amount", "type": "uint256", "indexed": False},
+        ],
+    }
+    write_artifact(build_path, [event], "first")
+    cached = load_artifact("Game", build_path, cache_path)
+    assert cached["build_hash"] == "first"
+    assert cached["abi"] == [event]
+    assert event_topics("Game", build_path, cache_path) == {
+        "DamageMade": to_hex(keccak(text="DamageMade(address,uint256)"))
+    }
+    assert json.loads((cache_path / "Game.json").read_text())["abi"] == [event]
+
+    # the cache is keyed by the build hash, not by the modification time
+    os.utime(build_path / "Game.json", ns=(1, 1))
+    assert load_artifact("Game", build_path, cache_path)["abi"] == [event]
+    write_artifact(build_path, [], "second")
+    os.utime(build_path / "Game.json", ns=(1, 1))
+    assert build_hash(build_path / "Game.json") == "second"
+    assert load_artifact("Game", build_path, cache_path)["build_hash"] == "second"
+
+
+def test_cached_abi_matches_the_project(deploy_mocks_and_game):
+    _, _, world_of_ledger_contract = deploy_mocks_and_game
+    assert load_artifact("WorldOfLedger")["abi"] == WorldOfLedger.abi
+    handle = get_contract_handle(
+        web3, "WorldOfLedger", world_of_ledger_contract.address
+    )
+    assert handle is get_contract_handle(
+        web3, "WorldOfLedger", world_of_ledger_contract.address.lower()
+    )
+    assert handle.functions.bossAlive().call() == world_of_ledger_contract.bossAlive()
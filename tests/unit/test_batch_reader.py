@@ -0,0 +1,59 @@
+from scripts.helpful_scripts import get_account, create_character_for_testing
+from scripts.batch_reader import read_players, read_round_state
+
+
+def test_get_characters_returns_characters_in_order(deploy_mocks_and_game):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    players = [get_account(index=1), get_account(index=2)]
+    for player in players:
+        create_character_for_testing(coordinator, world_of_ledger_contract, player)
+    addresses = [players[1], get_account(index=3), players[0]]
+    characters = world_of_ledger_contract.getCharacters(addresses)
+    assert [tuple(c) for c in characters] == [
+        tuple(world_of_ledger_contract.usersCharacters(a)) for a in addresses
+    ]
+
+
+def test_read_players_includes_unsettled_share(deploy_mocks_and_game):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    owner_account = get_account()
+    players = [get_account(index=1), get_account(index=2), get_account(index=3)]
+    for player in players:
+        create_character_for_testing(coordinator, world_of_ledger_contract, player)
+    damages = [world_of_ledger_contract.usersCharacters(p)[1] for p in players]
+    reward = 1000
+    world_of_ledger_contract.populate_boss(
+        sum(damages), 0, reward, {"from": owner_account}
+    )
+    for player in players:
+        world_of_ledger_contract.attackBoss({"from": player})
+    # first player settles, the others don't
+    world_of_ledger_contract.mintRewardNFT({"from": players[0]})
+
+    states = read_players(world_of_ledger_contract, players, chunk_size=2)
+    for player, damage in zip(players, damages):
+        state = states[player]
+        assert state["character"]["damage"] == damage
+        assert state["rewards"] == reward * damage // sum(damages)
+        assert state["round"] == 1
+    assert states[players[0]]["pendingRewardNFTs"] == 0
+    assert states[players[0]]["damageMade"] == 0
+    assert states[players[1]]["pendingRewardNFTs"] == 1
+    assert states[players[1]]["damageMade"] == damages[1]
+
+
+def test_read_round_state(deploy_mocks_and_game):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    owner_account = get_account()
+    player = get_account(index=1)
+    create_character_for_testing(coordinator, world_of_ledger_contract, player)
+    world_of_ledger_contract.populate_boss(10**6, 0, 100, {"from": owner_account})
+    world_of_ledger_contract.attackBoss({"from": player})
+
+    state = read_round_state(world_of_ledger_contract)
+    damage = world_of_ledger_contract.usersCharacters(player)[1]
+    assert state["bossAlive"] == True
+    assert state["round"] == 1
+    assert state["totalDamage"] == damage
+    assert state["boss"]["hp"] == 10**6 - damage
+    assert state["boss"]["reward"] == 100
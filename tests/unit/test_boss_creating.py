@@ -1,27 +1,6 @@
-import pytest
 import random
 from brownie import reverts
-from scripts.helpful_scripts import (
-    get_account,
-    get_key_from_event,
-    deploy_mocks,
-    create_boss_nft,
-)
-from scripts.deploy_game import deploy_game
-
-
-@pytest.fixture
-def deploy_mocks_and_game():
-    account = get_account()
-    coordinator, boss_contract = deploy_mocks()
-    game = deploy_game()
-    subscription_id_game = get_key_from_event(game.tx.events[1], "subId")
-    coordinator.fundSubscription(subscription_id_game, 100000000000, {"from": account})
-    coordinator.fundSubscription(
-        subscription_id_game - 1, 100000000000, {"from": account}
-    )
-    create_boss_nft(coordinator, boss_contract, account, 3)
-    return coordinator, boss_contract, game
+from scripts.helpful_scripts import get_account, get_key_from_event
 
 
 def test_owner_may_populate_customizable_boss(deploy_mocks_and_game):
@@ -70,3 +49,12 @@ def test_notowner_may_not_populate_customizable_boss(deploy_mocks_and_game):
         world_of_ledger_contract.populate_boss(
             hp, xp, reward, {"from": not_owner_account}
         )
+
+
+def test_owner_may_not_populate_boss_with_too_big_attributes(deploy_mocks_and_game):
+    _, _, world_of_ledger_contract = deploy_mocks_and_game
+    owner_account = get_account()
+    with reverts("SafeCast: value doesn't fit in 96 bits"):
+        world_of_ledger_contract.populate_boss(2**96, 10, 10, {"from": owner_account})
+    with reverts("SafeCast: value doesn't fit in 32 bits"):
+        world_of_ledger_contract.populate_boss(10, 2**32, 10, {"from": owner_account})
@@ -0,0 +1,103 @@
+from brownie import chain, reverts
+
+from scripts.helpful_scripts import get_account, create_character_for_testing
+
+
+def test_first_staged_boss_spawns_right_away(deploy_mocks_and_game):
+    _, boss_contract, world_of_ledger_contract = deploy_mocks_and_game
+    owner_account = get_account()
+    bosses = [(100, 1, 10, 1), (200, 2, 20, 2)]
+    stage_tx = world_of_ledger_contract.stageBosses(bosses, {"from": owner_account})
+    assert stage_tx.events["BossCreated"]["bossID"] == 1
+    assert stage_tx.events["BossCreated"]["tokenURI"] == boss_contract.tokenURI(1)
+    assert world_of_ledger_contract.bossAlive() == True
+    assert world_of_ledger_contract.currentBoss() == bosses[0]
+    assert world_of_ledger_contract.stagedBosses() == 1
+
+
+def test_next_boss_spawns_when_boss_is_killed(deploy_mocks_and_game):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    owner_account = get_account()
+    player = get_account(index=1)
+    create_character_for_testing(coordinator, world_of_ledger_contract, player)
+    damage = world_of_ledger_contract.usersCharacters(player)[1]
+    bosses = [(damage, 0, 10, 3), (damage, 0, 20, 2)]
+    world_of_ledger_contract.stageBosses(bosses, {"from": owner_account})
+
+    kill_tx = world_of_ledger_contract.attackBoss({"from": player})
+    assert kill_tx.events["BossCreated"]["bossID"] == 2
+    assert world_of_ledger_contract.currentRound() == 2
+    assert world_of_ledger_contract.bossAlive() == True
+    assert world_of_ledger_contract.currentBoss() == bosses[1]
+    assert world_of_ledger_contract.rounds(1)[:2] == (3, 10)
+
+
+def test_queue_exhaustion_leaves_no_boss(deploy_mocks_and_game):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    owner_account = get_account()
+    player = get_account(index=1)
+    create_character_for_testing(coordinator, world_of_ledger_contract, player)
+    damage = world_of_ledger_contract.usersCharacters(player)[1]
+    world_of_ledger_contract.stageBosses(
+        [(damage, 0, 10, 1), (damage, 0, 10, 1)], {"from": owner_account}
+    )
+    world_of_ledger_contract.attackBoss({"from": player})
+    kill_tx = world_of_ledger_contract.attackBoss({"from": player})
+
+    assert "BossCreated" not in kill_tx.events
+    assert world_of_ledger_contract.bossAlive() == False
+    assert world_of_ledger_contract.stagedBosses() == 0
+    assert world_of_ledger_contract.currentRound() == 3
+    with reverts("There is no active Boss right now"):
+        world_of_ledger_contract.attackBoss({"from": player})
+    # owner may still populate bosses manually, or stage more
+    world_of_ledger_contract.stageBosses([(damage, 0, 10, 2)], {"from": owner_account})
+    assert world_of_ledger_contract.bossAlive() == True
+
+
+def test_staging_validates_bosses(deploy_mocks_and_game):
+    _, _, world_of_ledger_contract = deploy_mocks_and_game
+    owner_account = get_account()
+    with reverts("Boss NFT doesn't exist"):
+        world_of_ledger_contract.stageBosses([(10, 1, 10, 4)], {"from": owner_account})
+    with reverts("Boss NFT doesn't exist"):
+        world_of_ledger_contract.stageBosses([(10, 1, 10, 0)], {"from": owner_account})
+    with reverts("Ownable: caller is not the owner"):
+        world_of_ledger_contract.stageBosses(
+            [(10, 1, 10, 1)], {"from": get_account(index=1)}
+        )
+
+
+def test_bosses_without_hp_cant_be_staged(deploy_mocks_and_game):
+    _, _, world_of_ledger_contract = deploy_mocks_and_game
+    owner_account = get_account()
+    with reverts("Boss should have hp"):
+        world_of_ledger_contract.stageBosses(
+            [(10, 1, 10, 1), (0, 1, 10, 2)], {"from": owner_account}
+        )
+    assert world_of_ledger_contract.bossAlive() == False
+    assert world_of_ledger_contract.stagedBosses() == 0
+
+
+def test_spawn_costs_less_than_populate_boss(deploy_mocks_and_game):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    owner_account = get_account()
+    player = get_account(index=1)
+    create_character_for_testing(coordinator, world_of_ledger_contract, player)
+    damage = world_of_ledger_contract.usersCharacters(player)[1]
+    populate_tx = world_of_ledger_contract.populate_boss(
+        damage, 0, 10, {"from": owner_account}
+    )
+    boss_id = populate_tx.events["BossCreated"]["bossID"]
+    kill_tx = world_of_ledger_contract.attackBoss({"from": player})
+    chain.undo()
+
+    # the same killing blow, with a staged boss of the cached id behind it
+    world_of_ledger_contract.stageBosses(
+        [(damage, 0, 10, boss_id)], {"from": owner_account}
+    )
+    spawn_kill_tx = world_of_ledger_contract.attackBoss({"from": player})
+    assert spawn_kill_tx.events["BossCreated"]["bossID"] == boss_id
+
+    spawn_gas = spawn_kill_tx.gas_used - kill_tx.gas_used
+    assert spawn_gas < populate_tx.gas_used - 21000
@@ -1,15 +1,9 @@
 import pytest
 import random
 from web3 import Web3
-from brownie import reverts
+from brownie import reverts, ZERO_ADDRESS
 
-from scripts.helpful_scripts import (
-    get_account,
-    get_key_from_event,
-    deploy_mocks,
-    create_character_for_testing,
-)
-from scripts.deploy_game import deploy_game
+from scripts.helpful_scripts import get_account, create_character_for_testing
 
 
 @pytest.fixture
@@ -25,16 +19,6 @@ def populate_boss(deploy_mocks_and_game):
     world_of_ledger_contract.populate_boss(hp, xp, reward, {"from": owner_account})
 
 
-@pytest.fixture
-def deploy_mocks_and_game():
-    account = get_account()
-    coordinator, boss_contract = deploy_mocks()
-    game = deploy_game()
-    subscription_id = get_key_from_event(game.tx.events[1], "subId")
-    coordinator.fundSubscription(subscription_id, 100000000000, {"from": account})
-    return coordinator, boss_contract, game
-
-
 def test_user_may_generate_character(deploy_mocks_and_game):
     coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
     not_owner_account = get_account(index=2)
@@ -62,3 +46,18 @@ def test_user_may_generate_only_one_character(deploy_mocks_and_game):
         create_character_for_testing(
             coordinator, world_of_ledger_contract, not_owner_account
         )
+
+
+def test_fulfillment_clears_the_request(deploy_mocks_and_game):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    not_owner_account = get_account(index=2)
+    create_tx, fulfill_tx = create_character_for_testing(
+        coordinator, world_of_ledger_contract, not_owner_account
+    )
+    request_id = create_tx.events["RequestedRandomness"]["requestId"]
+    assert fulfill_tx.events["RandomWordsFulfilled"]["success"] == True
+    assert world_of_ledger_contract.requestIdToAddress(request_id) == ZERO_ADDRESS
+    (hp, damage, _, _, _, _) = world_of_ledger_contract.usersCharacters(
+        not_owner_account
+    )
+    assert 1 <= hp <= 100 and 1 <= damage <= 100
@@ -0,0 +1,136 @@
+from brownie import reverts
+
+from scripts.helpful_scripts import (
+    get_account,
+    get_players,
+    create_character_for_testing,
+)
+from scripts.gas_benchmark import enroll_characters, enrollment_callback_gas
+
+
+def test_one_request_creates_characters_of_all_enrolled(deploy_mocks_and_game):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    players = get_players(5)
+    for player in players:
+        world_of_ledger_contract.enrollCharacter({"from": player})
+    request_tx = world_of_ledger_contract.requestEnrolledCharacters(
+        {"from": players[0]}
+    )
+    assert len(request_tx.events["RequestedEnrolledCharacters"]) == 1
+    request_id = request_tx.events["RequestedEnrolledCharacters"]["requestId"]
+    assert request_tx.events["RandomWordsRequested"]["numWords"] == 10
+
+    fulfill_tx = coordinator.fulfillRandomWords(request_id, world_of_ledger_contract)
+    assert fulfill_tx.events["RandomWordsFulfilled"]["success"] == True
+    for player in players:
+        (hp, damage, xp, level, is_alive, _) = world_of_ledger_contract.usersCharacters(
+            player
+        )
+        assert 1 <= hp <= 100 and 1 <= damage <= 100
+        assert (xp, level, is_alive) == (0, 0, True)
+        assert world_of_ledger_contract.enrolled(player) == False
+
+
+def test_queue_is_split_into_requests_of_batch_size(deploy_mocks_and_game):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    world_of_ledger_contract.setEnrollmentBatchSize(2, {"from": get_account()})
+    players = get_players(5)
+    for player in players:
+        world_of_ledger_contract.enrollCharacter({"from": player})
+    request_tx = world_of_ledger_contract.requestEnrolledCharacters(
+        {"from": players[0]}
+    )
+    batches = request_tx.events["RequestedEnrolledCharacters"]
+    assert [event["characters"] for event in batches] == [2, 2, 1]
+    with reverts("There are no enrolled users"):
+        world_of_ledger_contract.requestEnrolledCharacters({"from": players[0]})
+
+
+def test_max_batch_fits_callback_gas_limit(deploy_mocks_and_game):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    max_batch = world_of_ledger_contract.maxEnrollmentBatchSize()
+    assert max_batch * 2 <= 500
+    with reverts("Batch size should be between 1 and maxEnrollmentBatchSize"):
+        world_of_ledger_contract.setEnrollmentBatchSize(
+            max_batch + 1, {"from": get_account()}
+        )
+    # enroll_characters checks that the callback succeeded for every request
+    enroll_characters(coordinator, world_of_ledger_contract, get_players(max_batch))
+
+
+def test_user_may_enroll_only_once(deploy_mocks_and_game):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    player = get_account(index=1)
+    world_of_ledger_contract.enrollCharacter({"from": player})
+    with reverts("You are already enrolled"):
+        world_of_ledger_contract.enrollCharacter({"from": player})
+    create_character_for_testing(coordinator, world_of_ledger_contract, player)
+    character = world_of_ledger_contract.usersCharacters(player)
+    # the character created meanwhile is not replaced by the batch
+    request_tx = world_of_ledger_contract.requestEnrolledCharacters({"from": player})
+    coordinator.fulfillRandomWords(
+        request_tx.events["RequestedEnrolledCharacters"]["requestId"],
+        world_of_ledger_contract,
+    )
+    assert world_of_ledger_contract.usersCharacters(player) == character
+    with reverts("You can not create more then one character"):
+        world_of_ledger_contract.enrollCharacter({"from": player})
+
+
+def test_batch_is_cheaper_per_character(deploy_mocks_and_game):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    players = get_players(11)
+    create_tx, fulfill_tx = create_character_for_testing(
+        coordinator, world_of_ledger_contract, players[0]
+    )
+    single_payment = fulfill_tx.events["RandomWordsFulfilled"]["payment"]
+    single_gas = create_tx.gas_used + fulfill_tx.gas_used
+
+    gas_used, payment = enroll_characters(
+        coordinator, world_of_ledger_contract, players[1:]
+    )
+    assert payment < single_payment
+    assert gas_used < single_gas
+
+
+def test_callback_gas_per_character_has_headroom(deploy_mocks_and_game):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    gas_per_character = enrollment_callback_gas(
+        coordinator, world_of_ledger_contract, get_players(11)
+    )
+    # ENROLLMENT_CALLBACK_CHARACTER_GAS of WorldOfLedgerFactory
+    assert gas_per_character * 1.2 < 50000
+
+
+def test_owner_retries_lost_enrollment_batch(deploy_mocks_and_game):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    owner_account = get_account()
+    players = get_players(3)
+    for player in players:
+        world_of_ledger_contract.enrollCharacter({"from": player})
+    request_tx = world_of_ledger_contract.requestEnrolledCharacters(
+        {"from": players[0]}
+    )
+    request_id = request_tx.events["RequestedEnrolledCharacters"]["requestId"]
+    with reverts("Ownable: caller is not the owner"):
+        world_of_ledger_contract.retryEnrollmentBatch(request_id, {"from": players[0]})
+
+    retry_tx = world_of_ledger_contract.retryEnrollmentBatch(
+        request_id, {"from": owner_account}
+    )
+    assert retry_tx.events["RequestedEnrolledCharacters"]["characters"] == 3
+    new_request_id = retry_tx.events["EnrollmentBatchRetried"]["newRequestId"]
+    with reverts("There is no pending enrollment batch"):
+        world_of_ledger_contract.retryEnrollmentBatch(
+            request_id, {"from": owner_account}
+        )
+    # a late fulfillment of the old request changes nothing
+    coordinator.fulfillRandomWords(request_id, world_of_ledger_contract)
+    for player in players:
+        assert world_of_ledger_contract.enrolled(player) == True
+        assert world_of_ledger_contract.usersCharacters(player)[1] == 0
+
+    coordinator.fulfillRandomWords(new_request_id, world_of_ledger_contract)
+    for player in players:
+        assert world_of_ledger_contract.enrolled(player) == False
+        assert world_of_ledger_contract.usersCharacters(player)[1] != 0
@@ -0,0 +1,134 @@
+import asyncio
+from brownie import web3
+from web3.exceptions import Web3RPCError
+from scripts.helpful_scripts import get_account, create_character_for_testing
+from scripts.event_indexer import EventIndexer, read_events
+from scripts.async_log_fetcher import AsyncLogFetcher
+
+
+def play_boss_round(coordinator, world_of_ledger_contract, players):
+    owner_account = get_account()
+    for player in players:
+        create_character_for_testing(coordinator, world_of_ledger_contract, player)
+    damages = [world_of_ledger_contract.usersCharacters(p)[1] for p in players]
+    world_of_ledger_contract.populate_boss(
+        sum(damages), 0, 100, {"from": owner_account}
+    )
+    for player in players:
+        world_of_ledger_contract.attackBoss({"from": player})
+    for player in players:
+        world_of_ledger_contract.mintRewardNFT({"from": player})
+
+
+def test_indexer_stores_game_events(deploy_mocks_and_game, tmp_path):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    players = [get_account(index=1), get_account(index=2)]
+    play_boss_round(coordinator, world_of_ledger_contract, players)
+
+    database = tmp_path / "events.sqlite"
+    indexer = EventIndexer(
+        web3, world_of_ledger_contract.address, world_of_ledger_contract.abi, database
+    )
+    stored = indexer.run()
+    indexer.close()
+
+    events = list(read_events(database, world_of_ledger_contract.address))
+    names = [name for _, _, name, _ in events]
+    assert stored == len(events) == 7
+    assert names.count("RequestedRandomness") == 2
+    assert names.count("BossCreated") == 1
+    assert names.count("DamageMade") == 2
+    assert names.count("Transfer") == 2
+    (_, _, _, args) = next(
+        e for e in events if e[2] == "DamageMade" and e[3]["user"] == players[0]
+    )
+    assert args["amount"] == world_of_ledger_contract.usersCharacters(players[0])[1]
+
+
+def test_indexer_shrinks_ranges_the_provider_rejects(deploy_mocks_and_game, tmp_path):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    players = [get_account(index=1), get_account(index=2)]
+    play_boss_round(coordinator, world_of_ledger_contract, players)
+    database = tmp_path / "events.sqlite"
+    indexer = EventIndexer(
+        web3,
+        world_of_ledger_contract.address,
+        world_of_ledger_contract.abi,
+        database,
+        chunk_size=64,
+    )
+    get_logs = indexer._get_logs
+
+    def limited_get_logs(start, end):
+        if end - start >= 2:
+            raise Web3RPCError("eth_getLogs is limited to 2 block range")
+        return get_logs(start, end)
+
+    indexer._get_logs = limited_get_logs
+    stored = indexer.run()
+    assert indexer.chunk_size <= 2
+    assert indexer.last_block == web3.eth.block_number
+    indexer.close()
+
+    events = list(read_events(database, world_of_ledger_contract.address))
+    assert stored == len(events) == 7
+
+
+def test_indexer_continues_from_checkpoint(deploy_mocks_and_game, tmp_path):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    database = tmp_path / "events.sqlite"
+    play_boss_round(coordinator, world_of_ledger_contract, [get_account(index=1)])
+    indexer = EventIndexer(
+        web3,
+        world_of_ledger_contract.address,
+        world_of_ledger_contract.abi,
+        database,
+        chunk_size=2,
+    )
+    first_run = indexer.run()
+    last_block = indexer.last_block
+    assert last_block == web3.eth.block_number
+    indexer.close()
+
+    play_boss_round(coordinator, world_of_ledger_contract, [get_account(index=2)])
+    indexer = EventIndexer(
+        web3,
+        world_of_ledger_contract.address,
+        world_of_ledger_contract.abi,
+        database,
+        chunk_size=2,
+    )
+    second_run = indexer.run()
+    indexer.close()
+
+    events = list(read_events(database, world_of_ledger_contract.address))
+    assert first_run == second_run == 4
+    assert len(events) == 8
+    assert all(block > last_block for block, _, _, _ in events[4:])
+
+
+def test_async_fetch_stores_same_events_in_order(deploy_mocks_and_game, tmp_path):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    players = [get_account(index=i) for i in range(1, 4)]
+    play_boss_round(coordinator, world_of_ledger_contract, players)
+    address, abi = world_of_ledger_contract.address, world_of_ledger_contract.abi
+
+    indexer = EventIndexer(web3, address, abi, tmp_path / "sync.sqlite")
+    indexer.run()
+    indexer.close()
+
+    indexer = EventIndexer(web3, address, abi, tmp_path / "async.sqlite")
+    fetcher = AsyncLogFetcher(
+        web3.provider.endpoint_uri,
+        indexer.address,
+        indexer.topics,
+        concurrency=4,
+        chunk_size=3,
+    )
+    asyncio.run(indexer.run_async(fetcher))
+    indexer.close()
+
+    sync_events = list(read_events(tmp_path / "sync.sqlite", address))
+    async_events = list(read_events(tmp_path / "async.sqlite", address))
+    assert len(async_events) == 10
+    assert async_events == sync_events
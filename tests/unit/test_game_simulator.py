@@ -0,0 +1,131 @@
+import math
+
+import numpy as np
+from brownie import chain
+from brownie.exceptions import VirtualMachineError
+
+from scripts.helpful_scripts import get_account, create_character_for_testing
+from scripts.game_simulator import GameSimulator, isqrt, level_of, DAY
+
+
+PLAYERS = 4
+STEPS = 60
+
+
+def test_isqrt_matches_contract_sqrt():
+    values = list(range(1000)) + [2**62 - 1, 2**62, 10**18 + 7]
+    values += [3037000499**2 - 1, 3037000499**2, 2**63 - 2, 2**63 - 1]
+    assert list(isqrt(values)) == [math.isqrt(v) for v in values]
+    assert list(level_of([0, 24, 25, 224, 225])) == [0, 0, 1, 2, 3]
+
+
+def test_level_of_quarter_xp_matches_level_formula():
+    # the contract computes sqrt(xp / 25) and gates spells by 25 * level ** 2 xp
+    squares = [25 * level * level for level in range(1, 2**10)]
+    squares += [25 * level * level for level in (2**47 // 5, 2**48 // 5)]
+    values = list(range(10**5)) + [x + d for x in squares for d in (-1, 0, 1)]
+    values += [2**96 - 1]
+    for xp in values:
+        level = math.isqrt(xp) * 20 // 100
+        assert math.isqrt(xp // 25) == level
+        assert xp >= 25 * level * level and xp < 25 * (level + 1) ** 2
+
+
+def test_batch_stops_at_the_killing_blow():
+    game = GameSimulator(hp=[10, 10, 10], damage=[5, 7, 9])
+    game.populate_boss(10, 3, 100)
+    assert list(game.attack([2, 0, 1])) == [True, True, False]
+    assert game.boss_alive == False
+    assert list(game.damage_made) == [1, 0, 9]
+    assert list(game.hp) == [7, 10, 7]
+    game.claim_rewards([0, 1, 2])
+    assert list(game.xp) == [10, 0, 90]
+
+
+def _call(contract_function, player, *args):
+    try:
+        contract_function(*args, {"from": player})
+        return True
+    except VirtualMachineError:
+        return False
+
+
+def _assert_same_state(game, world_of_ledger_contract, players):
+    characters = world_of_ledger_contract.getCharacters(players)
+    for index, (player, character) in enumerate(zip(players, characters)):
+        hp, damage, xp, level, is_alive, fire_bolt_time = character
+        assert (hp, damage, xp, level, is_alive) == (
+            game.hp[index],
+            game.damage[index],
+            game.xp[index],
+            game.level[index],
+            game.is_alive[index],
+        )
+        # block timestamps are only known after the call
+        assert (fire_bolt_time == 0) == (game.fire_bolt_time[index] == 0)
+        assert world_of_ledger_contract.damageMade(player) == game.damage_made[index]
+        assert world_of_ledger_contract.usersRound(player) == game.users_round[index]
+        assert (
+            world_of_ledger_contract.usersRewards(player) == game.users_rewards[index]
+        )
+        assert (
+            world_of_ledger_contract.pendingRewardNFTs(player)
+            == game.pending_reward_nfts[index]
+        )
+    assert world_of_ledger_contract.bossAlive() == game.boss_alive
+    assert world_of_ledger_contract.currentBoss()[0] == game.boss_hp
+    assert world_of_ledger_contract.currentRound() == game.current_round
+
+
+def test_simulator_matches_contract_on_random_trace(deploy_mocks_and_game):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    owner_account = get_account()
+    players = [get_account(index=i + 1) for i in range(PLAYERS)]
+    for player in players:
+        create_character_for_testing(coordinator, world_of_ledger_contract, player)
+    characters = world_of_ledger_contract.getCharacters(players)
+    game = GameSimulator(
+        hp=[c[0] for c in characters], damage=[c[1] for c in characters]
+    )
+    rng = np.random.default_rng(7)
+
+    for _ in range(STEPS):
+        if not game.boss_alive:
+            boss = [int(rng.integers(1, 300)), int(rng.integers(0, 15)), 400]
+            world_of_ledger_contract.populate_boss(*boss, {"from": owner_account})
+            game.populate_boss(*boss)
+        order = rng.permutation(PLAYERS)[: rng.integers(1, PLAYERS + 1)]
+        action = rng.choice(["attack", "fire bolt", "heal", "claim", "mint", "sleep"])
+        if action == "attack":
+            expected = game.attack(order)
+            called = [
+                _call(world_of_ledger_contract.attackBoss, players[i]) for i in order
+            ]
+        elif action == "fire bolt":
+            expected = game.cast_fire_bolt(order, chain.time())
+            called = [
+                _call(world_of_ledger_contract.castFireBolt, players[i]) for i in order
+            ]
+        elif action == "heal":
+            healed = rng.integers(0, PLAYERS, len(order))
+            expected = game.heal(order, healed)
+            called = [
+                _call(world_of_ledger_contract.healCharacter, players[i], players[j])
+                for i, j in zip(order, healed)
+            ]
+        elif action == "claim":
+            game.claim_rewards(order)
+            expected = called = [
+                _call(world_of_ledger_contract.claimRewards, players[i]) for i in order
+            ]
+        elif action == "mint":
+            expected = game.mint_reward_nfts(order) > 0
+            called = [
+                _call(world_of_ledger_contract.mintRewardNFT, players[i]) for i in order
+            ]
+        else:
+            chain.sleep(DAY + 10)
+            chain.mine()
+            continue
+        assert list(called) == list(expected)
+        _assert_same_state(game, world_of_ledger_contract, players)
@@ -0,0 +1,20 @@
+from scripts.gas_benchmark import CODE_SIZE_LIMIT, code_sizes, compare_with_baseline
+
+
+def test_regression_above_threshold_is_reported():
+    baseline = {"attackBoss": 100000, "claimRewards": 50000}
+    results = {"attackBoss": 106000, "claimRewards": 50100}
+    assert compare_with_baseline(results, baseline, 5) == ["attackBoss"]
+
+
+def test_new_and_cheaper_calls_are_not_regressions():
+    baseline = {"attackBoss": 100000}
+    results = {"attackBoss": 90000, "castFireBolt": 70000}
+    assert compare_with_baseline(results, baseline, 5) == []
+
+
+def test_contracts_fit_code_size_limit(deploy_mocks_and_game):
+    _, _, world_of_ledger_contract = deploy_mocks_and_game
+    sizes = code_sizes(world_of_ledger_contract)
+    assert 0 < sizes["WorldOfLedger"] <= CODE_SIZE_LIMIT
+    assert all(0 < size <= CODE_SIZE_LIMIT for size in sizes.values())
@@ -0,0 +1,65 @@
+from scripts.gas_profiler import GasProfile, profile, step_costs
+
+
+def step(op, gas, gas_cost, depth, jump_depth, fn):
+    return {
+        "op": op,
+        "gas": gas,
+        "gasCost": gas_cost,
+        "depth": depth,
+        "jumpDepth": jump_depth,
+        "fn": fn,
+    }
+
+
+# attack calls internal _attack, which calls the other contract with 1000 gas
+TRACE = [
+    step("PUSH1", 5000, 3, 0, 0, "Game.attack"),
+    step("JUMP", 4997, 8, 0, 0, "Game.attack"),
+    step("SLOAD", 4989, 2100, 0, 1, "Game._attack"),
+    step("CALL", 2889, 1100, 0, 1, "Game._attack"),
+    step("SSTORE", 1000, 900, 1, 0, "Other.write"),
+    step("STOP", 100, 0, 1, 0, "Other.write"),
+    step("POP", 1889, 2, 0, 1, "Game._attack"),
+    step("JUMP", 1887, 8, 0, 1, "Game._attack"),
+    step("STOP", 1879, 0, 0, 0, "Game.attack"),
+]
+
+
+def test_forwarded_gas_is_charged_to_the_callee():
+    costs = step_costs(TRACE)
+    assert costs[3] == 100
+    assert sum(costs) == 3 + 8 + 2100 + 100 + 900 + 2 + 8
+
+
+def test_gas_is_aggregated_by_function_and_stack():
+    result = GasProfile()
+    result.add_trace("attack", TRACE)
+    assert result.self_gas["Game.attack"] == 11
+    assert result.self_gas["Game._attack"] == 2210
+    assert result.inclusive["Game._attack"] == 3110
+    assert result.inclusive["Game.attack"] == 3121
+    assert result.op_counts["Game._attack"]["SLOAD"] == 1
+    assert result.op_counts["Other.write"]["SSTORE"] == 1
+    assert result.folded == {
+        "attack;Game.attack": 11,
+        "attack;Game.attack;Game._attack": 2210,
+        "attack;Game.attack;Game._attack;Other.write": 900,
+    }
+    assert [row[0] for row in result.hotspots()] == [
+        "Game.attack",
+        "Game._attack",
+        "Other.write",
+    ]
+
+
+def test_killing_blow_profile(tmp_path):
+    result = profile("kill")
+    functions = {row[0] for row in result.hotspots()}
+    assert "WorldOfLedger._finalizeRound" in functions
+    assert result.op_counts["WorldOfLedger._finalizeRound"]["SSTORE"] > 0
+    folded = tmp_path / "kill.folded"
+    result.write_folded(folded)
+    for line in folded.read_text().splitlines():
+        stack, gas = line.rsplit(" ", 1)
+        assert stack.startswith("attackBoss killing blow;") and int(gas) > 0
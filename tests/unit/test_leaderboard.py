@@ -0,0 +1,91 @@
+from collections import Counter
+
+from brownie import web3
+from scripts.helpful_scripts import get_account, create_character_for_testing
+from scripts.event_indexer import EventIndexer
+from scripts.leaderboard import (
+    Leaderboard,
+    synthetic_events,
+    update_from_database,
+)
+
+
+def ranking_of(damage, k):
+    return [d for _, d in sorted(damage.items(), key=lambda m: (-m[1], m[0]))[:k]]
+
+
+def test_leaderboards_match_totals_of_all_events():
+    leaderboard = Leaderboard(k=5, kept_rounds=3)
+    total, rounds = Counter(), []
+    for event, args, position in synthetic_events(20000, 50, boss_every=500):
+        leaderboard.apply(event, args, position)
+        if event == "BossCreated":
+            rounds.append(Counter())
+        else:
+            total[args["user"]] += args["amount"]
+            rounds[-1][args["user"]] += args["amount"]
+        if position[0] % 997 == 0:
+            assert [d for _, d in leaderboard.top_overall()] == ranking_of(total, 5)
+            assert [d for _, d in leaderboard.top_of_round()] == ranking_of(
+                rounds[-1], 5
+            )
+    assert leaderboard.round == len(rounds) - 1
+    assert [d for _, d in leaderboard.top_of_round(leaderboard.round - 1)] == (
+        ranking_of(rounds[-2], 5)
+    )
+    assert leaderboard.top_of_round(leaderboard.round - 4) is None
+
+
+def test_checkpoint_restores_the_leaderboards(tmp_path):
+    events = list(synthetic_events(3000, 20, boss_every=700))
+    leaderboard = Leaderboard(k=3)
+    for event in events[:2000]:
+        leaderboard.apply(*event)
+    leaderboard.save(tmp_path / "leaderboard.json")
+    restored = Leaderboard.load(tmp_path / "leaderboard.json")
+    # replayed events are skipped
+    for event in events:
+        leaderboard.apply(*event)
+        restored.apply(*event)
+    assert restored.top_overall() == leaderboard.top_overall()
+    assert restored.top_of_round() == leaderboard.top_of_round()
+    assert restored.top_of_round(1) == leaderboard.top_of_round(1)
+
+
+def test_leaderboard_of_indexed_rounds(deploy_mocks_and_game, tmp_path):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    owner_account = get_account()
+    players = [get_account(index=1), get_account(index=2)]
+    for player in players:
+        create_character_for_testing(coordinator, world_of_ledger_contract, player)
+    damages = [world_of_ledger_contract.usersCharacters(p)[1] for p in players]
+    world_of_ledger_contract.populate_boss(
+        sum(damages) * 2, 0, 100, {"from": owner_account}
+    )
+    for player in players + players:
+        world_of_ledger_contract.attackBoss({"from": player})
+    world_of_ledger_contract.populate_boss(damages[1], 0, 100, {"from": owner_account})
+    world_of_ledger_contract.attackBoss({"from": players[1]})
+
+    database = tmp_path / "events.sqlite"
+    indexer = EventIndexer(
+        web3, world_of_ledger_contract.address, world_of_ledger_contract.abi, database
+    )
+    indexer.run()
+    indexer.close()
+    leaderboard = Leaderboard()
+    assert update_from_database(
+        leaderboard, database, world_of_ledger_contract.address
+    ) == (2 + 5)
+    # replaying the same range applies nothing
+    assert (
+        update_from_database(leaderboard, database, world_of_ledger_contract.address)
+        == 0
+    )
+    assert leaderboard.round == 1
+    assert dict(leaderboard.top_of_round(0)) == {
+        players[0]: damages[0] * 2,
+        players[1]: damages[1] * 2,
+    }
+    assert leaderboard.top_of_round() == [(players[1], damages[1])]
+    assert dict(leaderboard.top_overall())[players[1]] == damages[1] * 3
@@ -0,0 +1,27 @@
+from scripts.load_generator import (
+    ACTION_MIX,
+    random_actions,
+    run_mix,
+    setup,
+    stage_bosses,
+)
+
+
+def test_random_actions_follow_the_mix():
+    players = ["alice", "bob", "carol"]
+    actions = random_actions(players, 2000, seed=1)
+    names = [action for action, _, _ in actions]
+    for name, weight in ACTION_MIX.items():
+        assert abs(names.count(name) / len(actions) - weight) < 0.05
+    for action, sender, args in actions:
+        assert sender in players
+        assert len(args) == (1 if action == "healCharacter" else 0)
+
+
+def test_every_action_is_recorded():
+    game, players = setup(5)
+    stage_bosses(game, players, amount=2)
+    stats, elapsed = run_mix(game, random_actions(players, 40), workers=4)
+    assert sum(len(latency) for latency in stats.latency.values()) == 40
+    assert len(stats.gas_used["attackBoss"]) > 0
+    assert elapsed > 0
@@ -0,0 +1,131 @@
+from brownie import reverts
+
+from scripts.helpful_scripts import get_account, create_character_for_testing
+from scripts.merkle_rewards import (
+    MerkleRewards,
+    build_round,
+    leaf_hash,
+    shares,
+    verify,
+)
+
+
+def test_every_proof_verifies():
+    for participants in [1, 2, 3, 7, 64, 100]:
+        damage = {f"0x{i:040x}": i for i in range(1, participants + 1)}
+        tree = MerkleRewards(3, shares(damage, 1000, sum(damage.values())))
+        for user in tree.users:
+            damage, reward = tree.claims[user]
+            assert verify(
+                tree.proof(user), tree.root, leaf_hash(user, 3, damage, reward)
+            )
+            assert not verify(
+                tree.proof(user), tree.root, leaf_hash(user, 3, damage, reward + 1)
+            )
+
+
+def play_round(world_of_ledger_contract, players, reward):
+    """Kills a boss with hp equal to the damage of all players and returns the
+    events of the round as (event name, args)
+    """
+    damage = sum(world_of_ledger_contract.usersCharacters(p)[1] for p in players)
+    txs = [
+        world_of_ledger_contract.populate_boss(
+            damage, 0, reward, {"from": get_account()}
+        )
+    ]
+    txs += [world_of_ledger_contract.attackBoss({"from": p}) for p in players]
+    return [(event.name, dict(event)) for tx in txs for event in tx.events]
+
+
+def test_shares_follow_the_contract_formula(deploy_mocks_and_game):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    players = [get_account(index=i) for i in range(1, 4)]
+    for player in players:
+        create_character_for_testing(coordinator, world_of_ledger_contract, player)
+    damages = [world_of_ledger_contract.usersCharacters(p)[1] for p in players]
+    events = play_round(world_of_ledger_contract, players, 1000)
+    # a lazily settled round, getPlayers returns the unsettled share
+    states = world_of_ledger_contract.getPlayers(players)
+    expected = shares(dict(zip(players, damages)), 1000, sum(damages))
+    assert [state[3] for state in states] == [expected[p][1] for p in players]
+
+    world_of_ledger_contract.setMerkleSettlement(True, {"from": get_account()})
+    events += play_round(world_of_ledger_contract, players, 1000)
+    assert world_of_ledger_contract.damageMade(players[0]) == 0
+    tree = build_round(world_of_ledger_contract, 2, events)
+    assert tree.claims == expected
+
+
+def test_users_claim_with_proof(deploy_mocks_and_game):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    owner_account = get_account()
+    players = [get_account(index=1), get_account(index=2)]
+    for player in players:
+        create_character_for_testing(coordinator, world_of_ledger_contract, player)
+    world_of_ledger_contract.setMerkleSettlement(True, {"from": owner_account})
+    events = play_round(world_of_ledger_contract, players, 1000)
+    tree = build_round(world_of_ledger_contract, 1, events)
+    damage, reward = tree.claims[players[0]]
+    proof = tree.proof(players[0])
+    with reverts("Reward root is not published"):
+        world_of_ledger_contract.claimRewardsWithProof(
+            1, damage, reward, proof, {"from": players[0]}
+        )
+    with reverts("Round is not settled with a Merkle root"):
+        world_of_ledger_contract.publishRewardRoot(
+            2, tree.root, {"from": owner_account}
+        )
+    world_of_ledger_contract.publishRewardRoot(1, tree.root, {"from": owner_account})
+    with reverts("Reward root is already published"):
+        world_of_ledger_contract.publishRewardRoot(
+            1, tree.root, {"from": owner_account}
+        )
+
+    with reverts("Invalid reward proof"):
+        world_of_ledger_contract.claimRewardsWithProof(
+            1, damage, reward + 1, proof, {"from": players[0]}
+        )
+    world_of_ledger_contract.claimRewardsWithProof(
+        1, damage, reward, proof, {"from": players[0]}
+    )
+    assert world_of_ledger_contract.usersCharacters(players[0])[2] == reward
+    with reverts("Reward is already claimed"):
+        world_of_ledger_contract.claimRewardsWithProof(
+            1, damage, reward, proof, {"from": players[0]}
+        )
+
+    damage, reward = tree.claims[players[1]]
+    world_of_ledger_contract.mintRewardNFTWithProof(
+        1, damage, reward, tree.proof(players[1]), {"from": players[1]}
+    )
+    token_id = world_of_ledger_contract.totalSupply()
+    assert world_of_ledger_contract.ownerOf(token_id) == players[1]
+    assert world_of_ledger_contract.NFTidToReward(token_id)[1:] == (
+        damage,
+        reward,
+        world_of_ledger_contract.rounds(1)[0],
+    )
+
+
+def test_settlement_mode_changes_with_staged_bosses(deploy_mocks_and_game):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    owner_account = get_account()
+    player = get_account(index=1)
+    create_character_for_testing(coordinator, world_of_ledger_contract, player)
+    damage = world_of_ledger_contract.usersCharacters(player)[1]
+    world_of_ledger_contract.stageBosses(
+        [(damage, 0, 10, 1), (damage, 0, 10, 2)], {"from": owner_account}
+    )
+    # the boss is alive, so the mode applies from the next round
+    world_of_ledger_contract.setMerkleSettlement(True, {"from": owner_account})
+    assert world_of_ledger_contract.merkleSettlement() == False
+    assert world_of_ledger_contract.nextMerkleSettlement() == True
+
+    world_of_ledger_contract.attackBoss({"from": player})
+    assert world_of_ledger_contract.bossAlive() == True
+    assert world_of_ledger_contract.merkleSettlement() == True
+    assert world_of_ledger_contract.rounds(1)[3] == False
+    world_of_ledger_contract.attackBoss({"from": player})
+    assert world_of_ledger_contract.rounds(2)[3] == True
+    assert world_of_ledger_contract.damageMade(player) == 0
@@ -1,12 +1,11 @@
 import pytest
 from scripts.helpful_scripts import get_account
-from scripts.deploy_game import deploy_game
 from brownie import reverts
 
 
-@pytest.fixture
-def world_of_ledger_contract():
-    return deploy_game()
+@pytest.fixture(scope="module")
+def world_of_ledger_contract(deploy_mocks_and_game):
+    return deploy_mocks_and_game[2]
 
 
 def test_owner_has_admin_permission(world_of_ledger_contract):
@@ -0,0 +1,33 @@
+from scripts.parallel_runner import merge_gas_profiles
+
+
+def gas(avg, high, low, count, count_success, avg_success):
+    return dict(
+        avg=avg,
+        high=high,
+        low=low,
+        count=count,
+        count_success=count_success,
+        avg_success=avg_success,
+    )
+
+
+def test_gas_profiles_of_workers_are_merged():
+    profile = {"WorldOfLedger.attackBoss": gas(100, 120, 80, 2, 2, 100)}
+    other = {
+        "WorldOfLedger.attackBoss": gas(130, 150, 90, 4, 3, 120),
+        "WorldOfLedger.claimRewards": gas(50, 50, 50, 1, 1, 50),
+    }
+    merge_gas_profiles(profile, other)
+    assert profile == {
+        "WorldOfLedger.attackBoss": gas(120, 150, 80, 6, 5, 112),
+        "WorldOfLedger.claimRewards": gas(50, 50, 50, 1, 1, 50),
+    }
+
+
+def test_reverted_only_calls_keep_no_success_average():
+    profile = {"WorldOfLedger.castFireBolt": gas(30, 30, 30, 1, 0, 0)}
+    merge_gas_profiles(
+        profile, {"WorldOfLedger.castFireBolt": gas(40, 40, 40, 1, 0, 0)}
+    )
+    assert profile["WorldOfLedger.castFireBolt"] == gas(35, 40, 30, 2, 0, 0)
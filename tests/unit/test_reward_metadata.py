@@ -0,0 +1,54 @@
+import base64
+import json
+
+from scripts.helpful_scripts import get_account, create_character_for_testing
+
+
+PREFIX = "data:application/json;base64,"
+
+
+def test_token_uri_renders_reward_and_boss_uri(deploy_mocks_and_game):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    owner_account = get_account()
+    player = get_account(index=1)
+    create_character_for_testing(coordinator, world_of_ledger_contract, player)
+    damage = world_of_ledger_contract.usersCharacters(player)[1]
+    populate_tx = world_of_ledger_contract.populate_boss(
+        damage, 0, 150, {"from": owner_account}
+    )
+    boss_id = populate_tx.events["BossCreated"]["bossID"]
+    boss_uri = populate_tx.events["BossCreated"]["tokenURI"]
+    world_of_ledger_contract.attackBoss({"from": player})
+    world_of_ledger_contract.mintRewardNFT({"from": player})
+
+    assert world_of_ledger_contract.bossURIs(boss_id) == boss_uri
+    token_uri = world_of_ledger_contract.tokenURI(1)
+    assert token_uri.startswith(PREFIX)
+    metadata = json.loads(base64.b64decode(token_uri[len(PREFIX) :]))
+    assert metadata["name"] == "World Of Ledger. Reward for boss defeated. #1"
+    assert metadata["external_url"] == boss_uri
+    assert {a["trait_type"]: a["value"] for a in metadata["attributes"]} == {
+        "Boss": boss_id,
+        "Damage made": damage,
+        "Reward received": 150,
+    }
+
+
+def test_reward_keeps_its_shape(deploy_mocks_and_game):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    owner_account = get_account()
+    player = get_account(index=1)
+    create_character_for_testing(coordinator, world_of_ledger_contract, player)
+    damage = world_of_ledger_contract.usersCharacters(player)[1]
+    populate_tx = world_of_ledger_contract.populate_boss(
+        damage, 0, 150, {"from": owner_account}
+    )
+    world_of_ledger_contract.attackBoss({"from": player})
+    world_of_ledger_contract.mintRewardNFT({"from": player})
+
+    assert world_of_ledger_contract.NFTidToReward(1) == (
+        "World Of Ledger. Reward for boss defeated.",
+        damage,
+        150,
+        populate_tx.events["BossCreated"]["bossID"],
+    )
@@ -0,0 +1,80 @@
+from scripts.helpful_scripts import get_account, create_character_for_testing
+
+
+def test_reward_is_shared_according_to_damage(deploy_mocks_and_game):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    owner_account = get_account()
+    players = [get_account(index=1), get_account(index=2)]
+    for player in players:
+        create_character_for_testing(coordinator, world_of_ledger_contract, player)
+    damages = [world_of_ledger_contract.usersCharacters(p)[1] for p in players]
+    reward = 1000
+    world_of_ledger_contract.populate_boss(
+        sum(damages), 0, reward, {"from": owner_account}
+    )
+    for player in players:
+        world_of_ledger_contract.attackBoss({"from": player})
+    assert world_of_ledger_contract.bossAlive() == False
+
+    for player, damage in zip(players, damages):
+        world_of_ledger_contract.claimRewards({"from": player})
+        (_, _, xp, _, _, _) = world_of_ledger_contract.usersCharacters(player)
+        assert xp == reward * damage // sum(damages)
+
+
+def test_killing_blow_does_not_settle_other_users(deploy_mocks_and_game):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    owner_account = get_account()
+    players = [get_account(index=1), get_account(index=2)]
+    for player in players:
+        create_character_for_testing(coordinator, world_of_ledger_contract, player)
+    damages = [world_of_ledger_contract.usersCharacters(p)[1] for p in players]
+    world_of_ledger_contract.populate_boss(
+        sum(damages), 0, 100, {"from": owner_account}
+    )
+    for player in players:
+        world_of_ledger_contract.attackBoss({"from": player})
+    # rewards are settled lazily by each user
+    assert world_of_ledger_contract.usersRewards(players[0]) == 0
+    assert world_of_ledger_contract.damageMade(players[0]) == damages[0]
+    world_of_ledger_contract.mintRewardNFT({"from": players[0]})
+    assert world_of_ledger_contract.balanceOf(players[0]) == 1
+    assert world_of_ledger_contract.damageMade(players[0]) == 0
+
+
+def win_rounds(world_of_ledger_contract, player, rounds):
+    owner_account = get_account()
+    damage = world_of_ledger_contract.usersCharacters(player)[1]
+    for _ in range(rounds):
+        world_of_ledger_contract.populate_boss(damage, 0, 100, {"from": owner_account})
+        world_of_ledger_contract.attackBoss({"from": player})
+
+
+def test_user_mints_all_rewards_in_one_batch(deploy_mocks_and_game):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    players = [get_account(index=1), get_account(index=2)]
+    for player in players:
+        create_character_for_testing(coordinator, world_of_ledger_contract, player)
+    win_rounds(world_of_ledger_contract, players[0], 2)
+    win_rounds(world_of_ledger_contract, players[1], 1)
+    win_rounds(world_of_ledger_contract, players[0], 1)
+    world_of_ledger_contract.claimRewards({"from": players[1]})
+
+    # the share of the last round is settled by the next attack or mint of the user
+    assert world_of_ledger_contract.pendingRewardNFTs(players[0]) == 2
+    assert world_of_ledger_contract.getPlayers([players[0]])[0][4] == 3
+    mint_tx = world_of_ledger_contract.mintRewardNFT({"from": players[0]})
+    world_of_ledger_contract.mintRewardNFT({"from": players[1]})
+
+    assert len(mint_tx.events["Transfer"]) == 3
+    assert world_of_ledger_contract.balanceOf(players[0]) == 3
+    assert world_of_ledger_contract.pendingRewardNFTs(players[0]) == 0
+    damage = world_of_ledger_contract.usersCharacters(players[0])[1]
+    for token_id in range(1, 4):
+        assert world_of_ledger_contract.ownerOf(token_id) == players[0]
+        (_, damage_made, _, _) = world_of_ledger_contract.NFTidToReward(token_id)
+        assert damage_made == damage
+    # the 4th token belongs to the second batch
+    assert world_of_ledger_contract.ownerOf(4) == players[1]
+    (_, damage_made, _, _) = world_of_ledger_contract.NFTidToReward(4)
+    assert damage_made == world_of_ledger_contract.usersCharacters(players[1])[1]
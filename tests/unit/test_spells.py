@@ -0,0 +1,76 @@
+import math
+
+import pytest
+from brownie import chain, reverts
+from scripts.helpful_scripts import get_account
+
+pytestmark = pytest.mark.usefixtures("character_level_3")
+
+
+def test_character_reaches_level_3(deploy_mocks_and_game, character_level_3):
+    _, _, world_of_ledger_contract = deploy_mocks_and_game
+    (_, _, xp, level, _, _) = world_of_ledger_contract.usersCharacters(
+        character_level_3
+    )
+    assert xp == 225
+    assert level == 3
+
+
+def test_level_3_character_may_cast_firebolt(deploy_mocks_and_game, character_level_3):
+    _, _, world_of_ledger_contract = deploy_mocks_and_game
+    world_of_ledger_contract.populate_boss(1000, 0, 100, {"from": get_account()})
+    damage = world_of_ledger_contract.usersCharacters(character_level_3)[1]
+    world_of_ledger_contract.castFireBolt({"from": character_level_3})
+    assert world_of_ledger_contract.currentBoss()[0] == 1000 - damage * 2
+    assert world_of_ledger_contract.damageMade(character_level_3) == damage * 2
+
+
+def test_firebolt_has_cooldown(deploy_mocks_and_game, character_level_3):
+    _, _, world_of_ledger_contract = deploy_mocks_and_game
+    world_of_ledger_contract.populate_boss(1000, 0, 100, {"from": get_account()})
+    world_of_ledger_contract.castFireBolt({"from": character_level_3})
+    with reverts("You may cast spell only once a day"):
+        world_of_ledger_contract.castFireBolt({"from": character_level_3})
+    chain.sleep(world_of_ledger_contract.fireBoltCooldownPeriod())
+    world_of_ledger_contract.castFireBolt({"from": character_level_3})
+
+
+def test_firebolt_killing_blow_finishes_round(deploy_mocks_and_game, character_level_3):
+    _, _, world_of_ledger_contract = deploy_mocks_and_game
+    world_of_ledger_contract.populate_boss(1, 0, 100, {"from": get_account()})
+    world_of_ledger_contract.castFireBolt({"from": character_level_3})
+    assert world_of_ledger_contract.bossAlive() == False
+    with reverts("There is no active Boss right now"):
+        world_of_ledger_contract.castFireBolt({"from": character_level_3})
+
+
+def test_level_matches_square_root_formula(deploy_mocks_and_game, character_level_3):
+    _, _, world_of_ledger_contract = deploy_mocks_and_game
+    xp = 225
+    for new_xp in [399, 400, 624, 625, 10**6 - 1, 10**6, 2**96 - 1]:
+        world_of_ledger_contract.populate_boss(
+            1, 0, new_xp - xp, {"from": get_account()}
+        )
+        world_of_ledger_contract.attackBoss({"from": character_level_3})
+        world_of_ledger_contract.claimRewards({"from": character_level_3})
+        xp = new_xp
+        (_, _, xp_after, level, _, _) = world_of_ledger_contract.usersCharacters(
+            character_level_3
+        )
+        assert xp_after == xp
+        assert level == math.isqrt(xp) * 20 // 100
+
+
+def test_spell_levels_are_checked_against_xp(deploy_mocks_and_game, character_level_3):
+    _, _, world_of_ledger_contract = deploy_mocks_and_game
+    owner_account = get_account()
+    # 225 xp is the minimal xp of level 3
+    assert world_of_ledger_contract.healSpellXp() == 100
+    assert world_of_ledger_contract.fireBoltSpellXp() == 225
+    world_of_ledger_contract.setFireBoltSpellLevel(4, {"from": owner_account})
+    assert world_of_ledger_contract.fireBoltSpellXp() == 400
+    world_of_ledger_contract.populate_boss(1000, 0, 100, {"from": owner_account})
+    with reverts("Only players level 3 or above may cast the heal spell"):
+        world_of_ledger_contract.castFireBolt({"from": character_level_3})
+    world_of_ledger_contract.setFireBoltSpellLevel(3, {"from": owner_account})
+    world_of_ledger_contract.castFireBolt({"from": character_level_3})
@@ -0,0 +1,129 @@
+from brownie import web3
+from eth_utils import to_checksum_address
+
+from scripts.action_bundles import action
+from scripts.helpful_scripts import get_account, create_character_for_testing
+from scripts.state_replay import (
+    ACTION_HEAL,
+    Character,
+    GameState,
+    ReplayEngine,
+    verify,
+)
+
+
+def test_snapshot_round_trip(tmp_path):
+    user = "0x" + "aa" * 20
+    state = GameState(7)
+    state.characters[user] = Character(10, 7, 2**90, 7036874417766, True, 123)
+    state.populate_boss(100, 3, 10**30, 2)
+    state.attack(user)
+    state.open_arenas([{"hp": 5, "damage": 1, "reward": 9, "id": 1}])
+    state.attack_arena(user, 1)
+    state.stage_bosses([{"hp": 1, "damage": 0, "reward": 50, "id": 3}])
+    state.token_owners[1] = user
+    state.users_rewards["0x" + "cc" * 20] = 2**200
+
+    state.save(tmp_path / "7.npz")
+    restored = GameState.load(tmp_path / "7.npz")
+
+    assert restored.block == 7
+    assert restored.characters[user].as_tuple() == (
+        6,
+        7,
+        2**90,
+        7036874417766,
+        True,
+        123,
+    )
+    assert restored.boss == [93, 3, 10**30, 2]
+    assert list(restored.boss_queue) == [[1, 0, 50, 3]]
+    assert restored.arena_damage[1, user] == 5
+    assert restored.users_rewards["0x" + "cc" * 20] == 2**200
+    assert restored.rounds[1] == [0, 0, 7, False]
+    assert restored.token_owners == {1: user}
+
+
+def test_snapshot_leaves_no_temporary_file(tmp_path):
+    GameState(9).save(tmp_path / "9.npz")
+    assert [path.name for path in tmp_path.iterdir()] == ["9.npz"]
+
+
+def test_heal_argument_is_truncated_to_an_address():
+    healer, healed = "0x" + "aa" * 20, to_checksum_address("0x" + "bb" * 20)
+    state = GameState(1)
+    state.characters[healer] = Character(10, 7, 100, 2, True, 0)
+    state.characters[healed] = Character(5, 1, 0, 0, True, 0)
+    arg = 2**160 * 3 + int(healed, 16)
+    state.perform_actions(healer, [{"kind": ACTION_HEAL, "arg": arg}], 0)
+    assert state.characters[healed].hp == 12
+
+
+def test_replayed_state_matches_getters(
+    deploy_mocks_and_game, character_level_3, tmp_path
+):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    owner_account = get_account()
+    hero = character_level_3
+    players = [get_account(index=2), get_account(index=3)]
+    for player in players:
+        create_character_for_testing(coordinator, world_of_ledger_contract, player)
+    enrolled = get_account(index=4)
+    world_of_ledger_contract.enrollCharacter({"from": enrolled})
+    request_tx = world_of_ledger_contract.requestEnrolledCharacters({"from": enrolled})
+    coordinator.fulfillRandomWords(
+        request_tx.events["RequestedEnrolledCharacters"]["requestId"],
+        world_of_ledger_contract,
+    )
+
+    damage = {
+        player: world_of_ledger_contract.usersCharacters(player)[1]
+        for player in [hero, enrolled] + players
+    }
+    boss_hp = damage[players[0]] + 3 * damage[hero] + damage[enrolled]
+    world_of_ledger_contract.populate_boss(boss_hp, 0, 500, {"from": owner_account})
+    world_of_ledger_contract.stageBosses(
+        [(10**6, 0, 200, 2)], {"from": owner_account}
+    )
+    world_of_ledger_contract.attackBoss({"from": players[0]})
+    world_of_ledger_contract.healCharacter(players[0], {"from": hero})
+    world_of_ledger_contract.castFireBolt({"from": hero})
+    world_of_ledger_contract.performActions(
+        [action("attackBoss"), action("healCharacter", players[1])], {"from": hero}
+    )
+    # the arena boss kills the character that attacks it
+    world_of_ledger_contract.openArenas([(1, 10**6, 100, 1)], {"from": owner_account})
+    world_of_ledger_contract.attackBoss(1, {"from": players[1]})
+    middle_block = web3.eth.block_number
+
+    # the killing blow spawns the staged boss
+    world_of_ledger_contract.attackBoss({"from": enrolled})
+    world_of_ledger_contract.claimRewards({"from": players[0]})
+    world_of_ledger_contract.mintRewardNFT({"from": hero})
+    world_of_ledger_contract.settleArenaRewards([1], {"from": players[1]})
+    world_of_ledger_contract.attackBoss({"from": enrolled})
+    assert world_of_ledger_contract.currentRound() == 3
+    assert world_of_ledger_contract.usersCharacters(players[1])[4] == False
+
+    game = web3.eth.contract(
+        address=world_of_ledger_contract.address, abi=world_of_ledger_contract.abi
+    )
+    engine = ReplayEngine(
+        web3,
+        world_of_ledger_contract.address,
+        world_of_ledger_contract.abi,
+        world_of_ledger_contract.tx.block_number,
+        tmp_path,
+        snapshot_every=4,
+    )
+    state = engine.state_at(web3.eth.block_number)
+    assert verify(state, game) == []
+    assert len(state.characters) == 4
+    assert sorted(set(state.token_owners.values())) == [hero.address]
+
+    # restored from the nearest snapshot before the block
+    assert engine.snapshots()
+    middle = engine.state_at(middle_block)
+    assert middle.block == middle_block
+    assert verify(middle, game) == []
+    assert middle.current_round == 2
@@ -0,0 +1,30 @@
+from brownie import web3
+
+from scripts.helpful_scripts import get_account, get_players
+from scripts.tx_submitter import TxSubmitter, seed_characters
+
+
+def test_submitter_seeds_characters(deploy_mocks_and_game):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    # generated accounts are signed locally, unlocked ones by the node
+    players = get_players(12)
+    submitter = TxSubmitter(web3.provider.endpoint_uri, batch_size=5)
+    seed_characters(submitter, coordinator, world_of_ledger_contract, players)
+    submitter.close()
+    for player in players:
+        assert world_of_ledger_contract.usersCharacters(player)[1] != 0
+
+
+def test_submitter_keeps_nonces_locally(deploy_mocks_and_game):
+    owner = get_account()
+    receiver = get_account(index=1)
+    balance = receiver.balance()
+    nonce = owner.nonce
+    submitter = TxSubmitter(web3.provider.endpoint_uri)
+    for _ in range(10):
+        submitter.submit(owner, receiver.address, "0x", 21000, value=1)
+    receipts = submitter.wait()
+    submitter.close()
+    assert [int(r["status"], 16) for r in receipts] == [1] * 10
+    assert owner.nonce == nonce + 10
+    assert receiver.balance() == balance + 10
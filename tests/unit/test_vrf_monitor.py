@@ -0,0 +1,109 @@
+from brownie import chain, web3
+from scripts.helpful_scripts import get_account
+from scripts.vrf_monitor import VrfEventSource, VrfMonitor, pending_check
+
+
+def request_characters(world_of_ledger_contract, players):
+    """Character requests of the players, left unfulfilled"""
+    return [
+        world_of_ledger_contract.createRandomCharacter({"from": player})
+        for player in players
+    ]
+
+
+def request_id(request_tx):
+    return request_tx.events["RequestedRandomness"]["requestId"]
+
+
+def test_latency_and_stuck_requests():
+    monitor = VrfMonitor(stuck_blocks=10, stuck_seconds=600)
+    monitor.request(1, "character", 1, 100, 1000)
+    monitor.request(2, "character", 1, 101, 1012)
+    monitor.request(3, "enrollment", 5, 102, 1024)
+    assert monitor.fulfill(1, 103, 1036) == (3, 36)
+    assert monitor.fulfill(3, 110, 1120) == (8, 96)
+    assert monitor.fulfill(1, 111, 1132) is None
+
+    assert monitor.stuck(110, 1120) == []
+    assert [request.request_id for request in monitor.stuck(111, 1132)] == [2]
+    assert monitor.percentiles()[0.5] == (8, 96)
+
+    metrics = monitor.prometheus(111, 1132)
+    assert 'world_of_ledger_vrf_requests_total{kind="enrollment"} 1' in metrics
+    assert 'world_of_ledger_vrf_fulfilled_total{kind="character"} 1' in metrics
+    assert "world_of_ledger_vrf_pending_requests 1" in metrics
+    assert "world_of_ledger_vrf_stuck_requests 1" in metrics
+    assert "world_of_ledger_vrf_oldest_pending_seconds 120" in metrics
+    assert "world_of_ledger_vrf_fulfillment_blocks_sum 11" in metrics
+    assert "world_of_ledger_vrf_fulfillment_seconds_count 2" in metrics
+
+
+def test_retried_enrollment_batch_is_not_pending():
+    monitor = VrfMonitor()
+    events = [
+        ("RequestedEnrolledCharacters", {"requestId": 1, "characters": 3}),
+        ("RequestedEnrolledCharacters", {"requestId": 2, "characters": 3}),
+        ("EnrollmentBatchRetried", {"requestId": 1, "newRequestId": 2}),
+    ]
+    for name, args in events:
+        monitor.apply({"event": name, "args": args, "blockNumber": 10}, 100)
+    assert list(monitor.pending) == [2]
+    assert monitor.requested["enrollment"] == 2
+
+
+def test_fulfillments_are_paired_by_event(deploy_mocks_and_game):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    players = [get_account(index=i) for i in range(1, 4)]
+    start = web3.eth.block_number + 1
+    requests = request_characters(world_of_ledger_contract, players)
+    chain.mine(4, timedelta=60)
+    first = coordinator.fulfillRandomWords(
+        request_id(requests[0]), world_of_ledger_contract
+    )
+    chain.mine(2, timedelta=30)
+    second = coordinator.fulfillRandomWords(
+        request_id(requests[1]), world_of_ledger_contract
+    )
+    chain.mine(3)
+
+    monitor = VrfMonitor(stuck_blocks=5)
+    source = VrfEventSource(
+        web3, world_of_ledger_contract.address, world_of_ledger_contract.abi, start
+    )
+    block = source.read(monitor)
+
+    assert monitor.latency_blocks == [
+        first.block_number - requests[0].block_number,
+        second.block_number - requests[1].block_number,
+    ]
+    assert monitor.latency_seconds == [
+        first.timestamp - requests[0].timestamp,
+        second.timestamp - requests[1].timestamp,
+    ]
+    assert monitor.latency_seconds[0] >= 60
+    stuck = monitor.stuck(block, source.timestamp(block))
+    assert [request.request_id for request in stuck] == [request_id(requests[2])]
+
+
+def test_fulfillments_are_found_by_state_polling(deploy_mocks_and_game):
+    coordinator, _, world_of_ledger_contract = deploy_mocks_and_game
+    players = [get_account(index=1), get_account(index=2)]
+    start = web3.eth.block_number + 1
+    requests = request_characters(world_of_ledger_contract, players)
+    game = web3.eth.contract(
+        address=world_of_ledger_contract.address, abi=world_of_ledger_contract.abi
+    )
+    monitor = VrfMonitor()
+    source = VrfEventSource(
+        web3, world_of_ledger_contract.address, world_of_ledger_contract.abi, start
+    )
+
+    chain.mine(3)
+    coordinator.fulfillRandomWords(request_id(requests[0]), world_of_ledger_contract)
+    block = source.read(monitor, use_fulfillment_events=False)
+    assert len(monitor.pending) == 2
+    fulfilled = monitor.poll(pending_check(game), block, source.timestamp(block))
+
+    assert [request.request_id for request in fulfilled] == [request_id(requests[0])]
+    assert list(monitor.pending) == [request_id(requests[1])]
+    assert monitor.latency_blocks == [block - requests[0].block_number]